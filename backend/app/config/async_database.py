@@ -0,0 +1,58 @@
+from pymongo import AsyncMongoClient
+from app.config.mongo_pool import PoolMetrics
+from app.config.settings import MONGO_URL, MONGO_MIN_POOL_SIZE, MONGO_MAX_POOL_SIZE
+from app.config.database import (
+    POOL_OPTIONS,
+    cars_collection,
+    users_collection,
+    reviews_collection,
+    cities_collection
+)
+from app.services.application_stats import APPLICATION_COLLECTIONS
+
+# Метрики пула асинхронного клиента: у него свой пул, отдельный от синхронного
+async_pool_metrics = PoolMetrics()
+
+# Асинхронный клиент для горячих GET-эндпоинтов. Привязывается к циклу событий,
+# в котором выполнил первую операцию, поэтому открывается в startup (open_async_database).
+async_client = AsyncMongoClient(
+    MONGO_URL,
+    appname="backend-async",
+    connect=False,
+    event_listeners=[async_pool_metrics],
+    **POOL_OPTIONS
+)
+
+def _mirror(collection):
+    """Асинхронная коллекция с теми же базой, read preference и write concern, что у синхронной"""
+    return async_client[collection.database.name].get_collection(
+        collection.name,
+        read_preference=collection.read_preference,
+        write_concern=collection.write_concern
+    )
+
+# Collections
+async_cars_collection = _mirror(cars_collection)
+async_users_collection = _mirror(users_collection)
+async_reviews_collection = _mirror(reviews_collection)
+async_cities_collection = _mirror(cities_collection)
+ASYNC_APPLICATION_COLLECTIONS = {
+    application_type: _mirror(collection)
+    for application_type, collection in APPLICATION_COLLECTIONS.items()
+}
+
+async def open_async_database():
+    """Подключает асинхронный клиент в цикле событий приложения"""
+    try:
+        await async_client.aconnect()
+        await async_client.admin.command("ping")
+        print(f"✅ Асинхронный клиент MongoDB подключен (пул {MONGO_MIN_POOL_SIZE}..{MONGO_MAX_POOL_SIZE})")
+        return True
+    except Exception as e:
+        print(f"❌ Асинхронный клиент MongoDB недоступен: {e}")
+        return False
+
+async def close_async_database():
+    """Закрывает пул асинхронного клиента"""
+    await async_client.close()
+    print("🔌 Асинхронные соединения MongoDB закрыты")
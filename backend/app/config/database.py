@@ -1,23 +1,104 @@
-from pymongo import MongoClient
-from app.config.settings import MONGO_URL, DB_NAME
+from pymongo import MongoClient, ReadPreference
+from pymongo.write_concern import WriteConcern
+from app.config.mongo_pool import pool_metrics
+from app.config.settings import (
+    MONGO_URL,
+    DB_NAME,
+    CITIES_DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_CATALOG_READ_PREFERENCE,
+    MONGO_APPLICATION_WRITE_CONCERN,
+    MONGO_WRITE_TIMEOUT_MS
+)
 
-# MongoDB setup
-client = MongoClient(MONGO_URL)
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Параметры пула — их же показывает /api/debug/mongo-pool
+POOL_OPTIONS = {
+    "maxPoolSize": MONGO_MAX_POOL_SIZE,
+    "minPoolSize": MONGO_MIN_POOL_SIZE,
+    "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+    "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+    "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+}
+
+# MongoDB setup: соединения открываются при старте приложения (open_database)
+client = MongoClient(
+    MONGO_URL,
+    appname="backend",
+    connect=False,
+    event_listeners=[pool_metrics],
+    **POOL_OPTIONS
+)
 db = client[DB_NAME]
+cities_db = client[CITIES_DB_NAME]
+
+# Нагрузки: чтение каталога и запись заявок
+catalog_read_preference = READ_PREFERENCES[MONGO_CATALOG_READ_PREFERENCE]
+application_write_concern = WriteConcern(
+    w=int(MONGO_APPLICATION_WRITE_CONCERN) if MONGO_APPLICATION_WRITE_CONCERN.isdigit() else MONGO_APPLICATION_WRITE_CONCERN,
+    j=True,
+    wtimeout=MONGO_WRITE_TIMEOUT_MS
+)
+
+def _catalog(database, name):
+    return database.get_collection(name, read_preference=catalog_read_preference)
+
+def _applications(name):
+    return db.get_collection(name, write_concern=application_write_concern)
 
 # Collections
-cars_collection = db.cars
-scrape_cache = db.scrape_cache
+cars_collection = _catalog(db, "cars")
+scrape_cache = _catalog(db, "scrape_cache")
+scrape_cache_state = db.scrape_cache_state
+scrape_runs = db.scrape_runs
+scraper_selectors = db.scraper_selectors
+image_blobs = db.image_blobs
+image_refs = db.image_refs
+application_counters_collection = _applications("application_counters")
 users_collection = db.users
-credit_applications = db.credit_applications
-leasing_applications = db.leasing_applications
-direct_leasing_applications = db.direct_leasing_applications
-carcade_leasing_applications = db.carcade_leasing_applications
+credit_applications = _applications("credit_applications")
+leasing_applications = _applications("leasing_applications")
+direct_leasing_applications = _applications("direct_leasing_applications")
+carcade_leasing_applications = _applications("carcade_leasing_applications")
 reviews_collection = db.reviews
 
 # Credit bank collections
-otp_credit_applications = db.otp_credit_applications
-alfa_credit_applications = db.alfa_credit_applications
-rshb_credit_applications = db.rshb_credit_applications
-ural_credit_applications = db.ural_credit_applications
-renesans_credit_applications = db.renesans_credit_applications
+otp_credit_applications = _applications("otp_credit_applications")
+alfa_credit_applications = _applications("alfa_credit_applications")
+rshb_credit_applications = _applications("rshb_credit_applications")
+ural_credit_applications = _applications("ural_credit_applications")
+renesans_credit_applications = _applications("renesans_credit_applications")
+
+# Cities collections
+cities_collection = _catalog(cities_db, "cities")
+delivery_zones_collection = _catalog(cities_db, "delivery_zones")
+
+def open_database():
+    """Проверяет соединение при старте; пул заполняется до minPoolSize в фоне"""
+    try:
+        client.admin.command("ping")
+        print(f"✅ MongoDB подключена (пул {MONGO_MIN_POOL_SIZE}..{MONGO_MAX_POOL_SIZE})")
+        return True
+    except Exception as e:
+        print(f"❌ MongoDB недоступна: {e}")
+        return False
+
+def close_database():
+    """Закрывает пул соединений при остановке приложения"""
+    client.close()
+    print("🔌 Соединения MongoDB закрыты")
@@ -0,0 +1,114 @@
+import threading
+import time
+from pymongo import monitoring
+
+# Границы гистограммы ожидания соединения, мс
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Метрики пула соединений MongoDB: сколько запросы ждут свободное соединение,
+    сколько соединений занято сейчас и в пике, отказы выдачи.
+    По ним подбирают число воркеров и MONGO_MAX_POOL_SIZE под реальную нагрузку.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.failed = {}
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+            self.in_use = 0
+            self.in_use_peak = 0
+            self.created = 0
+            self.closed = 0
+            self.cleared = 0
+            self.since = time.time()
+
+    def _wait(self, event):
+        # Начиная с pymongo 4.7 событие само знает длительность ожидания
+        duration = getattr(event, "duration", None)
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        if duration is None and started is not None:
+            duration = time.perf_counter() - started
+        return duration or 0.0
+
+    def _bucket(self, wait_ms):
+        for index, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                return index
+        return len(CHECKOUT_WAIT_BUCKETS_MS)
+
+    def connection_check_out_started(self, event):
+        # Синхронный драйвер выдаёт соединение в потоке запроса
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = self._wait(event)
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.buckets[self._bucket(wait * 1000)] += 1
+            self.in_use += 1
+            self.in_use_peak = max(self.in_use_peak, self.in_use)
+
+    def connection_check_out_failed(self, event):
+        self._wait(event)
+        with self._lock:
+            self.failed[event.reason] = self.failed.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.cleared += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in CHECKOUT_WAIT_BUCKETS_MS] + [f">{CHECKOUT_WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failed": dict(self.failed),
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_histogram": dict(zip(labels, self.buckets)),
+                "in_use": self.in_use,
+                "in_use_peak": self.in_use_peak,
+                "connections_open": self.created - self.closed,
+                "connections_created": self.created,
+                "pool_cleared": self.cleared,
+                "since": self.since,
+            }
+
+# Метрики пула клиента приложения
+pool_metrics = PoolMetrics()
@@ -18,6 +18,25 @@ JWT_EXPIRATION_HOURS = 24 * 7  # 7 дней
 # MongoDB setup
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://mongo:27017/")
 DB_NAME = "cars_db"
+# Города и зоны доставки хранятся в отдельной базе
+CITIES_DB_NAME = os.environ.get("CITIES_DB_NAME", "rim_auto")
+
+# Пул соединений MongoDB: maxPoolSize не меньше числа потоков, одновременно работающих с базой
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))  # ожидание свободного соединения
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+
+# Чтение каталога (cars, кэш парсинга, города): primary, primaryPreferred, secondary, secondaryPreferred, nearest
+MONGO_CATALOG_READ_PREFERENCE = os.environ.get("MONGO_CATALOG_READ_PREFERENCE", "primaryPreferred")
+# Запись заявок: подтверждение большинством узлов с журналом
+MONGO_APPLICATION_WRITE_CONCERN = os.environ.get("MONGO_APPLICATION_WRITE_CONCERN", "majority")
+MONGO_WRITE_TIMEOUT_MS = int(os.environ.get("MONGO_WRITE_TIMEOUT_MS", "5000"))
+# Горячие GET-эндпоинты: async — асинхронный драйвер в цикле событий, sync — прежний путь через пул потоков
+MONGO_READ_PATH = os.environ.get("MONGO_READ_PATH", "async")
 
 # CORS settings
 CORS_ORIGINS = [
@@ -29,12 +48,78 @@ CORS_ORIGINS = [
 
 # Selenium settings
 SELENIUM_URL = "http://selenium:4444/wd/hub"
+# Пул сессий браузера: standalone-контейнер по умолчанию даёт одну сессию (SE_NODE_MAX_SESSIONS)
+SELENIUM_POOL_SIZE = int(os.environ.get("SELENIUM_POOL_SIZE", "1"))
+# После скольких страниц сессия пересоздаётся (утечки памяти Chrome, накопленные cookies)
+SELENIUM_SESSION_MAX_PAGES = int(os.environ.get("SELENIUM_SESSION_MAX_PAGES", "20"))
+SELENIUM_ACQUIRE_TIMEOUT = float(os.environ.get("SELENIUM_ACQUIRE_TIMEOUT", "120"))
+# Как часто проверять свободные сессии; меньше таймаута сессии в Grid (300 с)
+SELENIUM_KEEPALIVE_INTERVAL = float(os.environ.get("SELENIUM_KEEPALIVE_INTERVAL", "60"))
 
 # Scraping settings
 SCRAPING_URL = "https://www.che168.com/china/list/"
 SCRAPING_TIMEOUT = 30
 SCRAPING_DELAY = 1
 
+# Обход страниц списка: бюджет страниц за парсинг, число параллельных браузеров
+# и не более SCRAPING_PAGE_RATE запросов страниц в секунду к одному хосту
+SCRAPING_MAX_PAGES = int(os.environ.get("SCRAPING_MAX_PAGES", "5"))
+SCRAPING_WORKERS = int(os.environ.get("SCRAPING_WORKERS", "2"))
+SCRAPING_PAGE_RATE = float(os.environ.get("SCRAPING_PAGE_RATE", "0.5"))
+# Загрузка страниц: "auto" — HTTP-запрос, браузер только если его не хватило;
+# "http" или "browser" — только один способ
+SCRAPING_FETCH_MODE = os.environ.get("SCRAPING_FETCH_MODE", "auto")
+# Сколько объявлений должен дать HTTP-ответ, чтобы не открывать страницу в браузере
+SCRAPING_HTTP_MIN_LISTINGS = int(os.environ.get("SCRAPING_HTTP_MIN_LISTINGS", "5"))
+# Выученный селектор контейнеров принимается, если нашёл не меньше стольких объявлений;
+# иначе выполняется полный перебор селекторов
+SCRAPING_SELECTOR_MIN_ITEMS = int(os.environ.get("SCRAPING_SELECTOR_MIN_ITEMS", "10"))
+# Ожидание страницы: дедлайн появления списка, дедлайн прокрутки и сколько секунд
+# число объявлений не должно меняться, чтобы считаться загруженным
+SCRAPING_RENDER_TIMEOUT = float(os.environ.get("SCRAPING_RENDER_TIMEOUT", "15"))
+SCRAPING_SCROLL_TIMEOUT = float(os.environ.get("SCRAPING_SCROLL_TIMEOUT", "10"))
+SCRAPING_SCROLL_SETTLE = float(os.environ.get("SCRAPING_SCROLL_SETTLE", "1"))
+# Дополнительные стартовые страницы (списки по брендам/регионам) через запятую
+SCRAPING_EXTRA_URLS = [
+    url.strip() for url in os.environ.get("SCRAPING_EXTRA_URLS", "").split(",") if url.strip()
+]
+
+# Запись кэша парсинга: "diff" обновляет только изменившиеся автомобили, "full" пишет поколение целиком
+SCRAPE_CACHE_WRITE_MODE = os.environ.get("SCRAPE_CACHE_WRITE_MODE", "diff")
+# Сколько последних поколений кэша парсинга хранить
+SCRAPE_CACHE_KEEP_GENERATIONS = int(os.environ.get("SCRAPE_CACHE_KEEP_GENERATIONS", "2"))
+
+# Скачивание изображений
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.environ.get("IMAGE_DOWNLOAD_CONCURRENCY", "8"))
+IMAGE_HOST_RATE_LIMIT = float(os.environ.get("IMAGE_HOST_RATE_LIMIT", "5"))  # запросов в секунду на хост
+IMAGE_DOWNLOAD_RETRIES = int(os.environ.get("IMAGE_DOWNLOAD_RETRIES", "3"))
+IMAGE_DOWNLOAD_BACKOFF = float(os.environ.get("IMAGE_DOWNLOAD_BACKOFF", "0.5"))  # секунд, удваивается
+
+# Производные изображения: ширины копий ("имя:ширина" через запятую), форматы и качество
+IMAGE_DERIVATIVE_SIZES = {
+    name.strip(): int(width)
+    for name, width in (
+        item.split(":") for item in os.environ.get("IMAGE_DERIVATIVE_SIZES", "thumb:320,card:640").split(",") if item.strip()
+    )
+}
+IMAGE_DERIVATIVE_FORMATS = [
+    fmt.strip().lower() for fmt in os.environ.get("IMAGE_DERIVATIVE_FORMATS", "webp,avif").split(",") if fmt.strip()
+]
+IMAGE_DERIVATIVE_QUALITY = int(os.environ.get("IMAGE_DERIVATIVE_QUALITY", "75"))
+IMAGE_PROCESS_WORKERS = int(os.environ.get("IMAGE_PROCESS_WORKERS", "2"))
+
+# Сборка мусора изображений не трогает файлы моложе этого возраста (секунд)
+IMAGE_GC_GRACE_SECONDS = int(os.environ.get("IMAGE_GC_GRACE_SECONDS", "3600"))
+
+# Как часто сверять счётчики заявок с коллекциями (секунд)
+APPLICATION_COUNTERS_RECONCILE_INTERVAL = float(os.environ.get("APPLICATION_COUNTERS_RECONCILE_INTERVAL", "3600"))
+# Пауза между двумя агрегациями сверки: дольше, чем $inc счётчика может отставать от записи заявки
+APPLICATION_COUNTERS_SETTLE_SECONDS = float(os.environ.get("APPLICATION_COUNTERS_SETTLE_SECONDS", "1"))
+
+# Кэш результатов /api/cars
+CARS_CACHE_MAX_ENTRIES = int(os.environ.get("CARS_CACHE_MAX_ENTRIES", "512"))
+CARS_CACHE_TTL_SECONDS = float(os.environ.get("CARS_CACHE_TTL_SECONDS", "300"))
+
 # Allowed contract types and extensions
 ALLOWED_CONTRACT_TYPES = {"agency", "consignment", "sale"}
 ALLOWED_CONTRACT_EXT = {".docx", ".doc"}
@@ -0,0 +1,199 @@
+import threading
+import time
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from app.config.database import application_counters_collection
+from app.config.settings import APPLICATION_COUNTERS_RECONCILE_INTERVAL, APPLICATION_COUNTERS_SETTLE_SECONDS
+from app.services.application_stats import APPLICATION_COLLECTIONS, APPLICATION_STATUSES, all_status_counts
+
+# Сколько раз reconcile() пересчитывает типы, счётчики которых менялись во время сверки
+RECONCILE_ATTEMPTS = 3
+
+class ApplicationCounters:
+    """
+    Счётчики заявок по типам: документ {_id: тип, total, statuses: {статус: n}}
+    в application_counters. Обновляются через $inc при создании, смене статуса
+    и удалении заявки, поэтому статистика читается без подсчёта коллекций.
+    Запись заявки и счётчика — разные операции (транзакций на standalone mongod нет),
+    расхождения исправляет reconcile(). Каждое изменение увеличивает version:
+    по нему reconcile() видит $inc, пришедшие во время сверки.
+    """
+
+    def __init__(self, collection=application_counters_collection, settle_seconds: float = APPLICATION_COUNTERS_SETTLE_SECONDS):
+        self.collection = collection
+        self.settle_seconds = settle_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _inc(self, application_type, inc):
+        try:
+            self.collection.update_one(
+                {"_id": application_type},
+                {"$inc": {**inc, "version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            # Счётчик не должен ломать сохранение заявки
+            print(f"❌ Ошибка обновления счётчика заявок {application_type}: {e}")
+
+    @staticmethod
+    def _status_inc(inc, status, delta):
+        # Статус становится частью пути поля: учитываются только известные значения
+        if status in APPLICATION_STATUSES:
+            inc[f"statuses.{status}"] = inc.get(f"statuses.{status}", 0) + delta
+
+    def created(self, application_type, status="new"):
+        inc = {"total": 1}
+        self._status_inc(inc, status, 1)
+        self._inc(application_type, inc)
+
+    def status_changed(self, application_type, old_status, new_status):
+        if old_status == new_status:
+            return
+        inc = {}
+        self._status_inc(inc, new_status, 1)
+        self._status_inc(inc, old_status, -1)
+        if inc:
+            self._inc(application_type, inc)
+
+    def deleted(self, application_type, status):
+        inc = {"total": -1}
+        self._status_inc(inc, status, -1)
+        self._inc(application_type, inc)
+
+    @staticmethod
+    def _stats(doc):
+        # Только известные статусы: посторонние ключи не попадают ни в ответ, ни в сверку
+        statuses = (doc or {}).get("statuses", {})
+        stats = {"total": (doc or {}).get("total", 0)}
+        for status in APPLICATION_STATUSES:
+            stats[status] = statuses.get(status, 0)
+        return stats
+
+    def get(self, application_type):
+        """Статистика одного типа — одно чтение по _id"""
+        doc = self.collection.find_one({"_id": application_type})
+        if doc is None:
+            # Счётчики ещё не построены (первый запуск)
+            self.reconcile()
+            doc = self.collection.find_one({"_id": application_type})
+        return self._stats(doc)
+
+    def get_all(self):
+        """({тип: статистика}, итоги) — одно чтение всех счётчиков"""
+        docs = {doc["_id"]: doc for doc in self.collection.find({})}
+        if any(name not in docs for name in APPLICATION_COLLECTIONS):
+            self.reconcile()
+            docs = {doc["_id"]: doc for doc in self.collection.find({})}
+
+        by_type = {name: self._stats(docs.get(name)) for name in APPLICATION_COLLECTIONS}
+        totals = {"total": 0}
+        for stats in by_type.values():
+            for status, count in stats.items():
+                totals[status] = totals.get(status, 0) + count
+        return by_type, totals
+
+    def reconcile(self):
+        """
+        Пересчитывает счётчики агрегацией по коллекциям и записывает точные значения.
+
+        Между записью заявки и $inc её счётчика есть окно: агрегация уже видит заявку,
+        а $inc ещё не пришёл. Записанное в этом окне значение вместе с опоздавшим $inc
+        дало бы лишнюю единицу. Поэтому агрегация выполняется дважды с паузой
+        settle_seconds, и значение записывается, только если обе агрегации совпали,
+        а version счётчика не изменилась с чтения перед первой. Заявка, чей $inc ещё
+        не пришёл ко второй агрегации, либо меняет её результат (записана после первой),
+        либо записана раньше и ждёт $inc дольше паузы — такое расхождение (например,
+        процесс упал между записями) исправит следующая сверка. Типы с конфликтом
+        пересчитываются заново, до RECONCILE_ATTEMPTS раз.
+        Возвращает расхождения {тип: {поле: (было, стало)}}.
+        """
+        drift = {}
+        pending = list(APPLICATION_COLLECTIONS)
+        for _ in range(RECONCILE_ATTEMPTS):
+            # Версии читаются до агрегаций: $inc после чтения меняет version, и $set не применится
+            current = {doc["_id"]: doc for doc in self.collection.find({})}
+            first, _ = all_status_counts()
+            time.sleep(self.settle_seconds)
+            by_type, _ = all_status_counts()
+            now = datetime.utcnow()
+
+            conflicts = []
+            for name in pending:
+                stats = by_type[name]
+                if stats != first[name]:
+                    # Заявки менялись между агрегациями — их $inc могут прийти после $set
+                    conflicts.append(name)
+                    continue
+                actual = self._stats({
+                    "total": stats["total"],
+                    "statuses": {status: count for status, count in stats.items() if status != "total"}
+                })
+                stored = self._stats(current.get(name))
+                version = (current.get(name) or {}).get("version")
+                try:
+                    # Нет совпадения по version — upsert пытается вставить тот же _id и получает DuplicateKeyError.
+                    # Без version — $exists: равенство с null upsert скопировал бы в документ, и $inc упал бы.
+                    self.collection.update_one(
+                        {"_id": name, "version": version if version is not None else {"$exists": False}},
+                        {
+                            "$set": {
+                                "total": actual["total"],
+                                "statuses": {status: count for status, count in actual.items() if status != "total"},
+                                "updated_at": now,
+                                "reconciled_at": now
+                            },
+                            "$inc": {"version": 1}
+                        },
+                        upsert=True
+                    )
+                except DuplicateKeyError:
+                    conflicts.append(name)
+                    continue
+
+                changes = {
+                    field: (stored.get(field, 0), count)
+                    for field, count in actual.items()
+                    if stored.get(field, 0) != count
+                }
+                if name in current and changes:
+                    drift[name] = changes
+
+            pending = conflicts
+            if not pending:
+                break
+
+        if pending:
+            print(f"⚠️ Счётчики заявок не сверены из-за параллельных записей: {pending}")
+        if drift:
+            print(f"🔧 Счётчики заявок исправлены: {drift}")
+        return drift
+
+    def _reconcile_loop(self, interval):
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"❌ Ошибка сверки счётчиков заявок: {e}")
+            if self._stop.wait(interval):
+                return
+
+    def start(self, interval: float = APPLICATION_COUNTERS_RECONCILE_INTERVAL):
+        """Фоновая сверка: сразу при старте и затем каждые interval секунд"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._reconcile_loop,
+            args=(interval,),
+            name="application-counters-reconcile",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+# Счётчики заявок текущего процесса
+application_counters = ApplicationCounters()
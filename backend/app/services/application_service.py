@@ -1,6 +1,9 @@
 from datetime import datetime
 from fastapi import HTTPException
 from app.config.database import credit_applications, leasing_applications
+from app.services.pagination import find_page
+from app.services.application_counters import application_counters
+from app.services.application_stats import APPLICATION_STATUSES
 
 def submit_credit_application(application_data: dict, current_user: dict = None):
     """Отправка заявки на кредит"""
@@ -70,6 +73,7 @@ def submit_credit_application(application_data: dict, current_user: dict = None)
         
         # Сохраняем в БД
         result = credit_applications.insert_one(credit_application)
+        application_counters.created("credit")
         
         print(f"✅ Кредитная заявка сохранена: ID {result.inserted_id}")
         print(f"   Пользователь: {application_data.get('firstName')} {application_data.get('lastName')}")
@@ -166,6 +170,7 @@ def submit_leasing_application(application_data: dict, current_user: dict = None
         
         # Сохраняем в БД
         result = leasing_applications.insert_one(leasing_application)
+        application_counters.created("leasing")
         
         print(f"✅ Лизинговая заявка сохранена: ID {result.inserted_id}")
         print(f"   Пользователь: {application_data.get('firstName')} {application_data.get('lastName')}")
@@ -188,49 +193,20 @@ def submit_leasing_application(application_data: dict, current_user: dict = None
         raise HTTPException(status_code=500, detail=f"Failed to submit application: {str(e)}")
 
 def get_applications_stats():
-    """Получение статистики заявок"""
+    """Получение статистики заявок всех типов одним запросом к MongoDB"""
     try:
-        # Статистика кредитных заявок
-        credit_stats = {
-            "total": credit_applications.count_documents({}),
-            "new": credit_applications.count_documents({"status": "new"}),
-            "processing": credit_applications.count_documents({"status": "processing"}),
-            "approved": credit_applications.count_documents({"status": "approved"}),
-            "rejected": credit_applications.count_documents({"status": "rejected"})
-        }
-        
-        # Статистика лизинговых заявок
-        leasing_stats = {
-            "total": leasing_applications.count_documents({}),
-            "new": leasing_applications.count_documents({"status": "new"}),
-            "processing": leasing_applications.count_documents({"status": "processing"}),
-            "approved": leasing_applications.count_documents({"status": "approved"}),
-            "rejected": leasing_applications.count_documents({"status": "rejected"})
-        }
-        
-        # Импортируем коллекцию для Директ лизинга
-        from app.config.database import direct_leasing_applications
-        
-        # Статистика заявок Директ лизинг
-        direct_leasing_stats = {
-            "total": direct_leasing_applications.count_documents({}),
-            "new": direct_leasing_applications.count_documents({"status": "new"}),
-            "processing": direct_leasing_applications.count_documents({"status": "processing"}),
-            "approved": direct_leasing_applications.count_documents({"status": "approved"}),
-            "rejected": direct_leasing_applications.count_documents({"status": "rejected"})
-        }
+        by_type, totals = application_counters.get_all()
         
         return {
-            "credit": credit_stats,
-            "leasing": leasing_stats,
-            "direct_leasing": direct_leasing_stats,
-            "total_applications": credit_stats["total"] + leasing_stats["total"] + direct_leasing_stats["total"]
+            **by_type,
+            "totals": totals,
+            "total_applications": totals["total"]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
-def get_credit_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_credit_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка кредитных заявок"""
     try:
         # Фильтр по статусу
@@ -241,11 +217,10 @@ def get_credit_applications(page: int = 1, page_size: int = 10, status: str = No
         # Подсчет общего количества
         total = credit_applications.count_documents(filter_query)
         
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(credit_applications.find(
-            filter_query
-        ).skip(skip).limit(page_size).sort("created_at", -1))
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            credit_applications, filter_query, page, page_size, cursor
+        )
         
         # Конвертируем ObjectId в строки для JSON сериализации
         for app in applications:
@@ -255,13 +230,16 @@ def get_credit_applications(page: int = 1, page_size: int = 10, status: str = No
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
-def get_leasing_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_leasing_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка лизинговых заявок"""
     try:
         # Фильтр по статусу
@@ -272,11 +250,10 @@ def get_leasing_applications(page: int = 1, page_size: int = 10, status: str = N
         # Подсчет общего количества
         total = leasing_applications.count_documents(filter_query)
         
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(leasing_applications.find(
-            filter_query
-        ).skip(skip).limit(page_size).sort("created_at", -1))
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            leasing_applications, filter_query, page, page_size, cursor
+        )
         
         # Конвертируем ObjectId в строки для JSON сериализации
         for app in applications:
@@ -286,9 +263,12 @@ def get_leasing_applications(page: int = 1, page_size: int = 10, status: str = N
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
@@ -298,6 +278,10 @@ def update_application_status(application_type: str, application_id: str, status
         new_status = status_data.get("status")
         if not new_status:
             raise HTTPException(status_code=400, detail="Status is required")
+        # Те же значения, что ApplicationStatus в моделях банковских заявок;
+        # статус попадает в путь поля счётчика, поэтому произвольные строки не допускаются
+        if new_status not in APPLICATION_STATUSES:
+            raise HTTPException(status_code=400, detail="Invalid status")
         
         # Выбираем коллекцию
         collection = None
@@ -316,19 +300,23 @@ def update_application_status(application_type: str, application_id: str, status
             raise HTTPException(status_code=400, detail="Invalid application ID")
         
         # Обновляем статус
-        result = collection.update_one(
+        # Прежний статус нужен для счётчиков
+        previous = collection.find_one_and_update(
             {"_id": object_id},
             {
                 "$set": {
                     "status": new_status,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1}
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Application not found")
         
+        application_counters.status_changed(application_type, previous.get("status"), new_status)
+        
         return {
             "success": True,
             "message": f"Application status updated to {new_status}"
@@ -0,0 +1,71 @@
+from app.config.database import (
+    credit_applications,
+    leasing_applications,
+    direct_leasing_applications,
+    carcade_leasing_applications,
+    otp_credit_applications,
+    alfa_credit_applications,
+    rshb_credit_applications,
+    ural_credit_applications,
+    renesans_credit_applications
+)
+
+# Коллекции заявок по типу (ключи — разделы ответа /api/applications/stats)
+APPLICATION_COLLECTIONS = {
+    "credit": credit_applications,
+    "leasing": leasing_applications,
+    "direct_leasing": direct_leasing_applications,
+    "carcade_leasing": carcade_leasing_applications,
+    "otp_credit": otp_credit_applications,
+    "alfa_credit": alfa_credit_applications,
+    "rshb_credit": rshb_credit_applications,
+    "ural_credit": ural_credit_applications,
+    "renesans_credit": renesans_credit_applications,
+}
+
+# Статусы заявок (ApplicationStatus в моделях) — всегда есть в ответе, даже нулевые
+APPLICATION_STATUSES = ("new", "processing", "approved", "rejected")
+
+def _status_pipeline():
+    # $sort по индексу со status в начале (index_registry) перед $group даёт покрытый план:
+    # MongoDB считает по ключам индекса, не читая сами документы
+    return [
+        {"$sort": {"status": 1}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+
+def _empty_stats():
+    return {"total": 0, **{status: 0 for status in APPLICATION_STATUSES}}
+
+def _add_count(stats, status, count):
+    stats["total"] += count
+    # Заявки без статуса учитываются только в total
+    if status is not None:
+        stats[status] = stats.get(status, 0) + count
+
+def all_status_counts():
+    """
+    Статистика всех типов заявок за один запрос к MongoDB:
+    $unionWith объединяет подсчёты по статусам из каждой коллекции.
+    """
+    names = list(APPLICATION_COLLECTIONS)
+    first = APPLICATION_COLLECTIONS[names[0]]
+
+    pipeline = _status_pipeline() + [{"$set": {"type": names[0]}}]
+    for name in names[1:]:
+        pipeline.append({
+            "$unionWith": {
+                "coll": APPLICATION_COLLECTIONS[name].name,
+                "pipeline": _status_pipeline() + [{"$set": {"type": name}}]
+            }
+        })
+
+    by_type = {name: _empty_stats() for name in names}
+    for row in first.aggregate(pipeline):
+        _add_count(by_type[row["type"]], row["_id"], row["count"])
+
+    totals = _empty_stats()
+    for stats in by_type.values():
+        for status, count in stats.items():
+            totals[status] = totals.get(status, 0) + count
+    return by_type, totals
@@ -0,0 +1,199 @@
+import asyncio
+import json
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.config.async_database import (
+    async_cars_collection,
+    async_users_collection,
+    async_reviews_collection,
+    async_cities_collection,
+    ASYNC_APPLICATION_COLLECTIONS
+)
+from app.models.city import City
+from app.services.pagination import find_page_async
+from app.services.catalog_index import catalog_index
+from app.services.query_cache import cars_query_cache
+from app.services.car_service import (
+    CAR_DEFAULT_SORT,
+    CAR_RECORD_PROJECTION,
+    build_cars_cache_key,
+    build_cars_query,
+    normalize_text_filters,
+    query_catalog_index,
+    get_cars_with_filters
+)
+from app.services.city_service import build_city_search_query
+from app.services.review_service import build_reviews_query
+from app.services.user_service import token_profile
+
+# Асинхронные версии чтений для горячих GET-эндпоинтов.
+# Фильтры и формат ответа — те же, что у синхронных сервисов; отличается только драйвер.
+
+# Кредитные и лизинговые заявки отдают строковый _id, банковские — поле id
+_APPLICATIONS_WITH_MONGO_ID = {"credit", "leasing"}
+
+async def get_cars(
+    page: int = 1,
+    page_size: int = 10,
+    sort_by: str = None,
+    sort_order: str = "asc",
+    title: str = None,
+    price_from: str = None,
+    price_to: str = None,
+    year_from: str = None,
+    year_to: str = None,
+    country: str = None,
+    cursor: str = None,
+    q: str = None,
+):
+    """Асинхронный get_cars_with_filters"""
+    title, q = normalize_text_filters(title, q)
+    cache_key = build_cars_cache_key(
+        page, page_size, sort_by, sort_order, title,
+        price_from, price_to, year_from, year_to, country, cursor, q
+    )
+    cached_result = cars_query_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+    cache_generation = cars_query_cache.generation
+
+    index = catalog_index.get()
+    if not index:
+        # Холодный старт (пустая read-модель, загрузка индекса, запуск парсинга) —
+        # редкий путь, его выполняет синхронный сервис в пуле потоков
+        return await run_in_threadpool(
+            get_cars_with_filters,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            title=title,
+            price_from=price_from,
+            price_to=price_to,
+            year_from=year_from,
+            year_to=year_to,
+            country=country,
+            cursor=cursor,
+            q=q
+        )
+
+    if not title and (q or not cursor):
+        # Индекс в памяти: ввода-вывода нет, но фильтрация и поиск q занимают процессор
+        # (до сотен мс на большом каталоге) — в пуле потоков, чтобы не останавливать цикл событий
+        result = await run_in_threadpool(
+            query_catalog_index,
+            index,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            price_from=price_from,
+            price_to=price_to,
+            year_from=year_from,
+            year_to=year_to,
+            country=country,
+            q=q,
+            cursor=cursor
+        )
+        cars_query_cache.set(cache_key, result, generation=cache_generation)
+        return result
+
+    query, sort = build_cars_query(
+        sort_by=sort_by,
+        sort_order=sort_order,
+        title=title,
+        price_from=price_from,
+        price_to=price_to,
+        year_from=year_from,
+        year_to=year_to,
+        country=country,
+        q=q
+    )
+    # Подсчёт и страница — два независимых запроса, выполняются одновременно
+    total_cars, (paginated_cars, next_page_cursor) = await asyncio.gather(
+        async_cars_collection.count_documents(query),
+        find_page_async(
+            async_cars_collection, query, page, page_size, cursor,
+            sort=sort or CAR_DEFAULT_SORT,
+            projection=CAR_RECORD_PROJECTION
+        )
+    )
+
+    result = {
+        "total": total_cars,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_page_cursor,
+        "data": json.loads(json.dumps(paginated_cars, default=str))
+    }
+    cars_query_cache.set(cache_key, result, generation=cache_generation)
+    return result
+
+async def search_cities(query: str, limit: int = 10):
+    """Асинхронный city_service.search_cities"""
+    if not query or len(query) < 2:
+        return []
+    cities = await async_cities_collection.find(build_city_search_query(query)).limit(limit).to_list()
+    return [City(**city) for city in cities]
+
+async def get_reviews(page: int = 1, page_size: int = 10, rating: int = None, status: str = None, cursor: str = None):
+    """Асинхронный review_service.get_reviews"""
+    try:
+        query = build_reviews_query(rating, status)
+        total, (items, next_page_cursor) = await asyncio.gather(
+            async_reviews_collection.count_documents(query),
+            find_page_async(async_reviews_collection, query, page, page_size, cursor)
+        )
+        for item in items:
+            item["_id"] = str(item["_id"])
+        return {"total": total, "page": page, "page_size": page_size, "next_cursor": next_page_cursor, "data": items}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get reviews: {str(e)}")
+
+async def get_user_profile(current_user: dict):
+    """Асинхронный user_service.get_user_profile"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    telegram_id = current_user.get("user_id")
+    user = await async_users_collection.find_one({"telegram_id": telegram_id}, {"_id": 0})
+    if not user:
+        user = token_profile(current_user)
+    return {"success": True, "user": user}
+
+async def get_applications(application_type: str, page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
+    """
+    Список заявок любого типа (ключи APPLICATION_COLLECTIONS) —
+    асинхронный аналог get_*_applications из сервисов заявок.
+    """
+    collection = ASYNC_APPLICATION_COLLECTIONS[application_type]
+    try:
+        filter_query = {}
+        if status:
+            filter_query["status"] = status
+
+        total, (applications, next_page_cursor) = await asyncio.gather(
+            collection.count_documents(filter_query),
+            find_page_async(collection, filter_query, page, page_size, cursor)
+        )
+
+        for app in applications:
+            if application_type in _APPLICATIONS_WITH_MONGO_ID:
+                app["_id"] = str(app["_id"])
+            else:
+                app["id"] = str(app["_id"])
+                del app["_id"]
+
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_page_cursor,
+            "data": applications
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
@@ -0,0 +1,232 @@
+import threading
+import time
+from contextlib import contextmanager
+from selenium import webdriver
+from app.config.settings import (
+    SELENIUM_URL,
+    SELENIUM_POOL_SIZE,
+    SELENIUM_SESSION_MAX_PAGES,
+    SELENIUM_ACQUIRE_TIMEOUT,
+    SELENIUM_KEEPALIVE_INTERVAL
+)
+
+def create_chrome_driver():
+    """Новая сессия Chrome в Selenium Grid"""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-web-security')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    return webdriver.Remote(
+        command_executor=SELENIUM_URL,
+        options=options
+    )
+
+class PooledDriver:
+    """Сессия браузера в пуле и сколько страниц она уже открыла"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+class DriverPool:
+    """
+    Пул тёплых сессий Selenium: не больше size сессий одновременно.
+    Перед выдачей сессия проверяется; после max_pages страниц или ошибки
+    внутри session() она закрывается и при следующем запросе создаётся новая.
+    Фоновый поток поддерживает свободные сессии живыми, чтобы Grid не закрыл их по таймауту.
+    """
+
+    def __init__(
+        self,
+        factory=create_chrome_driver,
+        size: int = SELENIUM_POOL_SIZE,
+        max_pages: int = SELENIUM_SESSION_MAX_PAGES,
+        acquire_timeout: float = SELENIUM_ACQUIRE_TIMEOUT
+    ):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.acquire_timeout = acquire_timeout
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._keepalive = None
+        self._cond = threading.Condition()
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "failed_checks": 0, "wait_seconds": 0.0}
+
+    @staticmethod
+    def is_alive(driver):
+        """Сессия отвечает на команды"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(entry):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Ошибка закрытия браузера: {e}")
+
+    def _create(self):
+        """Создаёт сессию для уже зарезервированного слота"""
+        try:
+            entry = PooledDriver(self.factory())
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+        return entry
+
+    def acquire(self):
+        """Берёт свободную сессию или создаёт новую; ждёт не дольше acquire_timeout"""
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        entry = None
+        with self._cond:
+            while not self._idle and self._total >= self.size:
+                if self._closed:
+                    raise RuntimeError("Пул браузеров закрыт")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Нет свободной сессии браузера за {self.acquire_timeout}s")
+                self._cond.wait(remaining)
+            if self._closed:
+                raise RuntimeError("Пул браузеров закрыт")
+            self._stats["wait_seconds"] += time.monotonic() - started
+            if self._idle:
+                entry = self._idle.pop()
+            else:
+                self._total += 1
+
+        if entry is None:
+            return self._create()
+        if self.is_alive(entry.driver):
+            with self._cond:
+                self._stats["reused"] += 1
+            return entry
+
+        # Сессия умерла (таймаут Grid, падение браузера) — заменяем в том же слоте
+        self._quit(entry)
+        with self._cond:
+            self._stats["failed_checks"] += 1
+        return self._create()
+
+    def _release_slot(self):
+        self._total -= 1
+        self._cond.notify()
+
+    def release(self, entry, broken=False):
+        """Возвращает сессию в пул или закрывает её, если пора пересоздать"""
+        entry.pages += 1
+        recycle = broken or entry.pages >= self.max_pages or self._closed
+        if recycle:
+            self._quit(entry)
+        with self._cond:
+            if recycle:
+                self._stats["recycled"] += 1
+                self._release_slot()
+            else:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    @contextmanager
+    def session(self):
+        """Сессия браузера на время блока; при исключении она пересоздаётся"""
+        entry = self.acquire()
+        broken = False
+        try:
+            yield entry.driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(entry, broken)
+
+    def warm(self):
+        """Доводит число сессий до size"""
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            entry = self._create()
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def check_idle(self):
+        """Проверяет свободные сессии, закрывает мёртвые; возвращает число живых"""
+        with self._cond:
+            entries, self._idle = self._idle, []
+        alive = []
+        for entry in entries:
+            if self.is_alive(entry.driver):
+                alive.append(entry)
+            else:
+                self._quit(entry)
+        with self._cond:
+            self._stats["failed_checks"] += len(entries) - len(alive)
+            self._total -= len(entries) - len(alive)
+            self._idle.extend(alive)
+            self._cond.notify_all()
+        return len(alive)
+
+    def _keepalive_loop(self, interval):
+        while not self._closed:
+            try:
+                self.check_idle()
+                self.warm()
+            except Exception as e:
+                print(f"⚠️ Пул браузеров: не удалось подготовить сессию: {e}")
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed, timeout=interval)
+
+    def start(self, interval: float = SELENIUM_KEEPALIVE_INTERVAL):
+        """Запускает фоновый прогрев и поддержание сессий"""
+        with self._cond:
+            if self._keepalive is not None or self._closed:
+                return
+            self._keepalive = threading.Thread(
+                target=self._keepalive_loop,
+                args=(interval,),
+                name="browser-pool-keepalive",
+                daemon=True
+            )
+        self._keepalive.start()
+
+    def close(self):
+        """Закрывает свободные сессии; занятые закроются при возврате"""
+        with self._cond:
+            self._closed = True
+            entries, self._idle = self._idle, []
+            self._total -= len(entries)
+            self._cond.notify_all()
+        for entry in entries:
+            self._quit(entry)
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                "wait_seconds": round(self._stats["wait_seconds"], 3),
+                "size": self.size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+            }
+
+# Пул сессий браузера текущего процесса
+driver_pool = DriverPool()
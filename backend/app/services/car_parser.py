@@ -1,80 +1,82 @@
 import random
-import time
-import urllib.parse
+import threading
+from collections import Counter
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from pathlib import Path
+from requests.adapters import HTTPAdapter
 from app.config.settings import (
-    STATIC_IMAGES_DIR, 
-    SELENIUM_URL, 
-    SCRAPING_URL, 
-    SCRAPING_TIMEOUT, 
-    SCRAPING_DELAY
+    STATIC_IMAGES_DIR,
+    SCRAPING_URL,
+    SCRAPING_TIMEOUT,
+    SCRAPING_EXTRA_URLS,
+    SCRAPING_MAX_PAGES,
+    SCRAPING_WORKERS,
+    SCRAPING_PAGE_RATE,
+    SCRAPING_RENDER_TIMEOUT,
+    SCRAPING_SCROLL_TIMEOUT,
+    SCRAPING_SCROLL_SETTLE,
+    SCRAPING_FETCH_MODE,
+    SCRAPING_HTTP_MIN_LISTINGS
 )
-from app.config.database import scrape_cache
+from app.services.scrape_cache_store import ScrapeCacheWriter
+from app.services.listing_crawler import ListingCrawler
+from app.services.browser_pool import driver_pool
+from app.services.page_waits import wait_for_listings, scroll_until_settled
+from app.services.scrape_runs import ScrapeRunProfile, save_scrape_run
+from app.services.listing_parser import listing_parser, layout_key, CAR_CONTAINER_SELECTORS
+from app.services.selector_store import load_selector_ranking, record_selector_hits
+from app.services.image_downloader import image_downloader
+from app.services.image_derivatives import image_processor
+from app.services.image_store import image_store, image_key, STATIC_URL_PREFIX
+
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Referer': 'https://www.che168.com/',
+}
+
+# Ответы, после которых обычный HTTP-клиент считается заблокированным
+BLOCKED_STATUSES = {403, 429, 503}
+BLOCKED_MARKERS = ('验证码', 'captcha', '访问过于频繁', '安全验证')
 
 def download_and_save_image(image_url, car_id):
     """
     Скачивает изображение и сохраняет в статическую папку
     Возвращает локальный URL или None если не удалось
     """
-    if not image_url or image_url == "":
+    return image_downloader.download(image_url, car_id)["local_url"]
+
+def download_car_images(car_list):
+    """Параллельно скачивает изображения автомобилей и проставляет local_image_url"""
+    jobs = [(car["image_url"], car["car_id"]) for car in car_list if car.get("image_url")]
+    if not jobs:
         return None
-    
+    reports, summary = image_downloader.download_many(jobs)
+    local_urls = {report["car_id"]: report["local_url"] for report in reports}
+    for car in car_list:
+        if car["car_id"] in local_urls:
+            car["local_image_url"] = local_urls[car["car_id"]]
+    return summary
+
+def build_car_image_variants(car_list):
+    """Строит уменьшенные копии и заглушки скачанных изображений в пуле процессов"""
+    cars = [car for car in car_list if car.get("local_image_url")]
+    jobs = [
+        (STATIC_IMAGES_DIR / car["local_image_url"][len(STATIC_URL_PREFIX):], image_key(car["local_image_url"]))
+        for car in cars
+    ]
+    for car, manifest in zip(cars, image_processor.process_many(jobs)):
+        car["image_variants"] = manifest
+
+def _materialize_car_records(car_list):
+    """Строит read-модель cars сразу после записи кэша"""
+    # Импорт внутри функции: car_service сам импортирует этот модуль
+    from app.services.car_service import materialize_car_records
+
     try:
-        # Создаем безопасное имя файла из car_id
-        safe_filename = "".join(c for c in str(car_id) if c.isalnum() or c in ('-', '_'))
-        
-        # Определяем расширение файла
-        parsed_url = urllib.parse.urlparse(image_url)
-        path = parsed_url.path.lower()
-        
-        if path.endswith(('.jpg', '.jpeg')):
-            extension = '.jpg'
-        elif path.endswith('.png'):
-            extension = '.png'
-        elif path.endswith('.webp'):
-            extension = '.webp'
-        else:
-            extension = '.jpg'  # Дефолтное расширение
-        
-        filename = f"{safe_filename}{extension}"
-        file_path = STATIC_IMAGES_DIR / filename
-        
-        # Проверяем, не скачано ли уже это изображение
-        if file_path.exists():
-            return f"/static/images/{filename}"
-        
-        # Скачиваем изображение
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': 'https://www.che168.com/',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-        }
-        
-        response = requests.get(image_url, headers=headers, timeout=SCRAPING_TIMEOUT, stream=True)
-        response.raise_for_status()
-        
-        # Проверяем что это действительно изображение
-        content_type = response.headers.get('content-type', '').lower()
-        if not content_type.startswith('image/'):
-            print(f"Warning: URL {image_url} не является изображением (content-type: {content_type})")
-            return None
-        
-        # Сохраняем файл
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        print(f"Изображение сохранено: {filename}")
-        
-        # Возвращаем локальный URL
-        return f"/static/images/{filename}"
-        
+        materialize_car_records(car_list)
     except Exception as e:
-        print(f"Ошибка скачивания изображения {image_url}: {e}")
-        return None
+        print(f"❌ Ошибка построения read-модели cars: {e}")
 
 def get_mock_cars():
     """Generates a list of mock car data."""
@@ -93,36 +95,30 @@ def get_mock_cars():
         })
     return cars
 
-def scrape_and_cache_cars():
-    """Scrapes car data from the website and caches it."""
-    url = SCRAPING_URL
+def _report_progress(progress, phase, **details):
+    """Передаёт этап парсинга в задачу, если она следит за прогрессом"""
+    if progress:
+        progress(phase, **details)
+
+def fetch_page_source(driver, url, profile=None, save_debug=False):
+    """
+    Открывает страницу списка и возвращает HTML, когда список отрисован
+    и число объявлений перестало расти при прокрутке (или вышел дедлайн).
+    """
+    profile = profile or ScrapeRunProfile()
+    print(f"Переходим на сайт: {url}")
+    with profile.phase("navigate"):
+        driver.get(url)
     
-    options = webdriver.ChromeOptions()
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--disable-web-security')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
+    # Убираем детектирование автоматизации
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
-    driver = webdriver.Remote(
-        command_executor=SELENIUM_URL,
-        options=options
-    )
+    with profile.phase("render"):
+        listings = wait_for_listings(driver, CAR_CONTAINER_SELECTORS, SCRAPING_RENDER_TIMEOUT)
+    if not listings:
+        print(f"⚠️ {url}: список не появился за {SCRAPING_RENDER_TIMEOUT}s")
     
-    try:
-        print(f"Переходим на сайт: {url}")
-        driver.get(url)
-        
-        # Ждем загрузки страницы
-        driver.implicitly_wait(15)
-        time.sleep(5)  # Дополнительная пауза для полной загрузки
-        
-        # Убираем детектирование автоматизации
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
+    if save_debug:
         # Save screenshot для отладки
         driver.save_screenshot("debug_screenshot.png")
         print("Screenshot saved as debug_screenshot.png")
@@ -131,232 +127,249 @@ def scrape_and_cache_cars():
         with open("debug_page_source.html", "w", encoding="utf-8") as f:
             f.write(driver.page_source)
         print("Page source saved as debug_page_source.html")
-        
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        
-        # Попробуем прокрутить страницу для загрузки динамического контента
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
-        
-        # Обновляем soup после прокрутки
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        
-    finally:
-        driver.quit()
+    
+    # Прокручиваем, пока подгружается динамический контент
+    with profile.phase("scroll"):
+        scroll_until_settled(driver, CAR_CONTAINER_SELECTORS, SCRAPING_SCROLL_TIMEOUT, SCRAPING_SCROLL_SETTLE)
+    
+    return driver.page_source
 
-    car_list = []
+def parse_listing_page(url, html):
+    """
+    Разбирает страницу списка: (автомобили, ссылки на другие страницы списка,
+    счётчики сработавших селекторов {field: {selector: count}}).
+    """
+    cars, used_selector, next_urls, selector_hits = listing_parser.parse(html, url)
+    print(f"🔍 {url}: {len(cars)} автомобилей, селектор: {used_selector}")
+    return cars, next_urls, selector_hits
 
-    # Расширенный список селекторов для поиска автомобилей на che168.com
-    selectors_to_try = [
-        # Основные списки автомобилей
-        "div[class*='viewlist_li']",          # Основной класс списка на che168.com  
-        "li[class*='list-item']",             # li элементы списка
-        "div[class*='list-item']",            # div элементы списка
-        ".list-item",                         # Простой класс списка
-        
-        # Карточки автомобилей
-        "div[class*='car-card']",             # Карточки автомобилей
-        "div[class*='item-pic']",             # Элементы с картинками
-        "div[class*='pic-box']",              # Контейнеры картинок
-        
-        # Результаты поиска
-        "div[class*='search-result']",        # Результаты поиска
-        "article",                            # Семантические элементы
-        
-        # Fallback селекторы
-        "[data-testid*='car']",               # data атрибуты
-        ".used-car-item",                     # Подержанные автомобили
-        ".sale-car",                          # Продаваемые авто
-        "li[class*='car']",                   # li элементы с car
+class PageBlockedError(Exception):
+    """Сайт не отдал страницу обычному HTTP-клиенту (антибот, капча, лимит)"""
+
+def _create_http_session():
+    session = requests.Session()
+    session.headers.update(PAGE_HEADERS)
+    adapter = HTTPAdapter(pool_connections=SCRAPING_WORKERS, pool_maxsize=SCRAPING_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Общая сессия с пулом соединений для загрузки страниц без браузера
+page_http_session = _create_http_session()
+
+def fetch_page_http(url, timeout=SCRAPING_TIMEOUT):
+    """HTML страницы обычным запросом; PageBlockedError, если сайт его не пустил"""
+    response = page_http_session.get(url, timeout=timeout)
+    if response.status_code in BLOCKED_STATUSES:
+        raise PageBlockedError(f"status {response.status_code}")
+    response.raise_for_status()
+
+    # che168 отдаёт gb2312 в meta, а не в заголовке; gb18030 — его надмножество
+    encoding = response.encoding if "charset" in response.headers.get("content-type", "").lower() else None
+    encoding = (encoding or response.apparent_encoding or "utf-8").lower()
+    if encoding in ("gb2312", "gbk"):
+        encoding = "gb18030"
+    html = response.content.decode(encoding, errors="replace")
+
+    if any(marker in html for marker in BLOCKED_MARKERS):
+        raise PageBlockedError("страница проверки вместо списка")
+    return html
+
+class PageLoader:
+    """
+    Стратегия загрузки страницы списка (SCRAPING_FETCH_MODE):
+    auto — сначала обычный HTTP-запрос, браузер только если сайт заблокировал запрос
+    или разбор дал меньше SCRAPING_HTTP_MIN_LISTINGS объявлений; после блокировки
+    HTTP в этом парсинге больше не пробуется. http и browser — только один способ.
+    Для каждой страницы записывается, каким способом она получена (path).
+    """
+
+    def __init__(self, profile, mode: str = SCRAPING_FETCH_MODE, debug_url: str = None):
+        self.profile = profile
+        self.mode = mode
+        self.debug_url = debug_url
+        self._http_blocked = threading.Event()
+
+    def _parse(self, url, html):
+        with self.profile.phase("parse"):
+            return parse_listing_page(url, html)
+
+    def _save_debug(self, url, html):
+        if url == self.debug_url:
+            with open("debug_page_source.html", "w", encoding="utf-8") as f:
+                f.write(html)
+            print("Page source saved as debug_page_source.html")
+
+    def _load_http(self, url):
+        with self.profile.phase("http_fetch"):
+            html = fetch_page_http(url)
+        self._save_debug(url, html)
+        return self._parse(url, html)
+
+    def _load_browser(self, url):
+        with driver_pool.session() as driver:
+            html = fetch_page_source(driver, url, self.profile, save_debug=(url == self.debug_url))
+        return self._parse(url, html)
+
+    def load(self, url):
+        fallback_reason = None
+        if self.mode != "browser" and not self._http_blocked.is_set():
+            try:
+                cars, links, selectors = self._load_http(url)
+                if self.mode == "http" or len(cars) >= SCRAPING_HTTP_MIN_LISTINGS:
+                    return {"cars": cars, "links": links, "selectors": selectors, "path": "http"}
+                fallback_reason = f"http: {len(cars)} объявлений"
+            except PageBlockedError as e:
+                if self.mode == "http":
+                    raise
+                self._http_blocked.set()
+                fallback_reason = f"http заблокирован: {e}"
+            except Exception as e:
+                if self.mode == "http":
+                    raise
+                fallback_reason = f"http ошибка: {e}"
+            print(f"🌐 {url}: переходим на браузер ({fallback_reason})")
+
+        cars, links, selectors = self._load_browser(url)
+        return {
+            "cars": cars,
+            "links": links,
+            "selectors": selectors,
+            "path": "browser",
+            "fallback_reason": fallback_reason
+        }
+
+def get_test_cars():
+    """Тестовые автомобили на случай, если парсинг ничего не нашёл"""
+    return [
+        {
+            "title": f"测试汽车 {i+1}号 - Test Car #{i+1}",
+            "price": f"{random.randint(15, 45)}万",
+            "image_url": f"https://picsum.photos/seed/{i+100}/800/600",
+            "local_image_url": None,
+            "car_id": f"test_car_{i}"
+        }
+        for i in range(10)
     ]
+
+def scrape_and_cache_cars(progress=None):
+    """
+    Scrapes car data from the website and caches it.
+    Обходит SCRAPING_URL, SCRAPING_EXTRA_URLS и найденные страницы пагинации
+    (не больше SCRAPING_MAX_PAGES) в SCRAPING_WORKERS потоках. Страница загружается
+    обычным HTTP-запросом, браузер из driver_pool — только когда его не хватило (PageLoader).
+    Автомобили каждой страницы сразу пишутся в новое, ещё невидимое поколение кэша;
+    поколение становится активным после обхода всех страниц.
+    Время этапов сохраняется документом в scrape_runs.
+    progress(phase, **details) — необязательный колбэк для фоновых задач парсинга.
+    """
+    profile = ScrapeRunProfile()
+    pages = {"done": 0, "failed": 0, "paths": {}}
+    car_list = []
+    try:
+        car_list = _crawl_and_cache(profile, pages, progress)
+    except Exception as e:
+        save_scrape_run(
+            profile, "failed", e,
+            pages=pages["done"], failed_pages=pages["failed"], fetch_paths=pages["paths"], cars=len(car_list)
+        )
+        raise
+    save_scrape_run(
+        profile, "succeeded",
+        pages=pages["done"], failed_pages=pages["failed"], fetch_paths=pages["paths"], cars=len(car_list)
+    )
+    return car_list
+
+def _crawl_and_cache(profile, pages, progress):
+    start_urls = [SCRAPING_URL] + SCRAPING_EXTRA_URLS
+    _report_progress(progress, "fetch", mode=SCRAPING_FETCH_MODE, pool=driver_pool.stats())
     
-    car_containers = []
-    used_selector = None
+    # Селекторы, сработавшие в прошлых парсингах, пробуются первыми
+    listing_parser.learn(load_selector_ranking())
+    selector_hits = Counter()
     
-    print(f"🔍 Попробуем {len(selectors_to_try)} селекторов для поиска автомобилей...")
+    # Страница загружается HTTP-запросом или в тёплой сессии из пула браузеров
+    loader = PageLoader(profile, debug_url=start_urls[0])
     
-    for selector in selectors_to_try:
-        car_containers = soup.select(selector)
-        print(f"   Селектор '{selector}': найдено {len(car_containers)} элементов")
-        
-        if car_containers and len(car_containers) > 2:  # Минимум 3 элемента
-            print(f"✅ Выбран селектор '{selector}' с {len(car_containers)} элементами")
-            used_selector = selector
-            break
-        elif car_containers and len(car_containers) > 0:
-            # Проверим, содержат ли элементы признаки автомобилей
-            has_car_content = False
-            for container in car_containers[:3]:  # Проверяем первые 3
-                text_content = container.get_text().lower()
-                if any(keyword in text_content for keyword in ['万', '车', '汽车', 'bmw', 'audi', 'toyota']):
-                    has_car_content = True
-                    break
-            
-            if has_car_content:
-                print(f"✅ Выбран селектор '{selector}' с {len(car_containers)} элементами (найден автомобильный контент)")
-                used_selector = selector
-                break
+    crawler = ListingCrawler(
+        loader.load,
+        max_pages=SCRAPING_MAX_PAGES,
+        workers=SCRAPING_WORKERS,
+        host_rate_limit=SCRAPING_PAGE_RATE
+    )
     
-    # Дополнительная отладка: показываем структуру первых найденных элементов
-    if car_containers:
-        print(f"\n📋 Анализ первых найденных элементов:")
-        for i, container in enumerate(car_containers[:3]):
-            print(f"   Элемент {i+1}:")
-            print(f"      Тег: {container.name}")
-            print(f"      Классы: {container.get('class', [])}")
-            text_preview = container.get_text()[:100].replace('\n', ' ').strip()
-            print(f"      Текст: {text_preview}...")
+    car_list = []
+    seen_car_ids = set()
+    first_error = None
+    writer = None
     
-    # Если ничего не найдено стандартными селекторами
-    if not car_containers:
-        print("❌ Автомобили не найдены стандартными селекторами")
-        print("🔍 Пробуем альтернативный подход через поиск изображений...")
-        
-        # Попробуем найти изображения с подписями автомобилей
-        all_images = soup.find_all("img")
-        print(f"   Всего изображений на странице: {len(all_images)}")
+    for page in crawler.crawl(start_urls):
+        if page["error"] is not None:
+            pages["failed"] += 1
+            first_error = first_error or page["error"]
+            print(f"❌ Ошибка обхода страницы {page['url']}: {page['error']}")
+            continue
+        pages["done"] += 1
+        pages["paths"][page["path"]] = pages["paths"].get(page["path"], 0) + 1
+        layout = layout_key(page["url"])
+        for field, counts in page["selectors"].items():
+            for selector, count in counts.items():
+                selector_hits[(layout, field, selector)] += count
         
-        car_related_images = []
+        page_cars = []
+        for car in page["cars"]:
+            if car["car_id"] in seen_car_ids:
+                print(f"↩️ Дубликат автомобиля {car['car_id']} пропущен")
+                continue
+            seen_car_ids.add(car["car_id"])
+            page_cars.append(car)
         
-        for img in all_images:
-            alt_text = img.get('alt', '').lower()
-            src = img.get('src', '')
-            title = img.get('title', '').lower()
-            
-            # Ищем изображения, которые могут быть автомобилями
-            car_keywords = ['车', 'car', '汽车', '奔驰', '宝马', '奥迪', '丰田', '本田', '大众', '比亚迪', 'bmw', 'audi', 'toyota', 'honda']
-            if any(keyword in alt_text + title for keyword in car_keywords):
-                parent = img.find_parent()
-                if parent and parent not in car_related_images:
-                    car_related_images.append(parent)
-                    print(f"   Найдено изображение автомобиля: {alt_text[:50]}...")
+        if page_cars:
+            # Изображения страницы скачиваются пулом с лимитом частоты на хост
+            with profile.phase("download"):
+                download_car_images(page_cars)
+            with profile.phase("derive"):
+                build_car_image_variants(page_cars)
+            with profile.phase("persist"):
+                writer = writer or ScrapeCacheWriter()
+                writer.add(page_cars)
+            car_list.extend(page_cars)
         
-        if car_related_images:
-            car_containers = car_related_images[:20]  # Ограничиваем до 20
-            print(f"🔍 Найдено {len(car_containers)} потенциальных автомобилей через изображения")
-            used_selector = "image-based-search"
+        _report_progress(
+            progress, "crawl",
+            pages=pages["done"], failed_pages=pages["failed"], paths=pages["paths"], cars=len(car_list)
+        )
     
-    # Если все еще ничего не найдено, создаем тестовые данные
-    if not car_containers:
-        print("🚨 Парсинг не удался - создаем тестовые данные")
-        
-        for i in range(10):
-            car_id = f"test_car_{i}"
-            test_image_url = f"https://picsum.photos/seed/{i+100}/800/600"
-            
-            # Скачиваем тестовое изображение
-            print(f"📸 Скачиваем тестовое изображение {i+1}/10...")
-            local_image_url = download_and_save_image(test_image_url, car_id)
-            time.sleep(0.5)  # Короткая задержка
-            
-            car_list.append({
-                "title": f"测试汽车 {i+1}号 - Test Car #{i+1}",
-                "price": f"{random.randint(15, 45)}万",
-                "image_url": test_image_url,
-                "local_image_url": local_image_url,
-                "car_id": car_id
-            })
-        
-        # Сохраняем в кэш
-        if car_list:
-            scrape_cache.delete_many({})
-            scrape_cache.insert_many(car_list)
-            
-        return car_list
+    # Ни одна страница не загрузилась — это ошибка парсинга, а не пустой каталог
+    if pages["done"] == 0 and first_error is not None:
+        raise first_error
     
-    print(f"🔄 Обрабатываем {len(car_containers)} найденных элементов...")
+    scraped = bool(car_list)
     
-    for i, car_container in enumerate(car_containers):
-        try:
-            # Расширенный поиск заголовка
-            title = None
-            title_selectors = [
-                "h3", "h4", "h5", ".title", ".car-name", ".name",
-                "[class*='title']", "[class*='name']", "a[title]",
-                ".series-name", ".model-name", ".car-title"
-            ]
-            
-            for title_selector in title_selectors:
-                title_element = car_container.select_one(title_selector)
-                if title_element:
-                    title_text = title_element.get('title') or title_element.text.strip()
-                    if title_text and len(title_text) > 2:
-                        title = title_text
-                        break
-            
-            # Расширенный поиск цены
-            price = None
-            price_selectors = [
-                ".price", "[class*='price']", ".money", "[class*='money']",
-                "span[style*='color: rgb(255']", ".sale-price", ".current-price"
-            ]
-            
-            for price_selector in price_selectors:
-                price_element = car_container.select_one(price_selector)
-                if price_element:
-                    price_text = price_element.text.strip()
-                    # Ищем числа с "万"
-                    if '万' in price_text or any(char.isdigit() for char in price_text):
-                        price = price_text
-                        break
-            
-            # Расширенный поиск изображения
-            image_url = ""
-            image_element = car_container.find("img")
-            if image_element:
-                # Проверяем разные атрибуты для URL изображения
-                for attr in ['src', 'data-src', 'data-original', 'data-lazy', 'data-img']:
-                    url = image_element.get(attr)
-                    if url and url != 'data:image' and 'placeholder' not in url.lower():
-                        # Исправляем относительные URL
-                        if url.startswith('//'):
-                            image_url = 'https:' + url
-                        elif url.startswith('/'):
-                            image_url = 'https://www.che168.com' + url
-                        elif url.startswith('http'):
-                            image_url = url
-                        else:
-                            image_url = 'https:' + url
-                        break
-
-            # Добавляем только если есть название
-            if title and len(title.strip()) > 2:
-                # Если нет цены, создаем случайную
-                if not price:
-                    price = f"{random.randint(15, 50)}万"
-                
-                # Генерируем уникальный ID для автомобиля
-                car_id = f"che168_{len(car_list)}_{hash(title + price) % 10000}"
-                
-                # Скачиваем изображение если есть URL
-                local_image_url = None
-                if image_url:
-                    print(f"📸 Скачиваем изображение для: {title[:30]}...")
-                    local_image_url = download_and_save_image(image_url, car_id)
-                    time.sleep(SCRAPING_DELAY)  # Задержка между скачиваниями
-                
-                car_list.append({
-                    "title": title,
-                    "price": price,
-                    "image_url": image_url,
-                    "local_image_url": local_image_url,
-                    "car_id": car_id
-                })
-                
-                print(f"✅ Добавлен автомобиль #{len(car_list)}: {title[:30]}... - {price}")
-            
-        except Exception as e:
-            print(f"❌ Ошибка обработки элемента {i}: {e}")
-            continue
+    # Если ничего не найдено, создаем тестовые данные
+    if not car_list:
+        print("🚨 Парсинг не удался - создаем тестовые данные")
+        car_list = get_test_cars()
+        _report_progress(progress, "images", cars=len(car_list))
+        with profile.phase("download"):
+            download_car_images(car_list)
+        with profile.phase("derive"):
+            build_car_image_variants(car_list)
+        with profile.phase("persist"):
+            writer = ScrapeCacheWriter()
+            writer.add(car_list)
     
-    print(f"🎉 Успешно обработано {len(car_list)} автомобилей с селектором: {used_selector}")
+    print(f"🎉 Обработано {len(car_list)} автомобилей с {pages['done']} страниц (ошибок: {pages['failed']})")
     
-    # Сохраняем в кэш только если есть данные
-    if car_list:
-        scrape_cache.delete_many({})
-        scrape_cache.insert_many(car_list)
+    _report_progress(progress, "persist", cars=len(car_list))
+    with profile.phase("persist"):
+        writer.commit()
         print(f"💾 Данные сохранены в кэш")
-    else:
-        print("⚠️ Нет данных для сохранения в кэш")
-        
+        image_store.record_refs(car_list)
+        _materialize_car_records(car_list)
+    
+    # Запоминаем сработавшие селекторы только по успешному парсингу настоящих данных
+    if scraped:
+        record_selector_hits(selector_hits, pages["done"])
+    
     return car_list
@@ -1,220 +1,56 @@
 import re
 import json
+import threading
 from datetime import datetime
-from app.config.database import scrape_cache
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from app.config.database import cars_collection
 from app.services.car_parser import scrape_and_cache_cars
+from app.services.pagination import find_page, next_cursor, decode_cursor
+from app.services.catalog_index import catalog_index
+from app.services.scrape_jobs import scrape_jobs
+from app.services.scrape_cache_store import load_active_cars, count_active_cars
+from app.services.query_cache import cars_query_cache
+from app.services.title_parser import title_parser
+from app.services.image_derivatives import srcset, size_url
 
-def structure_car_data(car_data):
-    """
-    Структурирует данные автомобиля, извлекая все параметры из title
-    """
+# Версия правил извлечения данных из title.
+# Увеличивайте при изменении structure_car_data, чтобы фоновая задача
+# пересобрала записи read-модели cars.
+CAR_EXTRACTION_VERSION = 2
+
+# Поля read-модели, которые не отдаются в API
+CAR_RECORD_PROJECTION = {"_id": 0, "extraction_version": 0}
+
+def parse_car_title(title):
+    """Извлекает (year, brand, model, country) из заголовка объявления"""
+    # Регулярки и индексы брендов собраны один раз в title_parser
+    year = title_parser.extract_year(title)
+    brand = title_parser.extract_brand(title)
+    model = title_parser.extract_model(title, brand)
+    country = title_parser.country_by_brand(brand)
+    return year, brand, model, country
+
+def _car_images(car_data):
+    """Изображения автомобиля: оригинал, копии по размерам (srcset) и размытая заглушка"""
+    variants = car_data.get("image_variants") or {}
+    return {
+        "local_url": car_data.get("local_image_url") or "",
+        "original_url": car_data.get("image_url", ""),
+        "thumbnail": size_url(variants, "thumb"),
+        "card": size_url(variants, "card"),
+        "srcset": srcset(variants),
+        "placeholder": variants.get("placeholder"),
+        "width": variants.get("width"),
+        "height": variants.get("height"),
+    }
+
+def _structured_car(car_data, year, brand, model, country, price_value):
+    """Собирает структурированный объект автомобиля из извлечённых значений"""
     title = car_data.get("title", "")
     price = car_data.get("price", "0万")
     
-    # Извлечение года
-    def extract_year(text):
-        # print(f"🔍 Извлекаем год из: {text}")
-        
-        # Ищем 4-значные числа, которые могут быть годами (1990-2024)
-        # Добавляем поддержку китайских символов
-        year_patterns = [
-            r'\b(20[0-2][0-9])\b',  # 2020, 2021, 2022, 2023, 2024
-            r'\b(19[9][0-9])\b',    # 1990-1999
-            r'(20[0-2][0-9])',      # Без границ слова
-            r'(19[9][0-9])'         # Без границ слова
-        ]
-        
-        for pattern in year_patterns:
-            year_match = re.search(pattern, text)
-            if year_match:
-                year = int(year_match.group())
-                # print(f"   Найден год: {year}")
-                # Проверяем, что год в разумных пределах
-                if year >= 1990 and year <= 2024:
-                    return year
-                else:
-                    print(f"   Год {year} вне допустимых пределов")
-        
-        print(f"   Год не найден в тексте: {text}")
-        return None
-    
-    # Извлечение бренда (китайские и международные)
-    def extract_brand(text):
-        chinese_brands = [
-            '奔驰', '宝马', '奥迪', '大众', '丰田', '本田', '日产', '马自达', '斯巴鲁', '雷克萨斯',
-            '现代', '起亚', '特斯拉', '比亚迪', '蔚来', '小鹏', '理想', '吉利', '长城', '哈弗',
-            '博越', '星越', '威尔法', '路虎', '北京越野', '哈弗大狗', 'Polo'
-        ]
-        
-        english_brands = [
-            'BMW', 'Mercedes', 'Audi', 'Volkswagen', 'Toyota', 'Honda', 'Nissan', 'Mazda',
-            'Subaru', 'Lexus', 'Hyundai', 'KIA', 'Tesla', 'BYD', 'NIO', 'XPeng', 'Li Auto',
-            'Geely', 'Great Wall', 'Haval', 'Land Rover'
-        ]
-        
-        # Проверяем китайские бренды
-        for brand in chinese_brands:
-            if brand in text:
-                return brand
-        
-        # Проверяем английские бренды
-        for brand in english_brands:
-            if brand.lower() in text.lower():
-                return brand
-        
-        # Если не найден, берем первое слово
-        words = text.split()
-        return words[0] if words else "Unknown"
-    
-    # Извлечение модели
-    def extract_model(text, brand):
-        if not brand or brand == "Unknown":
-            return "Unknown Model"
-        
-        # Убираем бренд из названия
-        text_without_brand = text.replace(brand, '').strip()
-        
-        # Ищем год и убираем его
-        year_match = re.search(r'\b(20[0-2][0-9]|19[9][0-9])\b', text_without_brand)
-        if year_match:
-            text_without_brand = text_without_brand.replace(year_match.group(), '').strip()
-        
-        # Берем первые несколько слов как модель
-        words = text_without_brand.split()
-        model_words = []
-        for word in words[:3]:  # Максимум 3 слова для модели
-            if word and not re.match(r'^\d+[\.\d]*[LT]?$', word):  # Исключаем объемы двигателя
-                model_words.append(word)
-        
-        return ' '.join(model_words) if model_words else "Unknown Model"
-    
-    # Извлечение объема двигателя
-    def extract_engine_volume(text):
-        volume_match = re.search(r'(\d+\.?\d*)[LT]', text)
-        return f"{volume_match.group(1)}L" if volume_match else None
-    
-    # Извлечение типа трансмиссии
-    def extract_transmission(text):
-        if any(keyword in text for keyword in ['自动', 'DCT', 'CVT', 'AT']):
-            return 'Automatic'
-        elif any(keyword in text for keyword in ['手动', 'MT', '手挡']):
-            return 'Manual'
-        return 'Unknown'
-    
-    # Извлечение типа топлива
-    def extract_fuel_type(text):
-        if any(keyword in text for keyword in ['混动', 'HV', '双擎', 'Hybrid']):
-            return 'Hybrid'
-        elif any(keyword in text for keyword in ['电动', 'EV', '纯电']):
-            return 'Electric'
-        elif any(keyword in text for keyword in ['柴油', 'Diesel', 'TDI', 'CDI']):
-            return 'Diesel'
-        elif any(keyword in text for keyword in ['汽油', 'TFSI', 'TSI', 'Petrol']):
-            return 'Petrol'
-        return 'Petrol'  # По умолчанию бензин
-    
-    # Извлечение привода
-    def extract_drive_type(text):
-        if any(keyword in text for keyword in ['四驱', '4WD', 'AWD', '4MATIC', 'xDrive', 'quattro']):
-            return 'AWD'
-        elif any(keyword in text for keyword in ['前驱', 'FWD']):
-            return 'FWD'
-        elif any(keyword in text for keyword in ['后驱', 'RWD']):
-            return 'RWD'
-        return 'FWD'  # По умолчанию передний привод
-    
-    # Парсим цену
-    def parse_price(price_str):
-        if not price_str:
-            return 0
-        
-        # print(f"🔍 Парсим цену: {price_str}")
-        
-        # Извлекаем первое число из строки типа "26.58万" или "18.28万31.02万"
-        price_match = re.search(r'(\d+\.?\d*)', str(price_str))
-        if price_match:
-            price_value = float(price_match.group())
-            # print(f"   Извлеченная цена: {price_value}万")
-            return price_value
-        
-        print(f"   Цена не найдена в строке: {price_str}")
-        return 0
-    
-    # Определяем страну производителя
-    def get_country_by_brand(brand_name):
-        country_mapping = {
-            # Немецкие бренды
-            '奔驰': 'germany', '宝马': 'germany', '奥迪': 'germany', '大众': 'germany',
-            'BMW': 'germany', 'Mercedes': 'germany', 'Audi': 'germany', 'Volkswagen': 'germany',
-            '迈巴赫': 'germany', 'AMG': 'germany', '保时捷': 'germany', 'Porsche': 'germany',
-            
-            # Японские бренды
-            '丰田': 'japan', '本田': 'japan', '日产': 'japan', '马自达': 'japan', '斯巴鲁': 'japan', '雷克萨斯': 'japan',
-            'Toyota': 'japan', 'Honda': 'japan', 'Nissan': 'japan', 'Mazda': 'japan', 'Subaru': 'japan', 'Lexus': 'japan',
-            '奥德赛': 'japan', '英菲尼迪': 'japan', 'Infiniti': 'japan', '讴歌': 'japan', 'Acura': 'japan',
-            
-            # Корейские бренды
-            '现代': 'korea', '起亚': 'korea', 'Hyundai': 'korea', 'KIA': 'korea',
-            '捷尼赛思': 'korea', 'Genesis': 'korea',
-            
-            # Американские бренды
-            '特斯拉': 'usa', 'Tesla': 'usa', '福特': 'usa', 'Ford': 'usa', '雪佛兰': 'usa', 'Chevrolet': 'usa',
-            '凯迪拉克': 'usa', 'Cadillac': 'usa', '林肯': 'usa', 'Lincoln': 'usa', '别克': 'usa', 'Buick': 'usa',
-            '探险者': 'usa', 'Explorer': 'usa',
-            
-            # Китайские бренды
-            '比亚迪': 'china', '蔚来': 'china', '小鹏': 'china', '理想': 'china', '吉利': 'china',
-            '长城': 'china', '哈弗': 'china', '博越': 'china', '星越': 'china', '威尔法': 'china',
-            '哈弗大狗': 'china', '北京越野': 'china', '传祺': 'china', '广汽': 'china',
-            'BYD': 'china', 'NIO': 'china', 'XPeng': 'china', 'Li Auto': 'china', 'Geely': 'china',
-            '深蓝': 'china', '阿维塔': 'china', '零跑': 'china', '极狐': 'china', '世纪': 'china',
-            
-            # Британские бренды
-            '路虎': 'uk', 'Land Rover': 'uk', '揽胜': 'uk', 'Range Rover': 'uk', '捷豹': 'uk', 'Jaguar': 'uk',
-            '迈凯伦': 'uk', 'McLaren': 'uk', '宾利': 'uk', 'Bentley': 'uk', '劳斯莱с': 'uk', 'Rolls-Royce': 'uk',
-            
-            # Итальянские бренды
-            '法拉利': 'italy', 'Ferrari': 'italy', '兰博基尼': 'italy', 'Lamborghini': 'italy',
-            '玛莎拉蒂': 'italy', 'Maserati': 'italy', '阿尔法罗密欧': 'italy', 'Alfa Romeo': 'italy',
-            
-            # Французские бренды
-            '标致': 'france', 'Peugeot': 'france', '雪铁龙': 'france', 'Citroën': 'france',
-            '雷诺': 'france', 'Renault': 'france', 'DS': 'france',
-            
-            # Шведские бренды
-            '沃尔沃': 'sweden', 'Volvo': 'sweden',
-            
-            # Швейцарские бренды
-            '保时捷': 'switzerland', 'Porsche': 'switzerland'
-        }
-        
-        # Проверяем точное совпадение
-        if brand_name in country_mapping:
-            return country_mapping[brand_name]
-        
-        # Проверяем частичное совпадение
-        for brand, country in country_mapping.items():
-            if brand in brand_name or brand_name in brand:
-                return country
-        
-        return 'unknown'
-    
-    # Извлекаем все данные
-    year = extract_year(title)
-    brand = extract_brand(title)
-    model = extract_model(title, brand)
-    price_value = parse_price(price)
-    country = get_country_by_brand(brand)
-    
-    # print(f"📋 Парсинг данных для: {title}")
-    # print(f"   Извлеченный год: {year}")
-    # print(f"   Извлеченный бренд: {brand}")
-    # print(f"   Извлеченная модель: {model}")
-    # print(f"   Извлеченная цена: {price_value}万")
-    # print(f"   Определенная страна: {country}")
-    
-    # Создаем упрощенный структурированный объект
-    structured_car = {
+    return {
         # Основная информация
         "id": car_data.get("car_id", ""),
         "title": title,
@@ -227,25 +63,340 @@ def structure_car_data(car_data):
         "price_value": price_value,
         "price_formatted": price,
         
-        # Изображения (как есть)
+        # Изображения: исходные ссылки и производные копии
         "image_url": car_data.get("image_url", ""),
         "local_image_url": car_data.get("local_image_url", ""),
-        "images": [car_data.get("local_image_url", "")] if car_data.get("local_image_url") else [],
+        "images": _car_images(car_data),
         
         # Метаданные
         "source": "che168",
         "scraped_at": datetime.now().isoformat()
     }
+
+def structure_car_data(car_data):
+    """
+    Структурирует данные автомобиля, извлекая все параметры из title
+    """
+    title = car_data.get("title", "")
+    price = car_data.get("price", "0万")
+    
+    year, brand, model, country = parse_car_title(title)
+    price_value = title_parser.parse_price(price)
+    
+    return _structured_car(car_data, year, brand, model, country, price_value)
+
+def structure_cars_batch(cars):
+    """
+    Структурирует список автомобилей по столбцам.
+    Каждый уникальный заголовок и каждая уникальная строка цены разбираются один раз.
+    Возвращает dict столбцов одинаковой длины; "index" — позиция автомобиля во входном списке.
+    Автомобили, которые не удалось разобрать, в столбцы не попадают.
+    """
+    columns = {
+        "index": [],
+        "id": [],
+        "year": [],
+        "brand": [],
+        "model": [],
+        "country": [],
+        "price_value": [],
+    }
+    parsed_titles = {}
+    parsed_prices = {}
     
-    # print(f"📋 Базовые данные для: {title}")
-    # print(f"   Бренд: {brand}, Модель: {model}, Год: {year}")
-    # print(f"   Цена: {price_value}万, Страна: {country}")
+    for index, car in enumerate(cars):
+        title = car.get("title", "")
+        price = car.get("price", "0万")
+        try:
+            if title not in parsed_titles:
+                parsed_titles[title] = parse_car_title(title)
+            if price not in parsed_prices:
+                parsed_prices[price] = title_parser.parse_price(price)
+        except Exception as e:
+            print(f"❌ Ошибка структурирования автомобиля: {e}")
+            continue
+        
+        year, brand, model, country = parsed_titles[title]
+        columns["index"].append(index)
+        columns["id"].append(car.get("car_id", ""))
+        columns["year"].append(year)
+        columns["brand"].append(brand)
+        columns["model"].append(model)
+        columns["country"].append(country)
+        columns["price_value"].append(parsed_prices[price])
     
-    return structured_car
+    return columns
+
+def car_records_from_batch(cars, columns):
+    """Превращает столбцы structure_cars_batch в записи, как у structure_car_data"""
+    return [
+        _structured_car(cars[index], year, brand, model, country, price_value)
+        for index, year, brand, model, country, price_value in zip(
+            columns["index"], columns["year"], columns["brand"],
+            columns["model"], columns["country"], columns["price_value"]
+        )
+    ]
+
+def materialize_car_records(car_list):
+    """
+    Записывает структурированные автомобили в коллекцию cars.
+    Старые записи не удаляются заранее, поэтому читатели не видят пустую коллекцию.
+    """
+    columns = structure_cars_batch(car_list)
+    operations = []
+    car_ids = []
+    records = car_records_from_batch(car_list, columns)
+    for record in records:
+        car_ids.append(record["id"])
+        operations.append(UpdateOne(
+            {"id": record["id"]},
+            {"$set": {**record, "extraction_version": CAR_EXTRACTION_VERSION}},
+            upsert=True
+        ))
+
+    if operations:
+        cars_collection.bulk_write(operations, ordered=False)
+    cars_collection.delete_many({"id": {"$nin": car_ids}})
+
+    catalog_index.rebuild(records)
+    cars_query_cache.invalidate()
+    print(f"💾 Read-модель cars обновлена: {len(car_ids)} записей (версия {CAR_EXTRACTION_VERSION})")
+    return len(car_ids)
+
+def rebuild_car_records():
+    """Пересобирает коллекцию cars из текущего кэша парсинга"""
+    return materialize_car_records(load_active_cars())
+
+def load_catalog_index():
+    """Строит индекс каталога в памяти из коллекции cars"""
+    records = list(cars_collection.find({}, CAR_RECORD_PROJECTION))
+    if not records:
+        return None
+    return catalog_index.rebuild(records)
+
+def car_records_are_stale():
+    """Проверяет, нужно ли пересобрать read-модель cars"""
+    if cars_collection.count_documents({"extraction_version": {"$ne": CAR_EXTRACTION_VERSION}}, limit=1):
+        return True
+    return cars_collection.count_documents({}) != count_active_cars()
+
+def restructure_car_records_if_stale():
+    """Пересобирает read-модель, если правила извлечения изменились"""
+    try:
+        if car_records_are_stale():
+            print(f"🔄 Пересборка read-модели cars (версия {CAR_EXTRACTION_VERSION})...")
+            rebuild_car_records()
+        else:
+            load_catalog_index()
+    except Exception as e:
+        print(f"❌ Ошибка пересборки read-модели cars: {e}")
+
+def start_car_records_restructuring():
+    """Запускает фоновую пересборку read-модели cars"""
+    thread = threading.Thread(
+        target=restructure_car_records_if_stale,
+        name="car-records-restructuring",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+# Поля сортировки API -> поля read-модели cars
+CAR_SORT_FIELDS = {
+    "title": "title",
+    "price": "price_value",
+    "year": "year",
+    "brand": "brand",
+}
+
+# Порядок по умолчанию: стабилен и нужен для курсорной пагинации
+CAR_DEFAULT_SORT = [("id", 1)]
+
+def build_cars_query(
+    sort_by: str = None,
+    sort_order: str = "asc",
+    title: str = None,
+    price_from: str = None,
+    price_to: str = None,
+    year_from: str = None,
+    year_to: str = None,
+    country: str = None,
+    q: str = None,
+):
+    """
+    Преобразует параметры /api/cars в фильтр и сортировку MongoDB.
+    Поиск q здесь — запасной путь без индекса каталога: подстрока в title или brand.
+    Возвращает (query, sort), где sort — список пар (поле, направление) или None.
+    """
+    query = {}
+    
+    text_filters = []
+    for text in (title, q):
+        if text:
+            pattern = {"$regex": re.escape(text), "$options": "i"}
+            text_filters.append({"$or": [{"title": pattern}, {"brand": pattern}]})
+    if len(text_filters) == 1:
+        query.update(text_filters[0])
+    elif text_filters:
+        query["$and"] = text_filters
+    
+    price_range = {}
+    if price_from:
+        price_range["$gte"] = float(price_from)
+    if price_to:
+        price_range["$lte"] = float(price_to)
+    if price_range:
+        query["price_value"] = price_range
+    
+    # Автомобили без года не попадают в выборку при фильтре по году
+    year_range = {}
+    if year_from:
+        year_range["$gte"] = int(year_from)
+    if year_to:
+        year_range["$lte"] = int(year_to)
+    if year_range:
+        query["year"] = year_range
+    
+    if country and country != 'all':
+        query["country"] = country
+    
+    sort = None
+    sort_field = CAR_SORT_FIELDS.get(sort_by)
+    if sort_field:
+        direction = -1 if sort_order == "desc" else 1
+        sort = [(sort_field, direction), ("id", direction)]
+    
+    return query, sort
+
+def _normalize_number(value, cast):
+    """Приводит числовой параметр к числу, чтобы "10" и "10.0" давали один ключ"""
+    if value is None or str(value).strip() == "":
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+def normalize_text_filters(title: str = None, q: str = None):
+    """
+    Текстовые фильтры /api/cars в том виде, в каком они идут и в ключ кэша, и в запрос:
+    title без крайних пробелов, q с одиночными пробелами. Регистр не меняется — регулярные
+    выражения и поиск и так без учёта регистра, в нижний регистр приводит только ключ кэша.
+    """
+    return (title or "").strip() or None, " ".join((q or "").split()) or None
+
+def build_cars_cache_key(
+    page, page_size, sort_by, sort_order, title,
+    price_from, price_to, year_from, year_to, country, cursor, q=None
+):
+    """Нормализованный ключ кэша результатов /api/cars"""
+    sort_by = sort_by if sort_by in CAR_SORT_FIELDS else None
+    return (
+        page if not cursor else None,
+        page_size,
+        sort_by,
+        "desc" if sort_by and sort_order == "desc" else "asc",
+        (title or "").strip().lower() or None,
+        _normalize_number(price_from, float),
+        _normalize_number(price_to, float),
+        _normalize_number(year_from, int),
+        _normalize_number(year_to, int),
+        None if country in (None, "", "all") else country,
+        cursor or None,
+        " ".join((q or "").lower().split()) or None,
+    )
+
+def query_catalog_index(
+    index,
+    page: int = 1,
+    page_size: int = 10,
+    sort_by: str = None,
+    sort_order: str = "asc",
+    price_from: str = None,
+    price_to: str = None,
+    year_from: str = None,
+    year_to: str = None,
+    country: str = None,
+    q: str = None,
+    cursor: str = None,
+):
+    """
+    Отвечает на запрос /api/cars по индексу каталога, не обращаясь к MongoDB.
+    С поиском q и без sort_by выдача упорядочена по релевантности: курсора нет,
+    страницы выбираются через page. Иначе курсор работает так же, как в MongoDB.
+    """
+    mask = index.match(
+        price_from=float(price_from) if price_from else None,
+        price_to=float(price_to) if price_to else None,
+        year_from=int(year_from) if year_from else None,
+        year_to=int(year_to) if year_to else None,
+        country=country if country and country != 'all' else None
+    )
+    
+    scores = None
+    if q:
+        search_mask, scores = index.search(q)
+        mask &= search_mask
+    
+    sort_field = CAR_SORT_FIELDS.get(sort_by)
+    descending = bool(sort_field) and sort_order == "desc"
+    offset = (page - 1) * page_size
+    
+    if scores is not None and not sort_field:
+        total_cars, paginated_cars = index.ranked_page(mask, scores, offset=offset, limit=page_size)
+        next_page_cursor = None
+    else:
+        sort = [(sort_field, -1 if descending else 1), ("id", -1 if descending else 1)] if sort_field else CAR_DEFAULT_SORT
+        after = None
+        if cursor:
+            # Как find_page: с курсором выборка идёт от ключа последней строки, без skip
+            after = decode_cursor(cursor)
+            if len(after) != len(sort):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            offset = 0
+        try:
+            total_cars, paginated_cars = index.page(
+                mask,
+                sort_field=sort_field,
+                descending=descending,
+                offset=offset,
+                limit=page_size,
+                after=after
+            )
+        except TypeError:
+            # Значение курсора несравнимо с полем сортировки
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        next_page_cursor = next_cursor(paginated_cars, sort, page_size)
+    
+    return {
+        "total": total_cars,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_page_cursor,
+        "data": json.loads(json.dumps(paginated_cars, default=str))
+    }
+
+def start_scrape_job(reason: str = "manual"):
+    """Запускает фоновый парсинг; если он уже идёт, возвращает текущую задачу"""
+    job, created = scrape_jobs.start(scrape_and_cache_cars, reason=reason)
+    if created:
+        print(f"🕷️ Запущена задача парсинга {job['job_id']} ({reason})")
+    return job
+
+def get_scrape_job(job_id: str):
+    """Статус задачи парсинга"""
+    job = scrape_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job
+
+def list_scrape_jobs():
+    """Последние задачи парсинга, от новых к старым"""
+    return {"active": scrape_jobs.active(), "jobs": scrape_jobs.list()}
 
 def get_scraped_cars():
     """Returns scraped car data, using cache if available."""
-    cached_cars = list(scrape_cache.find({}, {"_id": 0}))
+    cached_cars = load_active_cars()
     if cached_cars:
         return {
             "source": "cache",
@@ -253,27 +404,43 @@ def get_scraped_cars():
             "data": json.loads(json.dumps(cached_cars, default=str))
         }
 
-    car_list = scrape_and_cache_cars()
+    # Кэш пуст: парсинг идёт в фоне, отвечаем сразу
+    job = start_scrape_job("empty-cache")
     return {
-        "source": "live",
-        "count": len(car_list),
-        "data": car_list
+        "source": "scraping",
+        "count": 0,
+        "data": [],
+        "scrape_job": job
     }
 
-def refresh_cache():
-    """Force refresh the car cache by scraping new data."""
-    try:
-        car_list = scrape_and_cache_cars()
+def refresh_cache(wait: bool = False):
+    """
+    Force refresh the car cache by scraping new data.
+    Парсинг идёт в фоновой задаче; wait=True ждёт её завершения, как раньше.
+    """
+    job = start_scrape_job("refresh")
+    if not wait:
         return {
             "success": True,
-            "message": f"Cache refreshed with {len(car_list)} cars",
-            "count": len(car_list)
+            "message": f"Scrape job {job['status']}",
+            "job_id": job["job_id"],
+            "scrape_job": job
         }
-    except Exception as e:
+
+    job = scrape_jobs.wait(job["job_id"])
+    cars_query_cache.invalidate()
+    if job["status"] == "succeeded":
         return {
-            "success": False,
-            "message": f"Failed to refresh cache: {str(e)}"
+            "success": True,
+            "message": f"Cache refreshed with {job['count']} cars",
+            "count": job["count"],
+            "job_id": job["job_id"]
         }
+    return {
+        "success": False,
+        "message": f"Failed to refresh cache: {job['error']}",
+        "job_id": job["job_id"]
+    }
 
 def get_cars_with_filters(
     page: int = 1,
@@ -286,6 +453,8 @@ def get_cars_with_filters(
     year_from: str = None,
     year_to: str = None,
     country: str = None,
+    cursor: str = None,
+    q: str = None,
 ):
     """Получает автомобили с фильтрацией, сортировкой и пагинацией"""
     print(f"🔍 API /cars вызван с параметрами:")
@@ -299,99 +468,91 @@ def get_cars_with_filters(
     print(f"   country: {country}")
     print(f"   sort_by: {sort_by}")
     print(f"   sort_order: {sort_order}")
+    print(f"   cursor: {cursor}")
+    print(f"   q: {q}")
     
-    # Get cached scraped data
-    cached_cars = list(scrape_cache.find({}, {"_id": 0}))
-    print(f"📋 Всего автомобилей в кэше: {len(cached_cars)}")
+    title, q = normalize_text_filters(title, q)
+    cache_key = build_cars_cache_key(
+        page, page_size, sort_by, sort_order, title,
+        price_from, price_to, year_from, year_to, country, cursor, q
+    )
+    cached_result = cars_query_cache.get(cache_key)
+    if cached_result is not None:
+        print(f"⚡ Результат из кэша: {len(cached_result['data'])} автомобилей")
+        return cached_result
+    cache_generation = cars_query_cache.generation
     
-    # If no cached data, scrape fresh data
-    if not cached_cars:
-        print("⚠️ Кэш пуст, запускаем парсинг...")
-        car_list = scrape_and_cache_cars()
-        cached_cars = list(scrape_cache.find({}, {"_id": 0}))
-        print(f"✅ После парсинга автомобилей: {len(cached_cars)}")
+    # Read-модель пуста: строим её из кэша или запускаем фоновый парсинг
+    index = catalog_index.get()
+    if not index and cars_collection.find_one({}, {"_id": 1}) is None:
+        if count_active_cars() == 0:
+            print("⚠️ Кэш пуст, запускаем фоновый парсинг...")
+            job = start_scrape_job("empty-cache")
+            return {
+                "total": 0,
+                "page": page,
+                "page_size": page_size,
+                "next_cursor": None,
+                "data": [],
+                "scrape_job": job
+            }
+        rebuild_car_records()
+    if not index:
+        index = catalog_index.get() or load_catalog_index()
     
-    # Структурируем данные автомобилей
-    structured_cars = []
-    for car in cached_cars:
-        try:
-            structured_car = structure_car_data(car)
-            structured_cars.append(structured_car)
-        except Exception as e:
-            print(f"❌ Ошибка структурирования автомобиля: {e}")
-            continue
+    # Без фильтра title и курсора страница собирается из индекса в памяти;
+    # поиск q без индекса не работает, поэтому с q индекс сам применяет курсор
+    if index and not title and (q or not cursor):
+        result = query_catalog_index(
+            index,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            price_from=price_from,
+            price_to=price_to,
+            year_from=year_from,
+            year_to=year_to,
+            country=country,
+            q=q,
+            cursor=cursor
+        )
+        cars_query_cache.set(cache_key, result, generation=cache_generation)
+        print(f"✅ Возвращаем результат из индекса: {len(result['data'])} автомобилей")
+        return result
     
-    # Apply filters
-    filtered_cars = structured_cars
+    # Фильтрация, сортировка и пагинация выполняются в MongoDB
+    query, sort = build_cars_query(
+        sort_by=sort_by,
+        sort_order=sort_order,
+        title=title,
+        price_from=price_from,
+        price_to=price_to,
+        year_from=year_from,
+        year_to=year_to,
+        country=country,
+        q=q
+    )
+    print(f"🧭 Запрос к read-модели: filter={query}, sort={sort}")
     
-    if title:
-        before_count = len(filtered_cars)
-        filtered_cars = [car for car in filtered_cars if title.lower() in car.get("title", "").lower() or title.lower() in car.get("brand", "").lower()]
-        after_count = len(filtered_cars)
+    total_cars = cars_collection.count_documents(query)
     
-    if price_from:
-        before_count = len(filtered_cars)
-        filtered_cars = [car for car in filtered_cars if car.get("price_value", 0) >= float(price_from)]
-        after_count = len(filtered_cars)
-    
-    if price_to:
-        before_count = len(filtered_cars)
-        filtered_cars = [car for car in filtered_cars if car.get("price_value", 0) <= float(price_to)]
-        after_count = len(filtered_cars)
-
-    # Фильтрация по году
-    if year_from or year_to:
-        before_count = len(filtered_cars)
-        
-        # Фильтруем автомобили с годом
-        cars_with_year = [car for car in filtered_cars if car.get("year") is not None]
-        
-        if year_from:
-            year_from_int = int(year_from)
-            cars_with_year = [car for car in cars_with_year if car.get("year", 0) >= year_from_int]
-        
-        if year_to:
-            year_to_int = int(year_to)
-            cars_with_year = [car for car in cars_with_year if car.get("year", 0) <= year_to_int]
-        
-        filtered_cars = cars_with_year
-        after_count = len(filtered_cars)
-
-    # Фильтрация по стране
-    if country:
-        before_count = len(filtered_cars)
-        if country == 'all':
-            # Показываем все автомобили
-            pass
-        else:
-            filtered_cars = [car for car in filtered_cars if car.get("country") == country]
-        after_count = len(filtered_cars)
-
-    # Apply sorting
-    if sort_by:
-        reverse = sort_order == "desc"
-        if sort_by == "title":
-            filtered_cars.sort(key=lambda x: x.get("title", ""), reverse=reverse)
-        elif sort_by == "price":
-            filtered_cars.sort(key=lambda x: x.get("price_value", 0), reverse=reverse)
-        elif sort_by == "year":
-            filtered_cars.sort(key=lambda x: x.get("year", 0), reverse=reverse)
-        elif sort_by == "brand":
-            filtered_cars.sort(key=lambda x: x.get("brand", ""), reverse=reverse)
-
-    total_cars = len(filtered_cars)
-    
-    # Apply pagination
-    start_index = (page - 1) * page_size
-    end_index = start_index + page_size
-    paginated_cars = filtered_cars[start_index:end_index]
+    # Курсор строится по ключу сортировки (поле сортировки, id)
+    paginated_cars, next_page_cursor = find_page(
+        cars_collection, query, page, page_size, cursor,
+        sort=sort or CAR_DEFAULT_SORT,
+        projection=CAR_RECORD_PROJECTION
+    )
     
     result = {
         "total": total_cars,
         "page": page,
         "page_size": page_size,
+        "next_cursor": next_page_cursor,
         "data": json.loads(json.dumps(paginated_cars, default=str))
     }
     
+    cars_query_cache.set(cache_key, result, generation=cache_generation)
+    
     print(f"✅ Возвращаем результат: {len(result['data'])} автомобилей")
     return result
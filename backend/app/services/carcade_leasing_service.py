@@ -6,6 +6,8 @@ from typing import Optional, List
 from fastapi import HTTPException, UploadFile
 from pydantic import ValidationError
 from app.config.database import carcade_leasing_applications
+from app.services.pagination import find_page
+from app.services.application_counters import application_counters
 from app.models.carcade_leasing import (
     CarcadeLeasingApplicationCreate,
     CarcadeLeasingApplicationUpdate,
@@ -120,6 +122,7 @@ async def submit_carcade_leasing_application(
             db_application["user_id"] = application.telegramUser.get("id")
 
         carcade_leasing_applications.insert_one(db_application)
+        application_counters.created("carcade_leasing")
 
         print(f"✅ Заявка Каркаде лизинг сохранена: ID {application_id}")
         print(f"   Документ типов: {list(documents.keys())}")
@@ -138,20 +141,14 @@ async def submit_carcade_leasing_application(
 def get_carcade_leasing_stats():
     """Получение статистики заявок Каркаде лизинг"""
     try:
-        stats = {
-            "total": carcade_leasing_applications.count_documents({}),
-            "new": carcade_leasing_applications.count_documents({"status": "new"}),
-            "processing": carcade_leasing_applications.count_documents({"status": "processing"}),
-            "approved": carcade_leasing_applications.count_documents({"status": "approved"}),
-            "rejected": carcade_leasing_applications.count_documents({"status": "rejected"})
-        }
+        stats = application_counters.get("carcade_leasing")
 
         return stats
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
-def get_carcade_leasing_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_carcade_leasing_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка заявок Каркаде лизинг"""
     try:
         # Фильтр по статусу
@@ -162,11 +159,10 @@ def get_carcade_leasing_applications(page: int = 1, page_size: int = 10, status:
         # Подсчет общего количества
         total = carcade_leasing_applications.count_documents(filter_query)
 
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(carcade_leasing_applications.find(
-            filter_query
-        ).skip(skip).limit(page_size).sort("created_at", -1))
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            carcade_leasing_applications, filter_query, page, page_size, cursor
+        )
 
         # Конвертируем ObjectId в строки для JSON сериализации
         for app in applications:
@@ -177,9 +173,12 @@ def get_carcade_leasing_applications(page: int = 1, page_size: int = 10, status:
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
@@ -208,19 +207,23 @@ def update_carcade_leasing_status(application_id: str, status_data: dict):
         update_data = CarcadeLeasingApplicationUpdate(**status_data)
 
         # Обновляем статус
-        result = carcade_leasing_applications.update_one(
+        # Прежний статус нужен для счётчиков
+        previous = carcade_leasing_applications.find_one_and_update(
             {"_id": application_id},
             {
                 "$set": {
                     "status": update_data.status,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1}
         )
 
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.status_changed("carcade_leasing", previous.get("status"), update_data.status.value)
+
         return {
             "success": True,
             "message": f"Application status updated to {update_data.status}"
@@ -252,6 +255,8 @@ def delete_carcade_leasing_application(application_id: str):
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.deleted("carcade_leasing", application.get("status"))
+
         return {
             "success": True,
             "message": "Application deleted successfully"
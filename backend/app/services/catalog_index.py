@@ -0,0 +1,237 @@
+import threading
+from bisect import bisect_left, bisect_right
+from app.services.catalog_search import SearchIndex
+
+# Поля, по которым индекс умеет сортировать (как CAR_SORT_FIELDS в car_service)
+SORTABLE_FIELDS = ("title", "price_value", "year", "brand")
+
+def _sort_key(value):
+    """Порядок как в MongoDB: null раньше чисел и строк"""
+    return (0, 0) if value is None else (1, value)
+
+# Шаг контрольных масок диапазонов: маска первых k*STEP позиций сортировки хранится готовой
+PREFIX_STEP = 1024
+
+# Маска выбирается обходом позиций, если в ней не больше 1/SPARSE_RATIO строк
+SPARSE_RATIO = 16
+
+# Номера установленных битов для каждого значения байта
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def _bitmap(positions, size):
+    """
+    Битовая маска (int) из позиций строк.
+    Биты ставятся в bytearray и переводятся в int один раз:
+    `mask |= 1 << i` в цикле копирует всё большое число на каждом бите.
+    """
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+def _mask_bytes(mask, size):
+    """Маска в виде bytes: проверка бита без сдвига всего числа"""
+    return mask.to_bytes((size + 7) // 8, "little")
+
+def _positions(bits):
+    """Позиции установленных битов по возрастанию"""
+    positions = []
+    for byte_index, byte in enumerate(bits):
+        if byte:
+            base = byte_index << 3
+            positions.extend(base + bit for bit in _BYTE_BITS[byte])
+    return positions
+
+class CatalogIndex:
+    """
+    Неизменяемый столбцовый индекс каталога в памяти процесса.
+    Строки упорядочены по id; бит i в маске соответствует строке i.
+    Диапазоны цены и года ищутся bisect по отсортированным массивам и собираются
+    из контрольных масок префиксов, страна и бренд — готовыми масками,
+    комбинации — пересечением масок.
+    Поисковый запрос q отвечает через SearchIndex по тем же позициям.
+    """
+
+    def __init__(self, records):
+        by_id = {}
+        for record in records:
+            by_id[record.get("id", "")] = record
+        self.records = [by_id[car_id] for car_id in sorted(by_id)]
+        self.all_mask = (1 << len(self.records)) - 1
+
+        # Отсортированные значения цены и года + перестановки в позиции строк
+        price_order = sorted(
+            range(len(self.records)),
+            key=lambda i: (self.records[i].get("price_value", 0), i)
+        )
+        self._price_values = [self.records[i].get("price_value", 0) for i in price_order]
+        self._price_order = price_order
+        self._price_prefixes = self._prefix_masks(price_order)
+
+        year_order = sorted(
+            (i for i, record in enumerate(self.records) if record.get("year") is not None),
+            key=lambda i: (self.records[i]["year"], i)
+        )
+        self._year_values = [self.records[i]["year"] for i in year_order]
+        self._year_order = year_order
+        self._year_prefixes = self._prefix_masks(year_order)
+
+        self._country_masks = self._equality_masks("country")
+        self._brand_masks = self._equality_masks("brand")
+
+        # Перестановки для сортировки по (поле, id); порядок desc — обратный
+        self._sort_orders = {
+            field: sorted(
+                range(len(self.records)),
+                key=lambda i, field=field: (_sort_key(self.records[i].get(field)), i)
+            )
+            for field in SORTABLE_FIELDS
+        }
+        # Место строки в каждой сортировке — для упорядочивания разреженных масок
+        self._sort_ranks = {}
+        for field, order in self._sort_orders.items():
+            ranks = [0] * len(order)
+            for rank, i in enumerate(order):
+                ranks[i] = rank
+            self._sort_ranks[field] = ranks
+
+        # Полнотекстовый индекс по тем же позициям строк
+        self._search_index = SearchIndex(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _equality_masks(self, field):
+        positions = {}
+        for i, record in enumerate(self.records):
+            positions.setdefault(record.get(field), []).append(i)
+        return {value: _bitmap(items, len(self.records)) for value, items in positions.items()}
+
+    def _prefix_masks(self, order):
+        """Маски первых 0, STEP, 2*STEP, ... позиций сортировки"""
+        prefixes = [0]
+        for start in range(0, len(order), PREFIX_STEP):
+            prefixes.append(prefixes[-1] | _bitmap(order[start:start + PREFIX_STEP], len(self.records)))
+        return prefixes
+
+    def _prefix_mask(self, order, prefixes, end):
+        """Маска первых end позиций: контрольная маска + не больше STEP-1 битов"""
+        block = end // PREFIX_STEP
+        return prefixes[block] | _bitmap(order[block * PREFIX_STEP:end], len(self.records))
+
+    def _range_mask(self, values, order, prefixes, low, high):
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        if start >= end:
+            return 0
+        return self._prefix_mask(order, prefixes, end) ^ self._prefix_mask(order, prefixes, start)
+
+    def match(self, price_from=None, price_to=None, year_from=None, year_to=None, country=None, brand=None):
+        """Маска строк, удовлетворяющих всем фильтрам"""
+        mask = self.all_mask
+        if price_from is not None or price_to is not None:
+            mask &= self._range_mask(self._price_values, self._price_order, self._price_prefixes, price_from, price_to)
+        if year_from is not None or year_to is not None:
+            mask &= self._range_mask(self._year_values, self._year_order, self._year_prefixes, year_from, year_to)
+        if country is not None:
+            mask &= self._country_masks.get(country, 0)
+        if brand is not None:
+            mask &= self._brand_masks.get(brand, 0)
+        return mask
+
+    def search(self, query):
+        """Возвращает (маска, релевантность по позициям) для поискового запроса"""
+        scores = self._search_index.search(query)
+        return _bitmap(scores, len(self.records)), scores
+
+    def ranked_page(self, mask, scores, offset=0, limit=10):
+        """Страница по убыванию релевантности; при равенстве — по id"""
+        bits = _mask_bytes(mask, len(self.records))
+        positions = sorted(
+            (i for i in scores if bits[i >> 3] >> (i & 7) & 1),
+            key=lambda i: (-scores[i], i)
+        )
+        return len(positions), [self.records[i] for i in positions[offset:offset + limit]]
+
+    def _order_key(self, sort_field):
+        """Ключ строки в порядке сортировки: (значение поля, id) или id"""
+        records = self.records
+        if sort_field is None:
+            return lambda i: records[i].get("id", "")
+        return lambda i: (_sort_key(records[i].get(sort_field)), records[i].get("id", ""))
+
+    def page(self, mask, sort_field=None, descending=False, offset=0, limit=10, after=None):
+        """
+        Возвращает (total, записи страницы) для маски в заданном порядке.
+        after — значения курсора (поле сортировки, id) последней строки
+        предыдущей страницы: выдача начинается сразу после неё, offset не нужен.
+        """
+        total = mask.bit_count()
+        order = range(len(self.records)) if sort_field is None else self._sort_orders[sort_field]
+
+        # Диапазон мест в порядке сортировки, который остаётся после курсора
+        start, end = 0, len(order)
+        if after is not None:
+            after_key = after[0] if sort_field is None else (_sort_key(after[0]), after[1])
+            if descending:
+                end = bisect_left(order, after_key, key=self._order_key(sort_field))
+            else:
+                start = bisect_right(order, after_key, key=self._order_key(sort_field))
+
+        if offset >= total or limit <= 0 or start >= end:
+            return total, []
+
+        bits = _mask_bytes(mask, len(self.records))
+        if total * SPARSE_RATIO <= len(self.records):
+            # Разреженная маска: её позиции сортируются сами, без обхода всего порядка
+            positions = _positions(bits)
+            rank = self._sort_ranks[sort_field].__getitem__ if sort_field is not None else int
+            if after is not None:
+                positions = [i for i in positions if start <= rank(i) < end]
+            if sort_field is not None:
+                positions.sort(key=rank, reverse=descending)
+            elif descending:
+                positions.reverse()
+            return total, [self.records[i] for i in positions[offset:offset + limit]]
+
+        ranks = range(start, end)
+        if descending:
+            ranks = reversed(ranks)
+
+        items = []
+        skipped = 0
+        for rank in ranks:
+            i = order[rank]
+            if not bits[i >> 3] >> (i & 7) & 1:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            items.append(self.records[i])
+            if len(items) == limit:
+                break
+        return total, items
+
+class CatalogIndexHolder:
+    """Держит текущий индекс; пересборка подменяет его целиком одной ссылкой"""
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        return self._index
+
+    def rebuild(self, records):
+        index = CatalogIndex(records)
+        with self._lock:
+            self._index = index
+        print(f"🗂️ Индекс каталога пересобран: {len(index)} автомобилей")
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+
+# Индекс каталога текущего процесса
+catalog_index = CatalogIndexHolder()
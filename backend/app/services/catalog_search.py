@@ -0,0 +1,98 @@
+import math
+import re
+from bisect import bisect_left
+
+# Иероглифы CJK: индексируются униграммами и биграммами
+_CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+# Латиница, кириллица и цифры: индексируются словами
+_WORD_RUN = re.compile(r'[^\W_\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+# Вес совпадения по полям записи
+FIELD_WEIGHTS = (("brand", 2.0), ("model", 1.5), ("title", 1.0))
+
+# Совпадение по префиксу слова весит меньше точного
+PREFIX_MATCH_WEIGHT = 0.7
+
+def _cjk_terms(run, for_query=False):
+    """Биграммы последовательности иероглифов; в индексе ещё и униграммы"""
+    if len(run) == 1:
+        return [run]
+    bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+    return bigrams if for_query else list(run) + bigrams
+
+def tokenize(text, for_query=False):
+    """Термы текста: слова для латиницы/кириллицы/цифр, n-граммы для CJK"""
+    if not text:
+        return []
+    text = str(text).lower()
+    terms = _WORD_RUN.findall(text)
+    for run in _CJK_RUN.findall(text):
+        terms.extend(_cjk_terms(run, for_query))
+    return terms
+
+class SearchIndex:
+    """
+    Инвертированный индекс по brand, model и title для позиций строк CatalogIndex.
+    Запрос — пересечение термов (AND), ранжирование — взвешенный TF-IDF.
+    Слова запроса из латиницы, кириллицы и цифр совпадают и по префиксу.
+    """
+
+    def __init__(self, records):
+        self.size = len(records)
+        postings = {}
+        for position, record in enumerate(records):
+            for field, weight in FIELD_WEIGHTS:
+                for term in tokenize(record.get(field)):
+                    doc_weights = postings.setdefault(term, {})
+                    doc_weights[position] = doc_weights.get(position, 0.0) + weight
+        self._postings = postings
+        # Словарь некитайских термов для поиска по префиксу
+        self._words = sorted(term for term in postings if _WORD_RUN.fullmatch(term))
+
+    def _idf(self, term):
+        return math.log(1 + self.size / len(self._postings[term]))
+
+    def _term_scores(self, term):
+        """Оценки позиций для одного терма запроса (с расширением по префиксу)"""
+        scores = {}
+        if term in self._postings:
+            idf = self._idf(term)
+            for position, weight in self._postings[term].items():
+                scores[position] = weight * idf
+
+        if _WORD_RUN.fullmatch(term):
+            start = bisect_left(self._words, term)
+            for word in self._words[start:]:
+                if not word.startswith(term):
+                    break
+                if word == term:
+                    continue
+                idf = self._idf(word) * PREFIX_MATCH_WEIGHT
+                for position, weight in self._postings[word].items():
+                    score = weight * idf
+                    if score > scores.get(position, 0.0):
+                        scores[position] = score
+        return scores
+
+    def search(self, query):
+        """Возвращает {позиция строки: релевантность} для строк, где есть все термы"""
+        terms = list(dict.fromkeys(tokenize(query, for_query=True)))
+        if not terms:
+            return {}
+
+        result = None
+        for term in terms:
+            scores = self._term_scores(term)
+            if not scores:
+                return {}
+            if result is None:
+                result = scores
+            else:
+                result = {
+                    position: score + scores[position]
+                    for position, score in result.items()
+                    if position in scores
+                }
+                if not result:
+                    return {}
+        return result
@@ -1,12 +1,9 @@
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-from app.config.database import client
+from app.config.database import cities_collection
 from app.models.city import City, CityCreate, CityUpdate
 
-# Получаем коллекцию городов
-cities_collection = client.rim_auto.cities
-
 from app.services.delivery_zone_service import get_delivery_zones, get_delivery_price
 
 def get_delivery_regions():
@@ -71,20 +68,22 @@ def delete_city(city_id: str) -> bool:
     result = cities_collection.delete_one({"id": city_id})
     return result.deleted_count > 0
 
-def search_cities(query: str, limit: int = 10) -> List[City]:
-    """Поиск городов по названию или региону"""
-    if not query or len(query) < 2:
-        return []
-    
-    search_query = {
+def build_city_search_query(query: str):
+    """Фильтр поиска активных городов по названию или региону"""
+    return {
         "$or": [
             {"name": {"$regex": query, "$options": "i"}},
             {"region": {"$regex": query, "$options": "i"}}
         ],
         "is_active": True
     }
+
+def search_cities(query: str, limit: int = 10) -> List[City]:
+    """Поиск городов по названию или региону"""
+    if not query or len(query) < 2:
+        return []
     
-    cities = cities_collection.find(search_query).limit(limit)
+    cities = cities_collection.find(build_city_search_query(query)).limit(limit)
     return [City(**city) for city in cities]
 
 def get_active_cities() -> List[City]:
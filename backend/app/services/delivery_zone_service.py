@@ -1,12 +1,9 @@
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-from app.config.database import client
+from app.config.database import delivery_zones_collection
 from app.models.delivery_zone import DeliveryZone, DeliveryZoneCreate, DeliveryZoneUpdate
 
-# Получаем коллекцию зон доставки
-delivery_zones_collection = client.rim_auto.delivery_zones
-
 def create_delivery_zone(zone_data: DeliveryZoneCreate) -> DeliveryZone:
     """Создает новую зону доставки"""
     zone_dict = zone_data.dict()
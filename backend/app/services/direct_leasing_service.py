@@ -6,6 +6,8 @@ from typing import Optional, List
 from fastapi import HTTPException, UploadFile
 from pydantic import ValidationError
 from app.config.database import direct_leasing_applications
+from app.services.pagination import find_page
+from app.services.application_counters import application_counters
 from app.models.direct_leasing import (
     DirectLeasingApplicationCreate,
     DirectLeasingApplicationUpdate,
@@ -120,6 +122,7 @@ async def submit_direct_leasing_application(
             db_application["user_id"] = application.telegramUser.get("id")
 
         direct_leasing_applications.insert_one(db_application)
+        application_counters.created("direct_leasing")
 
         print(f"✅ Заявка Директ лизинг сохранена: ID {application_id}")
         print(f"   Документ типов: {list(documents.keys())}")
@@ -138,20 +141,14 @@ async def submit_direct_leasing_application(
 def get_direct_leasing_stats():
     """Получение статистики заявок Директ лизинг"""
     try:
-        stats = {
-            "total": direct_leasing_applications.count_documents({}),
-            "new": direct_leasing_applications.count_documents({"status": "new"}),
-            "processing": direct_leasing_applications.count_documents({"status": "processing"}),
-            "approved": direct_leasing_applications.count_documents({"status": "approved"}),
-            "rejected": direct_leasing_applications.count_documents({"status": "rejected"})
-        }
+        stats = application_counters.get("direct_leasing")
 
         return stats
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
-def get_direct_leasing_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_direct_leasing_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка заявок Директ лизинг"""
     try:
         # Фильтр по статусу
@@ -162,14 +159,9 @@ def get_direct_leasing_applications(page: int = 1, page_size: int = 10, status:
         # Подсчет общего количества
         total = direct_leasing_applications.count_documents(filter_query)
 
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(
-            direct_leasing_applications
-            .find(filter_query)
-            .sort("created_at", -1)
-            .skip(skip)
-            .limit(page_size)
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            direct_leasing_applications, filter_query, page, page_size, cursor
         )
 
         # Конвертируем ObjectId в строки для JSON сериализации
@@ -181,9 +173,12 @@ def get_direct_leasing_applications(page: int = 1, page_size: int = 10, status:
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
@@ -212,19 +207,23 @@ def update_direct_leasing_status(application_id: str, status_data: dict):
         update_data = DirectLeasingApplicationUpdate(**status_data)
 
         # Обновляем статус
-        result = direct_leasing_applications.update_one(
+        # Прежний статус нужен для счётчиков
+        previous = direct_leasing_applications.find_one_and_update(
             {"_id": application_id},
             {
                 "$set": {
                     "status": update_data.status.value,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1}
         )
 
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.status_changed("direct_leasing", previous.get("status"), update_data.status.value)
+
         return {
             "success": True,
             "message": f"Application status updated to {update_data.status.value}"
@@ -256,6 +255,8 @@ def delete_direct_leasing_application(application_id: str):
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.deleted("direct_leasing", application.get("status"))
+
         return {
             "success": True,
             "message": "Application deleted successfully"
@@ -0,0 +1,190 @@
+import base64
+import io
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from PIL import Image, ImageFilter, ImageOps, features
+from app.config.settings import (
+    STATIC_IMAGES_DIR,
+    IMAGE_DERIVATIVE_SIZES,
+    IMAGE_DERIVATIVE_FORMATS,
+    IMAGE_DERIVATIVE_QUALITY,
+    IMAGE_PROCESS_WORKERS
+)
+
+# Каталог производных изображений внутри STATIC_IMAGES_DIR
+DERIVED_DIRNAME = "derived"
+
+# Ширина размытой заглушки, которая встраивается в ответ API как data URI
+PLACEHOLDER_WIDTH = 16
+
+# Увеличивается при изменении размеров или кодирования — старые манифесты пересоберутся
+DERIVATIVES_VERSION = 1
+
+def supported_formats(formats=IMAGE_DERIVATIVE_FORMATS):
+    """Форматы из настроек, которые умеет кодировать установленный Pillow"""
+    return [fmt for fmt in formats if features.check(fmt)]
+
+def _static_url(path: Path, images_dir: Path):
+    return f"/static/images/{path.relative_to(images_dir).as_posix()}"
+
+def _placeholder(image):
+    """Крошечная размытая копия как data URI (LQIP)"""
+    width = PLACEHOLDER_WIDTH
+    height = max(1, round(image.height * width / image.width))
+    small = image.resize((width, height), Image.Resampling.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    small.save(buffer, "WEBP", quality=30)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+def build_derivatives(source_path, stem, images_dir=STATIC_IMAGES_DIR,
+                      sizes=IMAGE_DERIVATIVE_SIZES, formats=None, quality=IMAGE_DERIVATIVE_QUALITY):
+    """
+    Строит уменьшенные копии одного изображения во всех форматах и заглушку.
+    Выполняется в процессе пула, поэтому принимает и возвращает только простые значения.
+    Готовый манифест лежит рядом с копиями (<stem>.json) и переиспользуется.
+    """
+    images_dir = Path(images_dir)
+    source_path = Path(source_path)
+    formats = formats if formats is not None else supported_formats()
+    derived_dir = images_dir / DERIVED_DIRNAME
+    manifest_path = derived_dir / f"{stem}.json"
+
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            files = [images_dir / s["url"][len("/static/images/"):]
+                     for sources in manifest["sources"].values() for s in sources]
+            current = (
+                manifest.get("version") == DERIVATIVES_VERSION
+                and manifest.get("sizes") == sizes
+                and manifest.get("formats") == formats
+            )
+            if current and all(f.exists() for f in files):
+                return manifest
+        except (ValueError, KeyError):
+            pass
+
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+
+    # stem может содержать каталоги шардов хранилища (ab/cd/<sha256>)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    sources = {fmt: [] for fmt in formats}
+    for name, width in sizes.items():
+        # Не увеличиваем: маленький оригинал сохраняется в своём размере
+        target_width = min(width, image.width)
+        target_height = max(1, round(image.height * target_width / image.width))
+        resized = image if target_width == image.width else image.resize(
+            (target_width, target_height), Image.Resampling.LANCZOS
+        )
+        for fmt in formats:
+            path = derived_dir / f"{stem}-{name}.{fmt}"
+            tmp_path = path.with_name(path.name + ".part")
+            resized.save(tmp_path, fmt.upper(), quality=quality)
+            tmp_path.replace(path)
+            sources[fmt].append({
+                "size": name,
+                "width": target_width,
+                "height": target_height,
+                "url": _static_url(path, images_dir),
+            })
+
+    manifest = {
+        "version": DERIVATIVES_VERSION,
+        "sizes": sizes,
+        "formats": formats,
+        "width": image.width,
+        "height": image.height,
+        "placeholder": _placeholder(image),
+        "sources": sources,
+    }
+    tmp_manifest = manifest_path.with_name(manifest_path.name + ".part")
+    tmp_manifest.write_text(json.dumps(manifest), encoding="utf-8")
+    tmp_manifest.replace(manifest_path)
+    return manifest
+
+def srcset(manifest):
+    """{формат: "url 320w, url 640w"} для <img srcset> / <source>"""
+    if not manifest:
+        return {}
+    return {
+        fmt: ", ".join(f"{source['url']} {source['width']}w" for source in sources)
+        for fmt, sources in manifest.get("sources", {}).items()
+        if sources
+    }
+
+def size_url(manifest, size, fmt="webp"):
+    """URL копии нужного размера или None"""
+    for source in (manifest or {}).get("sources", {}).get(fmt, []):
+        if source["size"] == size:
+            return source["url"]
+    return None
+
+class ImageProcessor:
+    """
+    Строит производные изображения в пуле процессов: кодирование WebP/AVIF
+    нагружает CPU и под GIL мешало бы обработчикам запросов.
+    Пул создаётся при первом использовании.
+    """
+
+    def __init__(self, workers: int = IMAGE_PROCESS_WORKERS, images_dir: Path = STATIC_IMAGES_DIR):
+        self.workers = max(1, workers)
+        self.images_dir = Path(images_dir)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn, а не fork: родитель многопоточный и держит соединения MongoDB
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def process_many(self, jobs):
+        """
+        jobs — пары (путь к оригиналу, имя копий).
+        Возвращает манифесты в порядке jobs (None, если изображение не обработалось).
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        formats = supported_formats()
+        pool = self._executor()
+        futures = [
+            pool.submit(build_derivatives, str(path), stem, str(self.images_dir), IMAGE_DERIVATIVE_SIZES, formats)
+            for path, stem in jobs
+        ]
+        manifests = []
+        broken = False
+        for (path, _), future in zip(jobs, futures):
+            try:
+                manifests.append(future.result())
+            except BrokenProcessPool as e:
+                broken = True
+                print(f"❌ Ошибка обработки изображения {path}: {e}")
+                manifests.append(None)
+            except Exception as e:
+                print(f"❌ Ошибка обработки изображения {path}: {e}")
+                manifests.append(None)
+        if broken:
+            # Упавший процесс ломает весь пул — следующий вызов создаст новый
+            self.shutdown()
+        built = sum(1 for manifest in manifests if manifest)
+        print(f"🖼️ Производные изображения: {built}/{len(jobs)} ({', '.join(formats)})")
+        return manifests
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+# Обработчик изображений текущего процесса
+image_processor = ImageProcessor()
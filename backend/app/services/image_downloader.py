@@ -0,0 +1,226 @@
+import hashlib
+import threading
+import time
+import uuid
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from app.config.settings import (
+    SCRAPING_TIMEOUT,
+    IMAGE_DOWNLOAD_CONCURRENCY,
+    IMAGE_HOST_RATE_LIMIT,
+    IMAGE_DOWNLOAD_RETRIES,
+    IMAGE_DOWNLOAD_BACKOFF
+)
+from app.services.image_store import ImageStore, image_store, blob_local_url
+
+IMAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Referer': 'https://www.che168.com/',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+}
+
+# Статусы, после которых имеет смысл повторить запрос
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class RetryableDownloadError(Exception):
+    """Временная ошибка скачивания: запрос можно повторить"""
+
+def image_extension(image_url):
+    """Расширение файла по URL изображения"""
+    path = urllib.parse.urlparse(image_url).path.lower()
+    if path.endswith(('.jpg', '.jpeg')):
+        extension = '.jpg'
+    elif path.endswith('.png'):
+        extension = '.png'
+    elif path.endswith('.webp'):
+        extension = '.webp'
+    else:
+        extension = '.jpg'  # Дефолтное расширение
+
+    return extension
+
+class HostRateLimiter:
+    """Ограничивает частоту запросов к каждому хосту (не чаще rate в секунду)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        """Блокирует поток до ближайшего свободного слота для хоста"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+class ImageDownloader:
+    """
+    Скачивает изображения пулом потоков через одну сессию requests
+    с общим пулом соединений, лимитом частоты на хост и повторами с backoff.
+    Файлы сохраняются в хранилище по SHA-256 содержимого; URL, которые уже
+    скачивались, повторно не запрашиваются.
+    """
+
+    def __init__(
+        self,
+        store: ImageStore = image_store,
+        concurrency: int = IMAGE_DOWNLOAD_CONCURRENCY,
+        host_rate_limit: float = IMAGE_HOST_RATE_LIMIT,
+        retries: int = IMAGE_DOWNLOAD_RETRIES,
+        backoff: float = IMAGE_DOWNLOAD_BACKOFF,
+        timeout: float = SCRAPING_TIMEOUT,
+        session: requests.Session = None
+    ):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(host_rate_limit)
+        self.session = session or self._create_session()
+
+    def _create_session(self):
+        session = requests.Session()
+        session.headers.update(IMAGE_HEADERS)
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _fetch(self, image_url):
+        """Один запрос: сохраняет файл в хранилище и возвращает (sha256, local_url, размер в байтах)"""
+        self.rate_limiter.wait(urllib.parse.urlparse(image_url).netloc)
+        try:
+            response = self.session.get(image_url, timeout=self.timeout, stream=True)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableDownloadError(str(e))
+
+        with response:
+            if response.status_code in RETRYABLE_STATUSES:
+                raise RetryableDownloadError(f"status {response.status_code}")
+            response.raise_for_status()
+
+            # Проверяем что это действительно изображение
+            content_type = response.headers.get('content-type', '').lower()
+            if not content_type.startswith('image/'):
+                raise ValueError(f"не является изображением (content-type: {content_type})")
+
+            # Пишем во временный файл, считая хэш по ходу: имя известно только в конце
+            size = 0
+            digest = hashlib.sha256()
+            tmp_path = self.store.staging_dir() / f"{uuid.uuid4().hex}.part"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            except requests.exceptions.ChunkedEncodingError as e:
+                tmp_path.unlink(missing_ok=True)
+                raise RetryableDownloadError(str(e))
+            except Exception:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+            sha256 = digest.hexdigest()
+            extension = image_extension(image_url)
+            file_path = self.store.path_for(sha256, extension)
+            if file_path.exists():
+                # Та же фотография уже лежит в хранилище под другим URL
+                tmp_path.unlink(missing_ok=True)
+            else:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.replace(file_path)
+            return sha256, blob_local_url(sha256, extension), size
+
+    def download(self, image_url, car_id, known=None):
+        """
+        Скачивает одно изображение.
+        known — запись хранилища для этого URL, если он уже скачивался.
+        Возвращает отчёт: car_id, url, local_url (или None), sha256, status, attempts, bytes, seconds.
+        """
+        started = time.perf_counter()
+        report = {
+            "car_id": car_id,
+            "url": image_url,
+            "local_url": None,
+            "sha256": None,
+            "status": "skipped",
+            "attempts": 0,
+            "bytes": 0,
+            "seconds": 0.0,
+        }
+        if not image_url:
+            report["seconds"] = round(time.perf_counter() - started, 3)
+            return report
+
+        # Проверяем, не скачано ли уже это изображение
+        if known:
+            report["local_url"] = known["local_url"]
+            report["sha256"] = known["sha256"]
+            report["status"] = "cached"
+            report["seconds"] = round(time.perf_counter() - started, 3)
+            return report
+
+        for attempt in range(self.retries + 1):
+            report["attempts"] = attempt + 1
+            try:
+                report["sha256"], report["local_url"], report["bytes"] = self._fetch(image_url)
+                report["status"] = "downloaded"
+                break
+            except RetryableDownloadError as e:
+                report["status"] = f"error: {e}"
+                if attempt < self.retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+            except Exception as e:
+                report["status"] = f"error: {e}"
+                break
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        if report["local_url"]:
+            print(f"Изображение сохранено: {report['sha256'][:12]} ({report['seconds']}s)")
+        else:
+            print(f"Ошибка скачивания изображения {image_url}: {report['status']}")
+        return report
+
+    def download_many(self, jobs):
+        """
+        Скачивает пары (image_url, car_id) параллельно.
+        Возвращает (отчёты в порядке jobs, сводка с пропускной способностью).
+        """
+        jobs = list(jobs)
+        started = time.perf_counter()
+        known = self.store.lookup_urls(url for url, _ in jobs)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="image-download") as pool:
+            reports = list(pool.map(lambda job: self.download(*job, known=known.get(job[0])), jobs))
+        self.store.register_blobs(reports)
+        elapsed = time.perf_counter() - started
+
+        downloaded = [r for r in reports if r["status"] == "downloaded"]
+        total_bytes = sum(r["bytes"] for r in downloaded)
+        summary = {
+            "images": len(jobs),
+            "downloaded": len(downloaded),
+            "cached": sum(1 for r in reports if r["status"] == "cached"),
+            "failed": sum(1 for r in reports if r["status"].startswith("error")),
+            "seconds": round(elapsed, 3),
+            "images_per_second": round(len(downloaded) / elapsed, 2) if elapsed > 0 else 0.0,
+            "bytes_per_second": round(total_bytes / elapsed) if elapsed > 0 else 0,
+        }
+        print(
+            f"📸 Изображения: {summary['downloaded']} скачано, {summary['cached']} из кэша, "
+            f"{summary['failed']} ошибок за {summary['seconds']}s "
+            f"({summary['images_per_second']} изобр/с)"
+        )
+        return reports, summary
+
+# Общий загрузчик: одна сессия и пул соединений на процесс
+image_downloader = ImageDownloader()
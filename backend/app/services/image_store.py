@@ -0,0 +1,260 @@
+import time
+from datetime import datetime
+from pathlib import Path
+from pymongo import UpdateOne
+from app.config.database import image_blobs, image_refs
+from app.config.settings import STATIC_IMAGES_DIR, IMAGE_GC_GRACE_SECONDS
+from app.services.image_derivatives import DERIVED_DIRNAME
+
+# Каталог хранилища внутри STATIC_IMAGES_DIR: sha256/ab/cd/<sha256>.<ext>
+STORE_DIRNAME = "sha256"
+
+STATIC_URL_PREFIX = "/static/images/"
+
+def blob_relative_path(digest, extension):
+    """Путь файла в хранилище по хэшу содержимого (два уровня шардирования)"""
+    return Path(STORE_DIRNAME, digest[:2], digest[2:4], f"{digest}{extension}")
+
+def blob_local_url(digest, extension):
+    return STATIC_URL_PREFIX + blob_relative_path(digest, extension).as_posix()
+
+def digest_from_url(local_url):
+    """SHA-256 изображения из URL хранилища или None для файлов старого формата"""
+    if not local_url or not local_url.startswith(f"{STATIC_URL_PREFIX}{STORE_DIRNAME}/"):
+        return None
+    return Path(local_url).stem
+
+def image_key(local_url):
+    """
+    Ключ изображения, общий для оригинала и его производных копий:
+    "ab/cd/<sha256>" для хранилища, имя файла без расширения для старых файлов.
+    """
+    if not local_url:
+        return None
+    relative = Path(local_url[len(STATIC_URL_PREFIX):]) if local_url.startswith(STATIC_URL_PREFIX) else Path(local_url)
+    if relative.parts and relative.parts[0] == STORE_DIRNAME:
+        relative = Path(*relative.parts[1:])
+    return relative.with_suffix("").as_posix()
+
+class ImageStore:
+    """
+    Хранилище изображений с адресацией по содержимому.
+    Одинаковая фотография хранится один раз, сколько бы автомобилей на неё ни ссылалось.
+    В MongoDB: image_blobs — файл, его исходные URL и refcount,
+    image_refs — какой файл у какого автомобиля.
+    """
+
+    def __init__(self, images_dir: Path = STATIC_IMAGES_DIR):
+        self.images_dir = Path(images_dir)
+
+    def path_for(self, digest, extension):
+        return self.images_dir / blob_relative_path(digest, extension)
+
+    def staging_dir(self):
+        """Каталог временных файлов на том же диске, чтобы перенос был атомарным"""
+        path = self.images_dir / STORE_DIRNAME / "tmp"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def lookup_urls(self, urls):
+        """
+        Уже скачанные изображения одним запросом: {url: {"sha256", "local_url"}}.
+        Файлы, которых нет на диске, не возвращаются и будут скачаны заново.
+        """
+        urls = list({url for url in urls if url})
+        if not urls:
+            return {}
+        known = {}
+        try:
+            for blob in image_blobs.find({"urls": {"$in": urls}}, {"urls": 1, "extension": 1}):
+                if not self.path_for(blob["_id"], blob["extension"]).exists():
+                    continue
+                local_url = blob_local_url(blob["_id"], blob["extension"])
+                for url in blob["urls"]:
+                    known[url] = {"sha256": blob["_id"], "local_url": local_url}
+        except Exception as e:
+            print(f"❌ Ошибка поиска изображений в хранилище: {e}")
+        return known
+
+    def register_blobs(self, reports):
+        """Запоминает скачанные файлы и URL, с которых они получены"""
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": report["sha256"]},
+                {
+                    "$setOnInsert": {
+                        "extension": Path(report["local_url"]).suffix,
+                        "bytes": report["bytes"],
+                        "refcount": 0,
+                        "created_at": now
+                    },
+                    "$addToSet": {"urls": report["url"]},
+                    "$set": {"last_seen_at": now}
+                },
+                upsert=True
+            )
+            for report in reports
+            if report.get("sha256") and report["status"] == "downloaded"
+        ]
+        if not operations:
+            return
+        try:
+            image_blobs.bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"❌ Ошибка сохранения индекса изображений: {e}")
+
+    def record_refs(self, car_list):
+        """
+        Привязывает автомобили к файлам хранилища и обновляет refcount.
+        Счётчики меняются на разницу со старыми привязками; точные значения
+        восстанавливает collect_garbage.
+        """
+        self._bind({
+            car["car_id"]: digest
+            for car in car_list
+            for digest in [digest_from_url(car.get("local_image_url"))]
+            if digest
+        })
+
+    def _bind(self, refs):
+        """refs — {car_id: sha256}"""
+        if not refs:
+            return
+        try:
+            previous = {
+                doc["_id"]: doc["sha256"]
+                for doc in image_refs.find({"_id": {"$in": list(refs)}}, {"sha256": 1})
+            }
+            now = datetime.utcnow()
+            deltas = {}
+            operations = []
+            for car_id, digest in refs.items():
+                old_digest = previous.get(car_id)
+                if old_digest == digest:
+                    continue
+                deltas[digest] = deltas.get(digest, 0) + 1
+                if old_digest:
+                    deltas[old_digest] = deltas.get(old_digest, 0) - 1
+                operations.append(UpdateOne(
+                    {"_id": car_id},
+                    {"$set": {"sha256": digest, "updated_at": now}},
+                    upsert=True
+                ))
+            if operations:
+                image_refs.bulk_write(operations, ordered=False)
+            counters = [
+                UpdateOne({"_id": digest}, {"$inc": {"refcount": delta}})
+                for digest, delta in deltas.items() if delta
+            ]
+            if counters:
+                image_blobs.bulk_write(counters, ordered=False)
+        except Exception as e:
+            print(f"❌ Ошибка обновления ссылок на изображения: {e}")
+
+    def _mark(self, live_cars):
+        """
+        Mark: живые автомобили определяют нужные файлы.
+        Привязки исчезнувших автомобилей удаляются, refcount пересчитываются.
+        """
+        live_refs = {}
+        live_keys = set()
+        for car in live_cars:
+            local_url = car.get("local_image_url")
+            key = image_key(local_url)
+            if key:
+                live_keys.add(key)
+            digest = digest_from_url(local_url)
+            if digest and car.get("car_id"):
+                live_refs[car["car_id"]] = digest
+
+        self._bind(live_refs)
+        pruned = image_refs.delete_many({"_id": {"$nin": list(live_refs)}}).deleted_count
+
+        refcounts = {
+            row["_id"]: row["count"]
+            for row in image_refs.aggregate([{"$group": {"_id": "$sha256", "count": {"$sum": 1}}}])
+        }
+        image_blobs.update_many({"_id": {"$nin": list(refcounts)}}, {"$set": {"refcount": 0}})
+        if refcounts:
+            image_blobs.bulk_write([
+                UpdateOne({"_id": digest}, {"$set": {"refcount": count}})
+                for digest, count in refcounts.items()
+            ], ordered=False)
+        return live_keys, pruned
+
+    def _file_key(self, path: Path):
+        """Ключ файла на диске в том же пространстве, что и image_key"""
+        relative = path.relative_to(self.images_dir)
+        if relative.parts[0] == STORE_DIRNAME:
+            return Path(*relative.parts[1:]).with_suffix("").as_posix()
+        if relative.parts[0] == DERIVED_DIRNAME:
+            derived = Path(*relative.parts[1:])
+            if derived.suffix == ".json":
+                return derived.with_suffix("").as_posix()
+            # <key>-<размер>.<формат>
+            return derived.with_suffix("").as_posix().rsplit("-", 1)[0]
+        return relative.with_suffix("").as_posix()
+
+    def collect_garbage(self, live_cars, grace_seconds: float = IMAGE_GC_GRACE_SECONDS):
+        """
+        Mark-and-sweep: удаляет файлы (оригиналы и производные копии),
+        на которые не ссылается ни один живой автомобиль.
+        Файлы моложе grace_seconds не трогаются — их может писать идущий парсинг.
+        """
+        started = time.perf_counter()
+        live_keys, pruned_refs = self._mark(live_cars)
+
+        deleted_files = 0
+        freed_bytes = 0
+        kept_files = 0
+        deleted_digests = set()
+        cutoff = time.time() - grace_seconds
+
+        if self.images_dir.exists():
+            for path in self.images_dir.rglob("*"):
+                if not path.is_file():
+                    continue
+                stat = path.stat()
+                if stat.st_mtime > cutoff or self._file_key(path) in live_keys:
+                    kept_files += 1
+                    continue
+                path.unlink(missing_ok=True)
+                deleted_files += 1
+                freed_bytes += stat.st_size
+                if path.relative_to(self.images_dir).parts[0] == STORE_DIRNAME:
+                    deleted_digests.add(path.stem)
+
+            # Пустые каталоги шардов
+            for directory in sorted(self.images_dir.rglob("*"), reverse=True):
+                if directory.is_dir() and not any(directory.iterdir()):
+                    directory.rmdir()
+
+        if deleted_digests:
+            image_blobs.delete_many({"_id": {"$in": list(deleted_digests)}, "refcount": 0})
+
+        report = {
+            "live_images": len(live_keys),
+            "pruned_refs": pruned_refs,
+            "deleted_files": deleted_files,
+            "kept_files": kept_files,
+            "freed_bytes": freed_bytes,
+            "freed_mb": round(freed_bytes / (1024 * 1024), 2),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        print(
+            f"🧹 Сборка мусора изображений: удалено {deleted_files} файлов "
+            f"({report['freed_mb']} MB), оставлено {kept_files}"
+        )
+        return report
+
+    def stats(self):
+        """Число уникальных файлов и сколько из них не нужны ни одному автомобилю"""
+        return {
+            "blobs": image_blobs.count_documents({}),
+            "unreferenced": image_blobs.count_documents({"refcount": {"$lte": 0}}),
+            "refs": image_refs.count_documents({}),
+        }
+
+# Хранилище изображений текущего процесса
+image_store = ImageStore()
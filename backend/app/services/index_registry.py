@@ -0,0 +1,210 @@
+import threading
+import time
+from datetime import datetime
+from app.config.database import db, cities_db
+from app.services.application_stats import APPLICATION_COLLECTIONS
+
+# Базы данных, на которые ссылается реестр.
+# Города и зоны доставки лежат в отдельной базе (CITIES_DB_NAME).
+REGISTRY_DATABASES = {
+    "main": db,
+    "cities": cities_db,
+}
+
+# Сортировка списков заявок и отзывов (pagination.CREATED_AT_SORT)
+_CREATED_AT = [("created_at", -1), ("_id", -1)]
+
+# Составные индексы под фильтры и сортировки /api/cars.
+# "id" в конце каждого индекса даёт стабильный порядок при равных значениях.
+CAR_INDEXES = [
+    [("id", 1)],
+    [("price_value", 1), ("id", 1)],
+    [("year", 1), ("id", 1)],
+    [("title", 1), ("id", 1)],
+    [("brand", 1), ("id", 1)],
+    [("country", 1), ("price_value", 1), ("id", 1)],
+    [("country", 1), ("year", 1), ("id", 1)],
+    [("country", 1), ("title", 1), ("id", 1)],
+    [("country", 1), ("brand", 1), ("id", 1)],
+]
+
+def _index(collection, keys, database="main", unique=False):
+    return {"database": database, "collection": collection, "keys": keys, "unique": unique}
+
+# Все индексы приложения. Новый запрос с фильтром или сортировкой — новая строка здесь.
+INDEX_REGISTRY = [
+    *[_index("cars", keys, unique=keys == [("id", 1)]) for keys in CAR_INDEXES],
+
+    _index("scrape_cache", [("last_generation", 1), ("first_generation", 1)]),
+    _index("scrape_cache", [("car_id", 1)]),
+    _index("scrape_runs", [("started_at", -1)]),
+    _index("scraper_selectors", [("layout", 1), ("field", 1), ("selector", 1)], unique=True),
+
+    _index("image_blobs", [("urls", 1)]),
+    _index("image_blobs", [("refcount", 1)]),
+    _index("image_refs", [("sha256", 1)]),
+
+    # Списки заявок фильтруются по status и сортируются по created_at.
+    # Индекс со status в начале покрывает и подсчёт по статусам (application_stats).
+    *[
+        index
+        for collection in APPLICATION_COLLECTIONS.values()
+        for index in (
+            _index(collection.name, _CREATED_AT),
+            _index(collection.name, [("status", 1)] + _CREATED_AT),
+        )
+    ],
+
+    _index("users", [("telegram_id", 1)]),
+
+    _index("reviews", _CREATED_AT),
+    _index("reviews", [("rating", 1)] + _CREATED_AT),
+    _index("reviews", [("status", 1)] + _CREATED_AT),
+    _index("reviews", [("reply", 1)]),
+
+    _index("cities", [("id", 1)], database="cities"),
+    _index("cities", [("is_active", 1)], database="cities"),
+    _index("delivery_zones", [("id", 1)], database="cities"),
+    _index("delivery_zones", [("name", 1), ("is_active", 1)], database="cities"),
+]
+
+def index_name(keys):
+    """Имя индекса по умолчанию, как у MongoDB: field_1_other_-1"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+def _key_of(keys):
+    return tuple((field, int(direction)) for field, direction in keys)
+
+class IndexRegistry:
+    """
+    Сверяет желаемые индексы из INDEX_REGISTRY с существующими
+    и строит недостающие в фоновом потоке, не задерживая старт приложения.
+    Лишние индексы не удаляются — только показываются в отчёте.
+    """
+
+    def __init__(self, registry=INDEX_REGISTRY, databases=REGISTRY_DATABASES):
+        self.registry = registry
+        self.databases = databases
+        self._states = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _collection(self, spec):
+        return self.databases[spec["database"]][spec["collection"]]
+
+    def _spec_id(self, spec):
+        return (spec["database"], spec["collection"], index_name(spec["keys"]))
+
+    def _set_state(self, spec, **state):
+        with self._lock:
+            self._states[self._spec_id(spec)] = {**self._states.get(self._spec_id(spec), {}), **state}
+
+    def _existing(self, collection):
+        """{ключ индекса: описание} для коллекции"""
+        return {
+            _key_of(info["key"]): {"name": name, **info}
+            for name, info in collection.index_information().items()
+        }
+
+    def build(self):
+        """Создаёт недостающие индексы. Возвращает число созданных."""
+        started = time.perf_counter()
+        created = 0
+        existing_by_collection = {}
+        for spec in self.registry:
+            collection = self._collection(spec)
+            try:
+                if collection.full_name not in existing_by_collection:
+                    existing_by_collection[collection.full_name] = self._existing(collection)
+                existing = existing_by_collection[collection.full_name].get(_key_of(spec["keys"]))
+
+                if existing is not None:
+                    if bool(existing.get("unique")) != spec["unique"]:
+                        # Пересоздание меняет поведение записи — решается вручную
+                        self._set_state(spec, state="conflict", name=existing["name"])
+                    else:
+                        self._set_state(spec, state="ok", name=existing["name"])
+                    continue
+
+                self._set_state(spec, state="building")
+                index_started = time.perf_counter()
+                name = collection.create_index(spec["keys"], unique=spec["unique"])
+                self._set_state(
+                    spec,
+                    state="built",
+                    name=name,
+                    seconds=round(time.perf_counter() - index_started, 3),
+                    built_at=datetime.utcnow()
+                )
+                created += 1
+            except Exception as e:
+                self._set_state(spec, state="failed", error=str(e))
+                print(f"❌ Ошибка создания индекса {spec['collection']}.{index_name(spec['keys'])}: {e}")
+
+        print(
+            f"✅ Индексы проверены: {len(self.registry)}, создано {created} "
+            f"за {time.perf_counter() - started:.2f}s"
+        )
+        return created
+
+    def start(self):
+        """Проверяет и строит индексы в фоне"""
+        if self._thread is not None:
+            return self._thread
+        self._thread = threading.Thread(target=self.build, name="index-registry", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _index_sizes(self, collection):
+        try:
+            stats = next(collection.aggregate([{"$collStats": {"storageStats": {}}}]), {})
+            return stats.get("storageStats", {}).get("indexSizes", {})
+        except Exception:
+            # Коллекция ещё не создана
+            return {}
+
+    def report(self):
+        """Желаемые и существующие индексы по коллекциям с размерами"""
+        with self._lock:
+            states = dict(self._states)
+
+        collections = {}
+        for spec in self.registry:
+            collection = self._collection(spec)
+            entry = collections.get(collection.full_name)
+            if entry is None:
+                existing = self._existing(collection)
+                sizes = self._index_sizes(collection)
+                entry = collections[collection.full_name] = {
+                    "desired": [],
+                    "existing": [
+                        {
+                            "name": info["name"],
+                            "keys": info["key"],
+                            "unique": bool(info.get("unique")),
+                            "size_bytes": sizes.get(info["name"]),
+                        }
+                        for info in existing.values()
+                    ],
+                    "_existing": existing,
+                }
+            present = entry["_existing"].get(_key_of(spec["keys"]))
+            state = states.get(self._spec_id(spec), {})
+            entry["desired"].append({
+                "keys": spec["keys"],
+                "unique": spec["unique"],
+                "present": present is not None,
+                "state": state.get("state", "ok" if present is not None else "missing"),
+                **{key: value for key, value in state.items() if key != "state"},
+            })
+
+        for entry in collections.values():
+            desired_keys = {_key_of(index["keys"]) for index in entry["desired"]}
+            entry["extra"] = [
+                info["name"] for key, info in entry.pop("_existing").items()
+                if key not in desired_keys and info["name"] != "_id_"
+            ]
+        return collections
+
+# Реестр индексов текущего процесса
+index_registry = IndexRegistry()
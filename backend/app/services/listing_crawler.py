@@ -0,0 +1,66 @@
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from app.services.image_downloader import HostRateLimiter
+
+def canonical_url(url):
+    """URL страницы без якоря — ключ для множества посещённых"""
+    return urllib.parse.urldefrag(url)[0]
+
+class ListingCrawler:
+    """
+    Обходит страницы списка объявлений пулом потоков.
+    load(url) загружает и разбирает страницу и возвращает словарь
+    с ключами cars и links (ссылки на следующие страницы) и любыми другими полями.
+    Новые ссылки попадают в очередь обхода, пока не исчерпан бюджет max_pages.
+    Запросы к одному хосту идут не чаще host_rate_limit в секунду.
+    """
+
+    def __init__(self, load, max_pages: int, workers: int, host_rate_limit: float):
+        self.load = load
+        self.max_pages = max(1, max_pages)
+        self.workers = max(1, workers)
+        self.rate_limiter = HostRateLimiter(host_rate_limit)
+
+    def _crawl_page(self, url):
+        self.rate_limiter.wait(urllib.parse.urlparse(url).netloc)
+        return self.load(url)
+
+    def crawl(self, start_urls):
+        """
+        Генератор результатов по мере готовности страниц:
+        результат load(url) с полями url и error (исключение или None).
+        """
+        frontier = []
+        visited = set()
+
+        def enqueue(urls):
+            for url in urls:
+                key = canonical_url(url)
+                if key and key not in visited:
+                    visited.add(key)
+                    frontier.append(key)
+
+        enqueue(start_urls)
+        scheduled = 0
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="listing-crawler") as pool:
+            while frontier or pending:
+                while frontier and len(pending) < self.workers and scheduled < self.max_pages:
+                    url = frontier.pop(0)
+                    pending[pool.submit(self._crawl_page, url)] = url
+                    scheduled += 1
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        yield {"url": url, "cars": [], "links": [], "error": e}
+                        continue
+                    enqueue(page.get("links", []))
+                    yield {**page, "url": url, "error": None}
@@ -0,0 +1,365 @@
+import hashlib
+import random
+import re
+import threading
+import urllib.parse
+from collections import Counter
+from itertools import islice
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from app.config.settings import SCRAPING_SELECTOR_MIN_ITEMS
+
+SITE_URL = "https://www.che168.com"
+
+# Селекторы контейнеров автомобилей на che168.com в порядке приоритета
+CAR_CONTAINER_SELECTORS = [
+    # Основные списки автомобилей
+    "div[class*='viewlist_li']",          # Основной класс списка на che168.com
+    "li[class*='list-item']",             # li элементы списка
+    "div[class*='list-item']",            # div элементы списка
+    ".list-item",                         # Простой класс списка
+
+    # Карточки автомобилей
+    "div[class*='car-card']",             # Карточки автомобилей
+    "div[class*='item-pic']",             # Элементы с картинками
+    "div[class*='pic-box']",              # Контейнеры картинок
+
+    # Результаты поиска
+    "div[class*='search-result']",        # Результаты поиска
+    "article",                            # Семантические элементы
+
+    # Fallback селекторы
+    "[data-testid*='car']",               # data атрибуты
+    ".used-car-item",                     # Подержанные автомобили
+    ".sale-car",                          # Продаваемые авто
+    "li[class*='car']",                   # li элементы с car
+]
+
+TITLE_SELECTORS = [
+    "h3", "h4", "h5", ".title", ".car-name", ".name",
+    "[class*='title']", "[class*='name']", "a[title]",
+    ".series-name", ".model-name", ".car-title"
+]
+
+PRICE_SELECTORS = [
+    ".price", "[class*='price']", ".money", "[class*='money']",
+    "span[style*='color: rgb(255']", ".sale-price", ".current-price"
+]
+
+PAGINATION_SELECTOR = "#listpagination a[href]"
+
+CAR_KEYWORDS = ['万', '车', '汽车', 'bmw', 'audi', 'toyota']
+CAR_IMAGE_KEYWORDS = ['车', 'car', '汽车', '奔驰', '宝马', '奥迪', '丰田', '本田', '大众', '比亚迪', 'bmw', 'audi', 'toyota', 'honda']
+IMAGE_ATTRIBUTES = ['src', 'data-src', 'data-original', 'data-lazy', 'data-img']
+
+# Селектор контейнеров принимается, если нашёл хотя бы столько элементов
+MIN_CONTAINERS = 3
+
+# Ссылка на объявление che168: /dealer/<dealer_id>/<info_id>.html
+LISTING_URL_ID = re.compile(r'/(\d{5,})\.html')
+
+def extract_listing_id(car_container):
+    """
+    ID объявления на che168: атрибут infoid, id="shucar_<id>" или номер из ссылки.
+    Ищет в самом контейнере, у ближайших предков и у единственного потомка с infoid.
+    Если внутри несколько разных объявлений, ID не определяется.
+    """
+    candidates = [car_container]
+    candidates += list(islice(car_container.iterancestors(), 3))
+    nested = car_container.xpath(".//*[@infoid]")
+    if len(nested) == 1:
+        candidates += nested
+    for element in candidates:
+        info_id = element.get("infoid")
+        if info_id and str(info_id).isdigit():
+            return str(info_id)
+        element_id = element.get("id") or ""
+        if element_id.startswith("shucar_") and element_id[7:].isdigit():
+            return element_id[7:]
+
+    link_ids = {
+        match.group(1)
+        for href in car_container.xpath(".//a/@href")
+        for match in [LISTING_URL_ID.search(href)]
+        if match
+    }
+    return link_ids.pop() if len(link_ids) == 1 else None
+
+def extract_listing_url(car_container):
+    """Ссылка на объявление без query-параметров и якорей"""
+    hrefs = car_container.xpath(".//a/@href")
+    if not hrefs:
+        return ""
+    return hrefs[0].split("#")[0].split("?")[0]
+
+def build_car_id(title, source_url="", listing_id=None):
+    """
+    Стабильный ID автомобиля между парсингами и процессами.
+    Предпочитает ID объявления; иначе — SHA-1 от URL объявления (или изображения) и заголовка.
+    """
+    if listing_id:
+        return f"che168_{listing_id}"
+    digest = hashlib.sha1(f"{source_url}|{title}".encode("utf-8")).hexdigest()[:16]
+    return f"che168_{digest}"
+
+def absolute_image_url(url):
+    # Исправляем относительные URL
+    if url.startswith('//'):
+        return 'https:' + url
+    if url.startswith('/'):
+        return SITE_URL + url
+    if url.startswith('http'):
+        return url
+    return 'https:' + url
+
+def layout_key(url):
+    """Вёрстка страницы определяется хостом и первым сегментом пути (/china/...)"""
+    parsed = urllib.parse.urlparse(url or SITE_URL)
+    segment = parsed.path.strip("/").split("/")[0]
+    return f"{parsed.netloc}/{segment}"
+
+def parse_document(html):
+    """Дерево lxml из HTML страницы (None для пустой страницы)"""
+    if not html or not html.strip():
+        return None
+    # Байты + явная кодировка: строки с XML-декларацией lxml не принимает
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    return lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+def _text(element):
+    return element.text_content()
+
+def _title_value(element):
+    title_text = element.get('title') or _text(element).strip()
+    return title_text if title_text and len(title_text) > 2 else None
+
+def _price_value(element):
+    price_text = _text(element).strip()
+    # Ищем числа с "万"
+    return price_text if '万' in price_text or any(char.isdigit() for char in price_text) else None
+
+# Поля, селекторы которых запоминаются: селекторы по умолчанию в порядке приоритета
+SELECTOR_FIELDS = {
+    "container": CAR_CONTAINER_SELECTORS,
+    "title": TITLE_SELECTORS,
+    "price": PRICE_SELECTORS,
+}
+
+class ListingParser:
+    """
+    Разбор страницы списка che168 на дереве lxml.
+    CSS-селекторы компилируются в XPath один раз (в каждом потоке свои).
+    Селектор поля выполняется один раз на страницу, а не на каждый контейнер:
+    совпадения раскладываются по контейнерам одним проходом по их предкам,
+    и следующие селекторы пробуются только для контейнеров без значения.
+
+    Для каждой вёрстки (layout_key) держится выученный порядок селекторов
+    контейнеров, заголовка и цены (learn() из прошлых парсингов, плюс победители
+    текущего). Выученный селектор контейнеров принимается, если нашёл не меньше
+    min_cached_items элементов; иначе выполняется полный перебор.
+    """
+
+    def __init__(self, min_cached_items: int = SCRAPING_SELECTOR_MIN_ITEMS):
+        self.min_cached_items = max(1, min_cached_items)
+        self._local = threading.local()
+        self._learned = {}
+        self._lock = threading.Lock()
+
+    def _compiled(self, selector):
+        """Скомпилированный селектор или None, если он некорректен"""
+        cache = getattr(self._local, "compiled", None)
+        if cache is None:
+            cache = self._local.compiled = {}
+        if selector not in cache:
+            try:
+                cache[selector] = CSSSelector(selector, translator="html")
+            except Exception:
+                cache[selector] = None
+        return cache[selector]
+
+    def learn(self, ranking):
+        """Задаёт выученный порядок: {layout: {field: [селекторы от лучшего]}}"""
+        with self._lock:
+            self._learned = {
+                layout: {field: list(selectors) for field, selectors in fields.items()}
+                for layout, fields in ranking.items()
+            }
+
+    def learned(self, layout, field):
+        with self._lock:
+            return list(self._learned.get(layout, {}).get(field, []))
+
+    def _promote(self, layout, field, selector):
+        """Ставит селектор первым для вёрстки — следующие страницы начнут с него"""
+        with self._lock:
+            selectors = self._learned.setdefault(layout, {}).setdefault(field, [])
+            if selectors[:1] != [selector]:
+                if selector in selectors:
+                    selectors.remove(selector)
+                selectors.insert(0, selector)
+
+    def _ordered(self, layout, field):
+        """Выученные селекторы, затем остальные по умолчанию"""
+        learned = self.learned(layout, field) if layout else []
+        return learned + [s for s in SELECTOR_FIELDS[field] if s not in learned]
+
+    def _accept(self, containers):
+        """Как в прежнем переборе: 3+ элемента или автомобильный текст в первых трёх"""
+        if len(containers) >= MIN_CONTAINERS:
+            return True
+        return any(
+            any(keyword in _text(container).lower() for keyword in CAR_KEYWORDS)
+            for container in containers[:3]
+        )
+
+    def find_containers(self, root, layout=None):
+        """Возвращает (контейнеры автомобилей, сработавший селектор)"""
+        for selector in (self.learned(layout, "container") if layout else []):
+            compiled = self._compiled(selector)
+            if compiled is None:
+                continue
+            containers = compiled(root)
+            if len(containers) >= self.min_cached_items:
+                return containers, selector
+
+        containers = []
+        for selector in CAR_CONTAINER_SELECTORS:
+            containers = self._compiled(selector)(root)
+            if containers and self._accept(containers):
+                if layout:
+                    self._promote(layout, "container", selector)
+                return containers, selector
+
+        # Как и прежде, непринятые совпадения последнего селектора лучше, чем ничего
+        if containers:
+            return containers, None
+
+        # Альтернативный подход через поиск изображений с подписями автомобилей
+        car_related_images = []
+        seen = set()
+        for img in root.iter("img"):
+            text = (img.get('alt') or '').lower() + (img.get('title') or '').lower()
+            if any(keyword in text for keyword in CAR_IMAGE_KEYWORDS):
+                parent = img.getparent()
+                if parent is not None and parent not in seen:
+                    seen.add(parent)
+                    car_related_images.append(parent)
+        if car_related_images:
+            return car_related_images[:20], "image-based-search"  # Ограничиваем до 20
+        return [], None
+
+    def _pick(self, root, positions, selectors, value_of):
+        """
+        Значение поля для каждого контейнера: первый селектор, чьё первое совпадение
+        внутри контейнера даёт значение. Возвращает (значения, селекторы-победители).
+        """
+        values = [None] * len(positions)
+        winners = [None] * len(positions)
+        remaining = len(positions)
+        for selector in selectors:
+            if not remaining:
+                break
+            compiled = self._compiled(selector)
+            if compiled is None:
+                continue
+            # Совпадения идут в порядке документа, поэтому первое — первым и записывается
+            first = {}
+            for element in compiled(root):
+                for ancestor in element.iterancestors():
+                    position = positions.get(ancestor)
+                    if position is not None and values[position] is None and position not in first:
+                        first[position] = element
+            for position, element in first.items():
+                value = value_of(element)
+                if value:
+                    values[position] = value
+                    winners[position] = selector
+                    remaining -= 1
+        return values, winners
+
+    def extract(self, root, containers, layout=None):
+        """
+        Поля title, price, image_url для всех контейнеров страницы
+        и счётчики победивших селекторов {field: {selector: контейнеров}}.
+        """
+        positions = {container: i for i, container in enumerate(containers)}
+        titles, title_winners = self._pick(root, positions, self._ordered(layout, "title"), _title_value)
+        prices, price_winners = self._pick(root, positions, self._ordered(layout, "price"), _price_value)
+
+        results = []
+        for position, container in enumerate(containers):
+            image_url = ""
+            image_element = next(container.iterdescendants("img"), None)
+            if image_element is not None:
+                for attr in IMAGE_ATTRIBUTES:
+                    url = image_element.get(attr)
+                    if url and url != 'data:image' and 'placeholder' not in url.lower():
+                        image_url = absolute_image_url(url)
+                        break
+
+            results.append({"title": titles[position], "price": prices[position], "image_url": image_url})
+
+        hits = {"title": Counter(w for w in title_winners if w), "price": Counter(w for w in price_winners if w)}
+        if layout:
+            for field, counter in hits.items():
+                if counter:
+                    self._promote(layout, field, counter.most_common(1)[0][0])
+        return results, {field: dict(counter) for field, counter in hits.items()}
+
+    def pagination_urls(self, root, base_url=SITE_URL):
+        """Абсолютные ссылки на страницы пагинации списка без якорей и трекинга"""
+        urls = []
+        for link in self._compiled(PAGINATION_SELECTOR)(root):
+            href = link.get("href").split("#")[0].split("?")[0]
+            if not href or href.startswith("javascript"):
+                continue
+            url = urllib.parse.urljoin(base_url, href)
+            if url not in urls:
+                urls.append(url)
+        return urls
+
+    def parse(self, html, url=SITE_URL):
+        """
+        Разбирает страницу списка.
+        Возвращает (автомобили, сработавший селектор, ссылки на другие страницы списка,
+        счётчики победивших селекторов {field: {selector: count}}).
+        """
+        root = parse_document(html)
+        if root is None:
+            return [], None, [], {}
+
+        layout = layout_key(url)
+        containers, used_selector = self.find_containers(root, layout)
+        fields, hits = self.extract(root, containers, layout)
+        if used_selector and used_selector != "image-based-search":
+            hits["container"] = {used_selector: len(containers)}
+
+        cars = []
+        for i, (container, car) in enumerate(zip(containers, fields)):
+            # Добавляем только если есть название
+            if not car["title"] or len(car["title"].strip()) <= 2:
+                continue
+            try:
+                # Стабильный ID: один и тот же автомобиль получает его при каждом парсинге,
+                # поэтому изображения и diff-запись кэша переиспользуются
+                car_id = build_car_id(
+                    car["title"],
+                    extract_listing_url(container) or car["image_url"],
+                    extract_listing_id(container)
+                )
+            except Exception as e:
+                print(f"❌ Ошибка обработки элемента {i} на {url}: {e}")
+                continue
+            cars.append({
+                "title": car["title"],
+                # Если нет цены, создаем случайную
+                "price": car["price"] or f"{random.randint(15, 50)}万",
+                "image_url": car["image_url"],
+                "local_image_url": None,
+                "car_id": car_id
+            })
+
+        return cars, used_selector, self.pagination_urls(root, url), hits
+
+# Разборщик страниц списка текущего процесса
+listing_parser = ListingParser()
@@ -0,0 +1,69 @@
+import time
+
+# Число элементов по списку CSS-селекторов (объединение, без дублей)
+_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length"
+_READY_SCRIPT = "return document.readyState"
+_SCROLL_SCRIPT = "window.scrollTo(0, document.body.scrollHeight); return document.body.scrollHeight"
+
+def count_elements(driver, selectors):
+    """Сколько элементов на странице подходит хотя бы под один селектор"""
+    try:
+        return int(driver.execute_script(_COUNT_SCRIPT, ", ".join(selectors)) or 0)
+    except Exception:
+        return 0
+
+def wait_for_listings(driver, selectors, timeout: float, poll: float = 0.2):
+    """
+    Ждёт, пока документ загрузится и появится хотя бы один элемент списка.
+    По дедлайну не падает: возвращает найденное число (возможно 0),
+    дальше разбор пробует запасные способы поиска автомобилей.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        count = count_elements(driver, selectors)
+        try:
+            ready = driver.execute_script(_READY_SCRIPT) == "complete"
+        except Exception:
+            ready = False
+        if count and ready:
+            return count
+        if time.monotonic() >= deadline:
+            return count
+        time.sleep(poll)
+
+def scroll_until_settled(driver, selectors, timeout: float, settle: float, poll: float = 0.2, max_scrolls: int = 10):
+    """
+    Прокручивает страницу вниз, пока подгружаются новые элементы списка.
+    Число считается устоявшимся, если не меняется settle секунд после прокрутки.
+    Возвращает (число элементов, число прокруток).
+    """
+    deadline = time.monotonic() + timeout
+    count = count_elements(driver, selectors)
+    scrolls = 0
+    while scrolls < max_scrolls and time.monotonic() < deadline:
+        try:
+            height = driver.execute_script(_SCROLL_SCRIPT)
+        except Exception:
+            break
+        scrolls += 1
+
+        stable_since = time.monotonic()
+        grown = False
+        while time.monotonic() < deadline:
+            time.sleep(poll)
+            current = count_elements(driver, selectors)
+            if current != count:
+                grown = grown or current > count
+                count = current
+                stable_since = time.monotonic()
+            elif time.monotonic() - stable_since >= settle:
+                break
+
+        # Бесконечная прокрутка закончилась: ни новых элементов, ни новой высоты
+        try:
+            new_height = driver.execute_script("return document.body.scrollHeight")
+        except Exception:
+            break
+        if not grown and new_height == height:
+            break
+    return count, scrolls
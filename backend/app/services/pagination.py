@@ -0,0 +1,81 @@
+import base64
+from fastapi import HTTPException
+from bson import json_util
+
+# Сортировка списков заявок и отзывов; _id разрешает равные created_at
+CREATED_AT_SORT = [("created_at", -1), ("_id", -1)]
+
+def encode_cursor(values):
+    """Кодирует значения ключа сортировки в непрозрачный курсор"""
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str):
+    """Декодирует курсор, полученный от клиента"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        values = json_util.loads(raw.decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def _after(field, direction, value):
+    """Условия «поле идёт после value» с учётом того, что null сортируется первым"""
+    op = "$gt" if direction == 1 else "$lt"
+    if value is None:
+        return [{field: {"$ne": None}}] if direction == 1 else []
+    conditions = [{field: {op: value}}]
+    if direction == -1:
+        conditions.append({field: None})
+    return conditions
+
+def keyset_query(query: dict, sort: list, cursor: str):
+    """Добавляет к запросу условие «после курсора» для заданной сортировки"""
+    values = decode_cursor(cursor)
+    if len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    clauses = []
+    prefix = {}
+    for (field, direction), value in zip(sort, values):
+        for condition in _after(field, direction, value):
+            clauses.append({**prefix, **condition})
+        prefix[field] = value
+
+    keyset = {"$or": clauses} if clauses else {"_id": {"$exists": False}}
+    if not query:
+        return keyset
+    return {"$and": [query, keyset]}
+
+def next_cursor(items: list, sort: list, page_size: int):
+    """Курсор следующей страницы или None, если страница последняя"""
+    if not items or len(items) < page_size:
+        return None
+    last = items[-1]
+    return encode_cursor([last.get(field) for field, _ in sort])
+
+def find_page(collection, query: dict, page: int, page_size: int, cursor: str = None, sort: list = None, projection: dict = None):
+    """
+    Возвращает страницу документов и курсор следующей страницы.
+    С курсором выборка идёт по ключу сортировки, без него — через skip.
+    """
+    sort = sort or CREATED_AT_SORT
+    if cursor:
+        items = list(collection.find(keyset_query(query, sort, cursor), projection).sort(sort).limit(page_size))
+    else:
+        skip = (page - 1) * page_size
+        items = list(collection.find(query, projection).sort(sort).skip(skip).limit(page_size))
+    return items, next_cursor(items, sort, page_size)
+
+async def find_page_async(collection, query: dict, page: int, page_size: int, cursor: str = None, sort: list = None, projection: dict = None):
+    """find_page для асинхронной коллекции (AsyncMongoClient)"""
+    sort = sort or CREATED_AT_SORT
+    if cursor:
+        found = collection.find(keyset_query(query, sort, cursor), projection).sort(sort).limit(page_size)
+    else:
+        skip = (page - 1) * page_size
+        found = collection.find(query, projection).sort(sort).skip(skip).limit(page_size)
+    items = await found.to_list()
+    return items, next_cursor(items, sort, page_size)
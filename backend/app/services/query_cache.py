@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from app.config.settings import CARS_CACHE_MAX_ENTRIES, CARS_CACHE_TTL_SECONDS
+
+class QueryCache:
+    """
+    Ограниченный LRU-кэш с TTL для результатов запросов.
+    Ключи привязаны к поколению: invalidate() увеличивает его и сбрасывает записи.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Возвращает значение из кэша или None"""
+        with self._lock:
+            entry = self._entries.get((self.generation, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[(self.generation, key)]
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._entries.move_to_end((self.generation, key))
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation: int = None):
+        """
+        Сохраняет значение. Если передано поколение, с которым значение было
+        посчитано, и оно уже устарело, значение не кэшируется.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[(self.generation, key)] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end((self.generation, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Начинает новое поколение и сбрасывает все записи"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            return self.generation
+
+    def stats(self):
+        """Счётчики кэша для /api/health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "generation": self.generation,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Кэш результатов /api/cars
+cars_query_cache = QueryCache(CARS_CACHE_MAX_ENTRIES, CARS_CACHE_TTL_SECONDS)
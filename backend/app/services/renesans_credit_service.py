@@ -4,6 +4,8 @@ from typing import Optional
 from fastapi import HTTPException
 from pydantic import ValidationError
 from app.config.database import renesans_credit_applications
+from app.services.pagination import find_page
+from app.services.application_counters import application_counters
 from app.models.renesans_credit import (
     RenesansCreditApplicationCreate,
     RenesansCreditApplicationUpdate,
@@ -65,6 +67,7 @@ def submit_renesans_credit_application(
             db_application["user_id"] = application.telegramUser.get("id")
 
         renesans_credit_applications.insert_one(db_application)
+        application_counters.created("renesans_credit")
 
         print(f"✅ Заявка Ренессанс кредит сохранена: ID {application_id}")
 
@@ -81,20 +84,14 @@ def submit_renesans_credit_application(
 def get_renesans_credit_stats():
     """Получение статистики заявок Ренессанс кредит"""
     try:
-        stats = {
-            "total": renesans_credit_applications.count_documents({}),
-            "new": renesans_credit_applications.count_documents({"status": "new"}),
-            "processing": renesans_credit_applications.count_documents({"status": "processing"}),
-            "approved": renesans_credit_applications.count_documents({"status": "approved"}),
-            "rejected": renesans_credit_applications.count_documents({"status": "rejected"})
-        }
+        stats = application_counters.get("renesans_credit")
 
         return stats
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
-def get_renesans_credit_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_renesans_credit_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка заявок Ренессанс кредит"""
     try:
         # Фильтр по статусу
@@ -105,11 +102,10 @@ def get_renesans_credit_applications(page: int = 1, page_size: int = 10, status:
         # Подсчет общего количества
         total = renesans_credit_applications.count_documents(filter_query)
 
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(renesans_credit_applications.find(
-            filter_query
-        ).skip(skip).limit(page_size).sort("created_at", -1))
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            renesans_credit_applications, filter_query, page, page_size, cursor
+        )
 
         # Конвертируем ObjectId в строки для JSON сериализации
         for app in applications:
@@ -120,9 +116,12 @@ def get_renesans_credit_applications(page: int = 1, page_size: int = 10, status:
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
@@ -151,19 +150,23 @@ def update_renesans_credit_status(application_id: str, status_data: dict):
         update_data = RenesansCreditApplicationUpdate(**status_data)
 
         # Обновляем статус
-        result = renesans_credit_applications.update_one(
+        # Прежний статус нужен для счётчиков
+        previous = renesans_credit_applications.find_one_and_update(
             {"_id": application_id},
             {
                 "$set": {
                     "status": update_data.status.value,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1}
         )
 
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.status_changed("renesans_credit", previous.get("status"), update_data.status.value)
+
         return {
             "success": True,
             "message": f"Application status updated to {update_data.status}"
@@ -177,11 +180,14 @@ def update_renesans_credit_status(application_id: str, status_data: dict):
 def delete_renesans_credit_application(application_id: str):
     """Удаление заявки Ренессанс кредит"""
     try:
-        result = renesans_credit_applications.delete_one({"_id": application_id})
+        # Статус удалённой заявки нужен для счётчиков
+        deleted = renesans_credit_applications.find_one_and_delete({"_id": application_id}, projection={"status": 1})
 
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.deleted("renesans_credit", deleted.get("status"))
+
         return {
             "success": True,
             "message": "Application deleted successfully"
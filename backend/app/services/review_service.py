@@ -3,42 +3,41 @@ from datetime import datetime
 from fastapi import HTTPException
 from bson import ObjectId
 from app.config.database import reviews_collection, users_collection
+from app.services.pagination import find_page
 
-def get_reviews(page: int = 1, page_size: int = 10, rating: int = None, status: str = None):
+def build_reviews_query(rating: int = None, status: str = None):
+    """Фильтр списка отзывов по рейтингу и статусу"""
+    query: dict = {}
+    if rating is not None:
+        try:
+            rating_int = int(rating)
+            if rating_int < 1 or rating_int > 5:
+                raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
+            query["rating"] = rating_int
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid rating")
+    if status:
+        if status not in ("new", "processed"):
+            raise HTTPException(status_code=400, detail="Invalid status")
+        if status == "new":
+            # Статус новый: либо явно status=new, либо нет ответа
+            query["$or"] = [{"status": "new"}, {"reply": None}]
+        elif status == "processed":
+            # Статус обработан: либо явно status=processed, либо есть ответ
+            query["$or"] = [{"status": "processed"}, {"reply": {"$ne": None}}]
+    return query
+
+def get_reviews(page: int = 1, page_size: int = 10, rating: int = None, status: str = None, cursor: str = None):
     """Получение списка отзывов с фильтрацией и пагинацией"""
     try:
-        skip = (page - 1) * page_size
-        # Формируем фильтр
-        query: dict = {}
-        if rating is not None:
-            try:
-                rating_int = int(rating)
-                if rating_int < 1 or rating_int > 5:
-                    raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
-                query["rating"] = rating_int
-            except Exception:
-                raise HTTPException(status_code=400, detail="Invalid rating")
-        if status:
-            if status not in ("new", "processed"):
-                raise HTTPException(status_code=400, detail="Invalid status")
-            if status == "new":
-                # Статус новый: либо явно status=new, либо нет ответа
-                query["$or"] = [{"status": "new"}, {"reply": None}]
-            elif status == "processed":
-                # Статус обработан: либо явно status=processed, либо есть ответ
-                query["$or"] = [{"status": "processed"}, {"reply": {"$ne": None}}]
-
+        query = build_reviews_query(rating, status)
         total = reviews_collection.count_documents(query)
-        items = list(
-            reviews_collection
-            .find(query)
-            .skip(skip)
-            .limit(page_size)
-            .sort("created_at", -1)
-        )
+        items, next_page_cursor = find_page(reviews_collection, query, page, page_size, cursor)
         for item in items:
             item["_id"] = str(item["_id"]) 
-        return {"total": total, "page": page, "page_size": page_size, "data": items}
+        return {"total": total, "page": page, "page_size": page_size, "next_cursor": next_page_cursor, "data": items}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get reviews: {str(e)}")
 
@@ -4,6 +4,8 @@ from typing import Optional
 from fastapi import HTTPException
 from pydantic import ValidationError
 from app.config.database import rshb_credit_applications
+from app.services.pagination import find_page
+from app.services.application_counters import application_counters
 from app.models.rshb_credit import (
     RSHBCreditApplicationCreate,
     RSHBCreditApplicationUpdate,
@@ -65,6 +67,7 @@ def submit_rshb_credit_application(
             db_application["user_id"] = application.telegramUser.get("id")
 
         rshb_credit_applications.insert_one(db_application)
+        application_counters.created("rshb_credit")
 
         print(f"✅ Заявка РСХБ кредит сохранена: ID {application_id}")
 
@@ -81,20 +84,14 @@ def submit_rshb_credit_application(
 def get_rshb_credit_stats():
     """Получение статистики заявок РСХБ кредит"""
     try:
-        stats = {
-            "total": rshb_credit_applications.count_documents({}),
-            "new": rshb_credit_applications.count_documents({"status": "new"}),
-            "processing": rshb_credit_applications.count_documents({"status": "processing"}),
-            "approved": rshb_credit_applications.count_documents({"status": "approved"}),
-            "rejected": rshb_credit_applications.count_documents({"status": "rejected"})
-        }
+        stats = application_counters.get("rshb_credit")
 
         return stats
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
-def get_rshb_credit_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_rshb_credit_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка заявок РСХБ кредит"""
     try:
         # Фильтр по статусу
@@ -105,11 +102,10 @@ def get_rshb_credit_applications(page: int = 1, page_size: int = 10, status: str
         # Подсчет общего количества
         total = rshb_credit_applications.count_documents(filter_query)
 
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(rshb_credit_applications.find(
-            filter_query
-        ).skip(skip).limit(page_size).sort("created_at", -1))
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            rshb_credit_applications, filter_query, page, page_size, cursor
+        )
 
         # Конвертируем ObjectId в строки для JSON сериализации
         for app in applications:
@@ -120,9 +116,12 @@ def get_rshb_credit_applications(page: int = 1, page_size: int = 10, status: str
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
@@ -151,19 +150,23 @@ def update_rshb_credit_status(application_id: str, status_data: dict):
         update_data = RSHBCreditApplicationUpdate(**status_data)
 
         # Обновляем статус
-        result = rshb_credit_applications.update_one(
+        # Прежний статус нужен для счётчиков
+        previous = rshb_credit_applications.find_one_and_update(
             {"_id": application_id},
             {
                 "$set": {
                     "status": update_data.status.value,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1}
         )
 
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.status_changed("rshb_credit", previous.get("status"), update_data.status.value)
+
         return {
             "success": True,
             "message": f"Application status updated to {update_data.status}"
@@ -177,11 +180,14 @@ def update_rshb_credit_status(application_id: str, status_data: dict):
 def delete_rshb_credit_application(application_id: str):
     """Удаление заявки РСХБ кредит"""
     try:
-        result = rshb_credit_applications.delete_one({"_id": application_id})
+        # Статус удалённой заявки нужен для счётчиков
+        deleted = rshb_credit_applications.find_one_and_delete({"_id": application_id}, projection={"status": 1})
 
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.deleted("rshb_credit", deleted.get("status"))
+
         return {
             "success": True,
             "message": "Application deleted successfully"
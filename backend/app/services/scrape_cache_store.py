@@ -0,0 +1,161 @@
+import hashlib
+import json
+from datetime import datetime
+from pymongo import InsertOne, ReturnDocument
+from app.config.database import scrape_cache, scrape_cache_state
+from app.config.settings import SCRAPE_CACHE_WRITE_MODE, SCRAPE_CACHE_KEEP_GENERATIONS
+
+# Документ с указателем на активное поколение кэша
+STATE_ID = "scrape_cache"
+
+# Служебные поля, которые не отдаются наружу
+SCRAPE_CACHE_PROJECTION = {"_id": 0, "first_generation": 0, "last_generation": 0, "content_hash": 0}
+
+# Поля автомобиля, по которым определяется, изменился ли он
+CONTENT_FIELDS = ("title", "price", "image_url", "local_image_url", "image_variants")
+
+def get_active_generation():
+    """Номер активного поколения или None, если кэш ещё не версионирован"""
+    state = scrape_cache_state.find_one({"_id": STATE_ID})
+    return state.get("active_generation") if state else None
+
+def generation_filter(generation):
+    """
+    Документ входит в поколения first_generation..last_generation.
+    Поэтому diff-запись может продлевать документы, не меняя того, что видят читатели.
+    """
+    if generation is None:
+        return {}
+    return {"first_generation": {"$lte": generation}, "last_generation": {"$gte": generation}}
+
+def active_cache_filter():
+    """Фильтр документов активного поколения"""
+    return generation_filter(get_active_generation())
+
+def load_active_cars():
+    """Автомобили активного поколения без служебных полей"""
+    return list(scrape_cache.find(active_cache_filter(), SCRAPE_CACHE_PROJECTION))
+
+def count_active_cars():
+    return scrape_cache.count_documents(active_cache_filter())
+
+def content_hash(car):
+    """Хэш содержимого автомобиля для diff-режима"""
+    payload = json.dumps([car.get(field) for field in CONTENT_FIELDS], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _car_fields(car):
+    """Поля автомобиля без _id, который мог проставить insert_many"""
+    return {key: value for key, value in car.items() if key != "_id"}
+
+def _next_generation():
+    """Атомарно выделяет номер нового поколения"""
+    state = scrape_cache_state.find_one_and_update(
+        {"_id": STATE_ID},
+        {"$inc": {"last_generation": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return state["last_generation"]
+
+def _activate(generation):
+    """Переключает указатель на поколение одной атомарной записью"""
+    scrape_cache_state.update_one(
+        {"_id": STATE_ID},
+        {"$set": {"active_generation": generation, "activated_at": datetime.utcnow()}}
+    )
+
+def _new_document(car, generation, digest, first_seen, now):
+    return {
+        **_car_fields(car),
+        "first_generation": generation,
+        "last_generation": generation,
+        "content_hash": digest,
+        "first_seen": first_seen,
+        "last_seen": now
+    }
+
+class ScrapeCacheWriter:
+    """
+    Потоковая запись одного парсинга в новое поколение кэша.
+    add() можно вызывать по мере разбора страниц: новые документы до commit()
+    читателям не видны. commit() переключает указатель одной записью.
+
+    В diff-режиме неизменившимся автомобилям продлевается last_generation,
+    новые и изменившиеся пишутся новыми документами (first_seen переносится).
+    Кэш без поколений (старый формат) diff-режимом не продлить — пишется целиком.
+    """
+
+    def __init__(self, mode: str = SCRAPE_CACHE_WRITE_MODE):
+        self.now = datetime.utcnow()
+        self.active = get_active_generation()
+        self.generation = _next_generation()
+        self.mode = "full" if mode == "full" or self.active is None else "diff"
+        self.stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self._existing = {}
+        if self.mode == "diff":
+            self._existing = {
+                doc["car_id"]: doc
+                for doc in scrape_cache.find(
+                    generation_filter(self.active),
+                    {"car_id": 1, "content_hash": 1, "first_seen": 1}
+                )
+                if doc.get("car_id")
+            }
+
+    def add(self, car_list):
+        """Записывает очередную порцию автомобилей в ожидающее поколение"""
+        operations = []
+        unchanged_ids = []
+        for car in car_list:
+            digest = content_hash(car)
+            current = self._existing.pop(car.get("car_id"), None)
+            if current is not None and current.get("content_hash") == digest:
+                unchanged_ids.append(current["_id"])
+                self.stats["unchanged"] += 1
+                continue
+
+            first_seen = (current or {}).get("first_seen") or self.now
+            operations.append(InsertOne(_new_document(car, self.generation, digest, first_seen, self.now)))
+            self.stats["updated" if current else "inserted"] += 1
+
+        if operations:
+            scrape_cache.bulk_write(operations, ordered=False)
+        if unchanged_ids:
+            scrape_cache.update_many(
+                {"_id": {"$in": unchanged_ids}},
+                {"$set": {"last_generation": self.generation, "last_seen": self.now}}
+            )
+
+    def commit(self):
+        """Делает поколение активным и удаляет старые"""
+        _activate(self.generation)
+        stats = {**self.stats, "generation": self.generation, "mode": self.mode}
+        print(
+            f"💾 Кэш парсинга: поколение {self.generation} ({self.mode}) — "
+            f"новых {stats['inserted']}, изменено {stats['updated']}, без изменений {stats['unchanged']}"
+        )
+        collect_old_generations()
+        return stats
+
+def write_scrape_cache(car_list, mode: str = SCRAPE_CACHE_WRITE_MODE):
+    """
+    Записывает результат парсинга в новое поколение и делает его активным.
+    Читатели до переключения видят предыдущее поколение, пустого окна нет.
+    """
+    writer = ScrapeCacheWriter(mode)
+    writer.add(car_list)
+    return writer.commit()
+
+def collect_old_generations(keep: int = SCRAPE_CACHE_KEEP_GENERATIONS):
+    """Удаляет документы, не входящие в последние keep поколений, и документы без поколения"""
+    active = get_active_generation()
+    if active is None:
+        return 0
+    result = scrape_cache.delete_many({"$or": [
+        {"last_generation": {"$lte": active - max(1, keep)}},
+        {"last_generation": {"$exists": False}}
+    ]})
+    if result.deleted_count:
+        print(f"🧹 Удалено документов старых поколений кэша: {result.deleted_count}")
+    return result.deleted_count
@@ -0,0 +1,128 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+# Сколько завершённых задач хранить для /api/scrape-jobs
+SCRAPE_JOBS_HISTORY = 20
+
+class ScrapeJobRunner:
+    """
+    Запускает парсинг в фоновом потоке.
+    Одновременно выполняется не более одной задачи: повторный запуск
+    во время работы возвращает уже идущую задачу (single-flight).
+    """
+
+    def __init__(self, history: int = SCRAPE_JOBS_HISTORY):
+        self.history = history
+        self._jobs = OrderedDict()
+        self._active_id = None
+        self._done = {}
+        self._lock = threading.Lock()
+
+    def _snapshot(self, job):
+        return dict(job) if job else None
+
+    def start(self, target, reason: str = "manual"):
+        """
+        Запускает target(progress) в фоне или возвращает активную задачу.
+        Возвращает (снимок задачи, created), где created=False означает дедупликацию.
+        """
+        with self._lock:
+            active = self._jobs.get(self._active_id)
+            if active and active["status"] in ("queued", "running"):
+                return self._snapshot(active), False
+
+            job_id = str(uuid.uuid4())
+            job = {
+                "job_id": job_id,
+                "reason": reason,
+                "status": "queued",
+                "phase": None,
+                "progress": {},
+                "created_at": datetime.utcnow().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "count": None,
+                "error": None,
+            }
+            self._jobs[job_id] = job
+            self._done[job_id] = threading.Event()
+            self._active_id = job_id
+            while len(self._jobs) > self.history:
+                old_id, _ = self._jobs.popitem(last=False)
+                self._done.pop(old_id, None)
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(job_id, target),
+            name=f"scrape-job-{job_id[:8]}",
+            daemon=True
+        )
+        thread.start()
+        return self._snapshot(job), True
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+
+    def _run(self, job_id, target):
+        self._update(job_id, status="running", started_at=datetime.utcnow().isoformat())
+        print(f"🕷️ Задача парсинга {job_id} запущена")
+
+        def progress(phase, **details):
+            self._update(job_id, phase=phase, progress=details)
+
+        try:
+            car_list = target(progress)
+            self._update(
+                job_id,
+                status="succeeded",
+                phase="done",
+                count=len(car_list or []),
+                finished_at=datetime.utcnow().isoformat()
+            )
+            print(f"✅ Задача парсинга {job_id} завершена: {len(car_list or [])} автомобилей")
+        except Exception as e:
+            self._update(
+                job_id,
+                status="failed",
+                error=str(e),
+                finished_at=datetime.utcnow().isoformat()
+            )
+            print(f"❌ Задача парсинга {job_id} завершилась ошибкой: {e}")
+        finally:
+            with self._lock:
+                done = self._done.get(job_id)
+            if done:
+                done.set()
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._snapshot(self._jobs.get(job_id))
+
+    def active(self):
+        """Текущая незавершённая задача или None"""
+        with self._lock:
+            job = self._jobs.get(self._active_id)
+            if job and job["status"] in ("queued", "running"):
+                return self._snapshot(job)
+            return None
+
+    def list(self):
+        """Задачи от новых к старым"""
+        with self._lock:
+            return [self._snapshot(job) for job in reversed(self._jobs.values())]
+
+    def wait(self, job_id: str, timeout: float = None):
+        """Ждёт завершения задачи (для режима совместимости refresh-cache?wait=true)"""
+        with self._lock:
+            done = self._done.get(job_id)
+        if done:
+            done.wait(timeout)
+        return self.get(job_id)
+
+# Задачи парсинга текущего процесса
+scrape_jobs = ScrapeJobRunner()
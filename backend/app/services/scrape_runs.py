@@ -0,0 +1,73 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pymongo import DESCENDING
+from app.config.database import scrape_runs
+
+# Этапы парсинга в порядке выполнения
+SCRAPE_PHASES = ("http_fetch", "navigate", "render", "scroll", "parse", "download", "derive", "persist")
+
+class ScrapeRunProfile:
+    """
+    Профиль времени одного парсинга по этапам.
+    Страницы обходятся параллельно, поэтому время этапа — сумма по всем
+    страницам и может превышать общее время выполнения (wall_seconds).
+    """
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self._phases = {phase: {"seconds": 0.0, "count": 0} for phase in SCRAPE_PHASES}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            stats = self._phases.setdefault(phase, {"seconds": 0.0, "count": 0})
+            stats["seconds"] += seconds
+            stats["count"] += 1
+
+    @contextmanager
+    def phase(self, name):
+        """Замеряет блок как этап name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def summary(self):
+        with self._lock:
+            phases = {
+                phase: {"seconds": round(stats["seconds"], 3), "count": stats["count"]}
+                for phase, stats in self._phases.items()
+            }
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "phases": phases,
+        }
+
+def save_scrape_run(profile, status, error=None, **details):
+    """Сохраняет документ запуска парсинга; ошибки записи не прерывают парсинг"""
+    document = {
+        **profile.summary(),
+        **details,
+        "status": status,
+        "error": str(error) if error else None,
+        "finished_at": datetime.utcnow(),
+    }
+    try:
+        scrape_runs.insert_one(document)
+    except Exception as e:
+        print(f"❌ Ошибка сохранения профиля парсинга: {e}")
+    document.pop("_id", None)
+    phases = ", ".join(f"{name} {stats['seconds']}s" for name, stats in document["phases"].items())
+    print(f"⏱️ Парсинг за {document['wall_seconds']}s: {phases}")
+    return document
+
+def list_scrape_runs(limit: int = 20):
+    """Последние запуски парсинга с профилем времени"""
+    return list(
+        scrape_runs.find({}, {"_id": 0}).sort("started_at", DESCENDING).limit(limit)
+    )
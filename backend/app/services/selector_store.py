@@ -0,0 +1,70 @@
+from datetime import datetime
+from pymongo import UpdateOne, DESCENDING
+from app.config.database import scraper_selectors
+
+# Сколько последних попаданий хранить в истории селектора
+SELECTOR_HISTORY_SIZE = 20
+
+def _ranked_documents():
+    """Селекторы от лучшего: сработавшие в последнем парсинге, затем по числу попаданий"""
+    return scraper_selectors.find({}, {"_id": 0}).sort([
+        ("layout", 1),
+        ("field", 1),
+        ("last_hit_at", DESCENDING),
+        ("hits", DESCENDING)
+    ])
+
+def load_selector_ranking():
+    """Выученный порядок селекторов {layout: {field: [selector, ...]}} для ListingParser.learn"""
+    ranking = {}
+    try:
+        for doc in _ranked_documents():
+            ranking.setdefault(doc["layout"], {}).setdefault(doc["field"], []).append(doc["selector"])
+    except Exception as e:
+        print(f"❌ Ошибка загрузки выученных селекторов: {e}")
+    return ranking
+
+def record_selector_hits(hits, pages: int):
+    """
+    Сохраняет итоги успешного парсинга.
+    hits — {(layout, field, selector): сколько элементов нашёл селектор}.
+    """
+    if not hits:
+        return
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"layout": layout, "field": field, "selector": selector},
+            {
+                "$inc": {"hits": count, "runs": 1},
+                "$set": {"last_hit_at": now, "last_count": count},
+                "$setOnInsert": {"first_hit_at": now},
+                "$push": {"history": {
+                    "$each": [{"at": now, "count": count, "pages": pages}],
+                    "$slice": -SELECTOR_HISTORY_SIZE
+                }}
+            },
+            upsert=True
+        )
+        for (layout, field, selector), count in hits.items()
+    ]
+    try:
+        scraper_selectors.bulk_write(operations, ordered=False)
+    except Exception as e:
+        print(f"❌ Ошибка сохранения выученных селекторов: {e}")
+
+def get_selector_ranking_report():
+    """Выученный рейтинг селекторов с историей для /api/debug/selectors-test"""
+    layouts = {}
+    for doc in _ranked_documents():
+        fields = layouts.setdefault(doc["layout"], {})
+        fields.setdefault(doc["field"], []).append({
+            "selector": doc["selector"],
+            "hits": doc.get("hits", 0),
+            "runs": doc.get("runs", 0),
+            "last_count": doc.get("last_count"),
+            "last_hit_at": doc.get("last_hit_at"),
+            "first_hit_at": doc.get("first_hit_at"),
+            "history": doc.get("history", []),
+        })
+    return layouts
@@ -2,8 +2,17 @@ import os
 import requests
 from datetime import datetime
 from pathlib import Path
+from lxml.cssselect import CSSSelector
 from app.config.settings import STATIC_IMAGES_DIR, CONTRACTS_DIR, SELENIUM_URL
-from app.config.database import client, scrape_cache
+from app.config.database import client, cars_collection
+from app.config.mongo_pool import pool_metrics
+from app.services.scrape_cache_store import count_active_cars, get_active_generation, load_active_cars
+from app.services.scrape_jobs import scrape_jobs
+from app.services.image_store import image_store
+from app.services.query_cache import cars_query_cache
+from app.services.browser_pool import driver_pool
+from app.services.listing_parser import parse_document, listing_parser
+from app.services.selector_store import get_selector_ranking_report
 
 def get_health_status():
     """Проверяет статус системы и подключенных сервисов"""
@@ -34,14 +43,27 @@ def get_health_status():
         health_status["services"]["selenium"] = f"error: {str(e)}"
         health_status["status"] = "degraded"
     
+    # Пул браузеров: проверяем уже открытые свободные сессии, новые не создаём
+    try:
+        driver_pool.check_idle()
+        health_status["selenium_pool"] = driver_pool.stats()
+    except Exception as e:
+        health_status["selenium_pool"] = {"error": str(e)}
+    
     # Проверка кэша автомобилей
     try:
-        car_count = scrape_cache.count_documents({})
-        health_status["services"]["car_cache"] = f"ok ({car_count} cars)"
+        car_count = count_active_cars()
+        health_status["services"]["car_cache"] = f"ok ({car_count} cars, generation {get_active_generation()})"
     except Exception as e:
         health_status["services"]["car_cache"] = f"error: {str(e)}"
         health_status["status"] = "degraded"
     
+    # Статистика кэша результатов /api/cars
+    health_status["cars_query_cache"] = cars_query_cache.stats()
+    
+    # Пул соединений MongoDB: рост ожидания значит, что пул меньше нагрузки
+    health_status["mongodb_pool"] = pool_metrics.stats()
+    
     return health_status
 
 def get_images_stats():
@@ -51,14 +73,15 @@ def get_images_stats():
         if not images_dir.exists():
             return {"total_images": 0, "total_size": 0, "status": "directory_not_found"}
         
-        image_files = list(images_dir.glob("*"))
-        total_size = sum(f.stat().st_size for f in image_files if f.is_file())
+        image_files = [f for f in images_dir.rglob("*") if f.is_file()]
+        total_size = sum(f.stat().st_size for f in image_files)
         
         return {
             "total_images": len(image_files),
             "total_size": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
             "directory": str(images_dir),
+            "store": image_store.stats(),
             "status": "ok"
         }
     except Exception as e:
@@ -74,8 +97,8 @@ def get_volumes_stats():
         
         # Статистика изображений
         if STATIC_IMAGES_DIR.exists():
-            image_files = list(STATIC_IMAGES_DIR.glob("*"))
-            total_size = sum(f.stat().st_size for f in image_files if f.is_file())
+            image_files = [f for f in STATIC_IMAGES_DIR.rglob("*") if f.is_file()]
+            total_size = sum(f.stat().st_size for f in image_files)
             stats["images"] = {
                 "files": len(image_files),
                 "size_mb": round(total_size / (1024 * 1024), 2)
@@ -100,21 +123,29 @@ def get_volumes_stats():
         return {"error": str(e), "status": "error"}
 
 def cleanup_images():
-    """Очищает папку с изображениями"""
+    """
+    Сборка мусора изображений: удаляет только файлы, на которые
+    не ссылается ни один автомобиль активного кэша или read-модели cars
+    """
     try:
-        images_dir = STATIC_IMAGES_DIR
-        if not images_dir.exists():
+        if not STATIC_IMAGES_DIR.exists():
             return {"message": "Directory not found", "status": "ok"}
         
-        deleted_count = 0
-        for image_file in images_dir.glob("*"):
-            if image_file.is_file():
-                image_file.unlink()
-                deleted_count += 1
+        # Идущий парсинг пишет изображения автомобилей, которых ещё нет в кэше
+        if scrape_jobs.active():
+            return {"message": "Scrape in progress, try again later", "status": "busy"}
+        
+        live_cars = load_active_cars()
+        live_cars += [
+            {"car_id": car.get("id"), "local_image_url": car.get("local_image_url")}
+            for car in cars_collection.find({}, {"_id": 0, "id": 1, "local_image_url": 1})
+        ]
+        report = image_store.collect_garbage(live_cars)
         
         return {
-            "message": f"Deleted {deleted_count} images",
-            "deleted_count": deleted_count,
+            "message": f"Deleted {report['deleted_files']} unreferenced images",
+            "deleted_count": report["deleted_files"],
+            **report,
             "status": "ok"
         }
     except Exception as e:
@@ -164,95 +195,32 @@ def get_debug_page_source():
             "message": str(e)
         }
 
+def _select(root, selector):
+    """Элементы по CSS-селектору на дереве lxml (как в разборе при парсинге)"""
+    if root is None:
+        return []
+    return CSSSelector(selector, translator="html")(root)
+
+def _classes(element):
+    return (element.get('class') or '').split()
+
 def test_selectors():
-    """Тестирует различные селекторы на последней сохраненной странице"""
+    """
+    Выученный рейтинг селекторов по вёрсткам: какие селекторы контейнеров,
+    заголовков и цен сработали в прошлых парсингах и будут пробоваться первыми
+    """
     try:
-        if not os.path.exists("debug_page_source.html"):
+        layouts = get_selector_ranking_report()
+        if not layouts:
             return {
                 "status": "not_found",
-                "message": "No debug page source found. Run scraping first."
-            }
-        
-        from bs4 import BeautifulSoup
-        
-        with open("debug_page_source.html", "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        soup = BeautifulSoup(content, "html.parser")
-        
-        # Тестируем различные селекторы
-        selectors_to_test = [
-            # Основные селекторы для карточек автомобилей
-            "li.cxc-card",
-            "li.cards-li",
-            "li.list-photo-li",
-            ".cxc-card",
-            ".cards-li",
-            ".list-photo-li",
-            
-            # Комбинированные селекторы
-            "li.cards-li.cxc-card",
-            "li.list-photo-li.cxc-card",
-            "li.cards-li.list-photo-li",
-            
-            # Альтернативные селекторы
-            "div[class*='viewlist_li']",
-            "li[class*='list-item']", 
-            "div[class*='list-item']",
-            "div[class*='car-card']",
-            "div[class*='item-pic']",
-            "div[class*='pic-box']",
-            "div[class*='result']",
-            ".list-item",
-            "article",
-            
-            # Дополнительные селекторы из интересных классов
-            ".vehicle-search-list",
-            ".vehicle-second-list",
-            ".tp-cards-tofu",
-            ".right-sidebar-car"
-        ]
-        
-        results = {}
-        
-        for selector in selectors_to_test:
-            elements = soup.select(selector)
-            results[selector] = {
-                "count": len(elements),
-                "sample_classes": [elem.get('class', []) for elem in elements[:3]],
-                "sample_text": [elem.get_text()[:100].strip() for elem in elements[:3]]
-            }
-        
-        # Также ищем все уникальные классы
-        all_divs = soup.find_all(['div', 'li', 'article'])
-        unique_classes = set()
-        for div in all_divs:
-            classes = div.get('class', [])
-            for cls in classes:
-                if any(keyword in cls.lower() for keyword in ['list', 'item', 'car', 'card', 'photo', 'wrap']):
-                    unique_classes.add(cls)
-        
-        # Анализ структуры найденных карточек
-        car_cards = soup.select("li.cxc-card")
-        card_analysis = {}
-        if car_cards:
-            sample_card = car_cards[0]
-            card_analysis = {
-                "total_cards": len(car_cards),
-                "sample_id": sample_card.get('id', ''),
-                "sample_classes": sample_card.get('class', []),
-                "sample_attributes": {k: v for k, v in sample_card.attrs.items() if k not in ['class', 'id']},
-                "has_link": bool(sample_card.find('a')),
-                "has_image": bool(sample_card.find('img')),
-                "has_price": bool(sample_card.find(text=lambda text: text and '万' in text))
+                "message": "No learned selectors yet. Run scraping first."
             }
         
         return {
             "status": "ok",
-            "selector_results": results,
-            "interesting_classes": sorted(list(unique_classes)),
-            "total_divs": len(all_divs),
-            "card_analysis": card_analysis
+            "min_cached_items": listing_parser.min_cached_items,
+            "layouts": layouts
         }
         
     except Exception as e:
@@ -276,26 +244,23 @@ def test_custom_selector(selector: str):
                 "message": "No debug page source found. Run scraping first."
             }
         
-        from bs4 import BeautifulSoup
-        
         with open("debug_page_source.html", "r", encoding="utf-8") as f:
             content = f.read()
         
-        soup = BeautifulSoup(content, "html.parser")
-        elements = soup.select(selector)
+        elements = _select(parse_document(content), selector)
         
         # Анализ найденных элементов
         analysis = {
             "count": len(elements),
-            "sample_classes": [elem.get('class', []) for elem in elements[:5]],
-            "sample_text": [elem.get_text()[:200].strip() for elem in elements[:5]],
+            "sample_classes": [_classes(elem) for elem in elements[:5]],
+            "sample_text": [elem.text_content()[:200].strip() for elem in elements[:5]],
             "sample_ids": [elem.get('id', '') for elem in elements[:5]],
             "sample_attributes": []
         }
         
         # Анализ атрибутов первых 3 элементов
         for elem in elements[:3]:
-            attrs = {k: v for k, v in elem.attrs.items() if k not in ['class', 'id']}
+            attrs = {k: v for k, v in elem.attrib.items() if k not in ['class', 'id']}
             analysis["sample_attributes"].append(attrs)
         
         return {
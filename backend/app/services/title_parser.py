@@ -0,0 +1,274 @@
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+# Допустимый диапазон годов выпуска
+MIN_YEAR = 1990
+MAX_YEAR = 2024
+
+# Бренды в порядке приоритета: китайские проверяются раньше английских,
+# внутри списка побеждает бренд, стоящий раньше, а не раньше найденный в тексте
+CHINESE_BRANDS = (
+    '奔驰', '宝马', '奥迪', '大众', '丰田', '本田', '日产', '马自达', '斯巴鲁', '雷克萨斯',
+    '现代', '起亚', '特斯拉', '比亚迪', '蔚来', '小鹏', '理想', '吉利', '长城', '哈弗',
+    '博越', '星越', '威尔法', '路虎', '北京越野', '哈弗大狗', 'Polo'
+)
+
+ENGLISH_BRANDS = (
+    'BMW', 'Mercedes', 'Audi', 'Volkswagen', 'Toyota', 'Honda', 'Nissan', 'Mazda',
+    'Subaru', 'Lexus', 'Hyundai', 'KIA', 'Tesla', 'BYD', 'NIO', 'XPeng', 'Li Auto',
+    'Geely', 'Great Wall', 'Haval', 'Land Rover'
+)
+
+# Ключевые слова по группам; группа, стоящая раньше, имеет приоритет
+TRANSMISSION_KEYWORDS = (
+    ('Automatic', ('自动', 'DCT', 'CVT', 'AT')),
+    ('Manual', ('手动', 'MT', '手挡')),
+)
+
+FUEL_KEYWORDS = (
+    ('Hybrid', ('混动', 'HV', '双擎', 'Hybrid')),
+    ('Electric', ('电动', 'EV', '纯电')),
+    ('Diesel', ('柴油', 'Diesel', 'TDI', 'CDI')),
+    ('Petrol', ('汽油', 'TFSI', 'TSI', 'Petrol')),
+)
+
+DRIVE_KEYWORDS = (
+    ('AWD', ('四驱', '4WD', 'AWD', '4MATIC', 'xDrive', 'quattro')),
+    ('FWD', ('前驱', 'FWD')),
+    ('RWD', ('后驱', 'RWD')),
+)
+
+# Страна производителя по бренду (порядок важен для частичного совпадения)
+_COUNTRY_ITEMS = (
+    # Немецкие бренды
+    ('奔驰', 'germany'), ('宝马', 'germany'), ('奥迪', 'germany'), ('大众', 'germany'),
+    ('BMW', 'germany'), ('Mercedes', 'germany'), ('Audi', 'germany'), ('Volkswagen', 'germany'),
+    ('迈巴赫', 'germany'), ('AMG', 'germany'), ('保时捷', 'germany'), ('Porsche', 'germany'),
+
+    # Японские бренды
+    ('丰田', 'japan'), ('本田', 'japan'), ('日产', 'japan'), ('马自达', 'japan'), ('斯巴鲁', 'japan'), ('雷克萨斯', 'japan'),
+    ('Toyota', 'japan'), ('Honda', 'japan'), ('Nissan', 'japan'), ('Mazda', 'japan'), ('Subaru', 'japan'), ('Lexus', 'japan'),
+    ('奥德赛', 'japan'), ('英菲尼迪', 'japan'), ('Infiniti', 'japan'), ('讴歌', 'japan'), ('Acura', 'japan'),
+
+    # Корейские бренды
+    ('现代', 'korea'), ('起亚', 'korea'), ('Hyundai', 'korea'), ('KIA', 'korea'),
+    ('捷尼赛思', 'korea'), ('Genesis', 'korea'),
+
+    # Американские бренды
+    ('特斯拉', 'usa'), ('Tesla', 'usa'), ('福特', 'usa'), ('Ford', 'usa'), ('雪佛兰', 'usa'), ('Chevrolet', 'usa'),
+    ('凯迪拉克', 'usa'), ('Cadillac', 'usa'), ('林肯', 'usa'), ('Lincoln', 'usa'), ('别克', 'usa'), ('Buick', 'usa'),
+    ('探险者', 'usa'), ('Explorer', 'usa'),
+
+    # Китайские бренды
+    ('比亚迪', 'china'), ('蔚来', 'china'), ('小鹏', 'china'), ('理想', 'china'), ('吉利', 'china'),
+    ('长城', 'china'), ('哈弗', 'china'), ('博越', 'china'), ('星越', 'china'), ('威尔法', 'china'),
+    ('哈弗大狗', 'china'), ('北京越野', 'china'), ('传祺', 'china'), ('广汽', 'china'),
+    ('BYD', 'china'), ('NIO', 'china'), ('XPeng', 'china'), ('Li Auto', 'china'), ('Geely', 'china'),
+    ('深蓝', 'china'), ('阿维塔', 'china'), ('零跑', 'china'), ('极狐', 'china'), ('世纪', 'china'),
+
+    # Британские бренды
+    ('路虎', 'uk'), ('Land Rover', 'uk'), ('揽胜', 'uk'), ('Range Rover', 'uk'), ('捷豹', 'uk'), ('Jaguar', 'uk'),
+    ('迈凯伦', 'uk'), ('McLaren', 'uk'), ('宾利', 'uk'), ('Bentley', 'uk'), ('劳斯莱с', 'uk'), ('Rolls-Royce', 'uk'),
+
+    # Итальянские бренды
+    ('法拉利', 'italy'), ('Ferrari', 'italy'), ('兰博基尼', 'italy'), ('Lamborghini', 'italy'),
+    ('玛莎拉蒂', 'italy'), ('Maserati', 'italy'), ('阿尔法罗密欧', 'italy'), ('Alfa Romeo', 'italy'),
+
+    # Французские бренды
+    ('标致', 'france'), ('Peugeot', 'france'), ('雪铁龙', 'france'), ('Citroën', 'france'),
+    ('雷诺', 'france'), ('Renault', 'france'), ('DS', 'france'),
+
+    # Шведские бренды
+    ('沃尔沃', 'sweden'), ('Volvo', 'sweden'),
+
+    # Швейцарские бренды
+    ('保时捷', 'switzerland'), ('Porsche', 'switzerland'),
+)
+
+# Как и у литерала dict: повторный ключ сохраняет позицию, но берёт последнее значение
+COUNTRY_BY_BRAND = MappingProxyType(dict(_COUNTRY_ITEMS))
+
+def _priority_matcher(words):
+    """
+    Регулярка, которая в каждой позиции текста находит слово с наивысшим приоритетом.
+    Lookahead даёт пересекающиеся совпадения, поэтому ни одно вхождение не теряется.
+    """
+    alternation = '|'.join(re.escape(word) for word in words)
+    return re.compile(f'(?=({alternation}))')
+
+def _is_word_char(char):
+    """Совпадает с \\w в unicode-регулярках Python"""
+    return char.isalnum() or char == '_'
+
+class TitleParser:
+    """
+    Разбор заголовка объявления: год, бренд, модель, страна, цена и характеристики.
+    Все регулярки и индексы строятся один раз при создании объекта.
+    """
+
+    # Кандидаты в годы во всех позициях, включая пересекающиеся
+    _year_candidates = re.compile(r'(?=(20[0-2][0-9]|199[0-9]))')
+    _model_year = re.compile(r'\b(20[0-2][0-9]|19[9][0-9])\b')
+    _engine_volume_token = re.compile(r'^\d+[\.\d]*[LT]?$')
+    _engine_volume = re.compile(r'(\d+\.?\d*)[LT]')
+    _price_number = re.compile(r'(\d+\.?\d*)')
+
+    def __init__(self):
+        self._chinese_priority = {brand: i for i, brand in enumerate(CHINESE_BRANDS)}
+        self._chinese_matcher = _priority_matcher(CHINESE_BRANDS)
+
+        english_lower = [brand.lower() for brand in ENGLISH_BRANDS]
+        self._english_by_lower = {}
+        for brand in ENGLISH_BRANDS:
+            self._english_by_lower.setdefault(brand.lower(), brand)
+        self._english_priority = {}
+        for i, brand in enumerate(english_lower):
+            self._english_priority.setdefault(brand, i)
+        self._english_matcher = _priority_matcher(english_lower)
+
+        self._transmission = self._keyword_classifier(TRANSMISSION_KEYWORDS)
+        self._fuel = self._keyword_classifier(FUEL_KEYWORDS)
+        self._drive = self._keyword_classifier(DRIVE_KEYWORDS)
+
+        self._country_items = tuple(COUNTRY_BY_BRAND.items())
+        self.country_by_brand = lru_cache(maxsize=4096)(self._country_by_brand)
+
+    @staticmethod
+    def _keyword_classifier(groups):
+        """Строит (регулярка, ключевое слово -> номер группы, значения групп)"""
+        group_of = {}
+        keywords = []
+        for index, (_, words) in enumerate(groups):
+            for word in words:
+                if word not in group_of:
+                    group_of[word] = index
+                    keywords.append(word)
+        keywords.sort(key=lambda word: group_of[word])
+        return _priority_matcher(keywords), group_of, tuple(value for value, _ in groups)
+
+    @staticmethod
+    def _classify(text, classifier, default):
+        """Значение группы с наивысшим приоритетом среди найденных ключевых слов"""
+        matcher, group_of, values = classifier
+        best = None
+        for match in matcher.finditer(text):
+            group = group_of[match.group(1)]
+            if best is None or group < best:
+                best = group
+                if best == 0:
+                    break
+        return values[best] if best is not None else default
+
+    def extract_year(self, text):
+        """
+        Год выпуска. Порядок как у прежних четырёх регулярок:
+        20xx по границам слова, 199x по границам слова, затем те же без границ.
+        """
+        bounded_2000 = bounded_1990 = any_2000 = any_1990 = None
+        for match in self._year_candidates.finditer(text):
+            start = match.start()
+            value = match.group(1)
+            bounded = (
+                (start == 0 or not _is_word_char(text[start - 1]))
+                and (start + 4 == len(text) or not _is_word_char(text[start + 4]))
+            )
+            if value.startswith('20'):
+                if any_2000 is None:
+                    any_2000 = value
+                if bounded and bounded_2000 is None:
+                    bounded_2000 = value
+            else:
+                if any_1990 is None:
+                    any_1990 = value
+                if bounded and bounded_1990 is None:
+                    bounded_1990 = value
+
+        for candidate in (bounded_2000, bounded_1990, any_2000, any_1990):
+            if candidate is None:
+                continue
+            year = int(candidate)
+            if MIN_YEAR <= year <= MAX_YEAR:
+                return year
+            print(f"   Год {year} вне допустимых пределов")
+
+        print(f"   Год не найден в тексте: {text}")
+        return None
+
+    def extract_brand(self, text):
+        """Бренд: сначала китайские названия, затем английские без учёта регистра"""
+        best = None
+        for match in self._chinese_matcher.finditer(text):
+            brand = match.group(1)
+            if best is None or self._chinese_priority[brand] < self._chinese_priority[best]:
+                best = brand
+        if best is not None:
+            return best
+
+        for match in self._english_matcher.finditer(text.lower()):
+            brand = match.group(1)
+            if best is None or self._english_priority[brand] < self._english_priority[best]:
+                best = brand
+        if best is not None:
+            return self._english_by_lower[best]
+
+        # Если не найден, берем первое слово
+        words = text.split()
+        return words[0] if words else "Unknown"
+
+    def extract_model(self, text, brand):
+        """Модель: до трёх слов после удаления бренда, года и объёма двигателя"""
+        if not brand or brand == "Unknown":
+            return "Unknown Model"
+
+        text_without_brand = text.replace(brand, '').strip()
+
+        year_match = self._model_year.search(text_without_brand)
+        if year_match:
+            text_without_brand = text_without_brand.replace(year_match.group(), '').strip()
+
+        model_words = [
+            word for word in text_without_brand.split()[:3]
+            if word and not self._engine_volume_token.match(word)
+        ]
+        return ' '.join(model_words) if model_words else "Unknown Model"
+
+    def extract_engine_volume(self, text):
+        volume_match = self._engine_volume.search(text)
+        return f"{volume_match.group(1)}L" if volume_match else None
+
+    def extract_transmission(self, text):
+        return self._classify(text, self._transmission, 'Unknown')
+
+    def extract_fuel_type(self, text):
+        return self._classify(text, self._fuel, 'Petrol')
+
+    def extract_drive_type(self, text):
+        return self._classify(text, self._drive, 'FWD')
+
+    def parse_price(self, price_str):
+        """Первое число из строки типа "26.58万" или "18.28万31.02万" """
+        if not price_str:
+            return 0
+
+        price_match = self._price_number.search(str(price_str))
+        if price_match:
+            return float(price_match.group())
+
+        print(f"   Цена не найдена в строке: {price_str}")
+        return 0
+
+    def _country_by_brand(self, brand_name):
+        # Проверяем точное совпадение
+        if brand_name in COUNTRY_BY_BRAND:
+            return COUNTRY_BY_BRAND[brand_name]
+
+        # Проверяем частичное совпадение
+        for brand, country in self._country_items:
+            if brand in brand_name or brand_name in brand:
+                return country
+
+        return 'unknown'
+
+# Общий экземпляр: строится один раз при импорте модуля
+title_parser = TitleParser()
@@ -4,6 +4,8 @@ from typing import Optional
 from fastapi import HTTPException
 from pydantic import ValidationError
 from app.config.database import ural_credit_applications
+from app.services.pagination import find_page
+from app.services.application_counters import application_counters
 from app.models.ural_credit import (
     UralCreditApplicationCreate,
     UralCreditApplicationUpdate,
@@ -65,6 +67,7 @@ def submit_ural_credit_application(
             db_application["user_id"] = application.telegramUser.get("id")
 
         ural_credit_applications.insert_one(db_application)
+        application_counters.created("ural_credit")
 
         print(f"✅ Заявка Уралсиб кредит сохранена: ID {application_id}")
 
@@ -81,20 +84,14 @@ def submit_ural_credit_application(
 def get_ural_credit_stats():
     """Получение статистики заявок Уралсиб кредит"""
     try:
-        stats = {
-            "total": ural_credit_applications.count_documents({}),
-            "new": ural_credit_applications.count_documents({"status": "new"}),
-            "processing": ural_credit_applications.count_documents({"status": "processing"}),
-            "approved": ural_credit_applications.count_documents({"status": "approved"}),
-            "rejected": ural_credit_applications.count_documents({"status": "rejected"})
-        }
+        stats = application_counters.get("ural_credit")
 
         return stats
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
-def get_ural_credit_applications(page: int = 1, page_size: int = 10, status: str = None):
+def get_ural_credit_applications(page: int = 1, page_size: int = 10, status: str = None, cursor: str = None):
     """Получение списка заявок Уралсиб кредит"""
     try:
         # Фильтр по статусу
@@ -105,11 +102,10 @@ def get_ural_credit_applications(page: int = 1, page_size: int = 10, status: str
         # Подсчет общего количества
         total = ural_credit_applications.count_documents(filter_query)
 
-        # Пагинация
-        skip = (page - 1) * page_size
-        applications = list(ural_credit_applications.find(
-            filter_query
-        ).skip(skip).limit(page_size).sort("created_at", -1))
+        # Пагинация: по курсору (created_at, _id) или через skip
+        applications, next_page_cursor = find_page(
+            ural_credit_applications, filter_query, page, page_size, cursor
+        )
 
         # Конвертируем ObjectId в строки для JSON сериализации
         for app in applications:
@@ -120,9 +116,12 @@ def get_ural_credit_applications(page: int = 1, page_size: int = 10, status: str
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_page_cursor,
             "data": applications
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get applications: {str(e)}")
 
@@ -151,19 +150,23 @@ def update_ural_credit_status(application_id: str, status_data: dict):
         update_data = UralCreditApplicationUpdate(**status_data)
 
         # Обновляем статус
-        result = ural_credit_applications.update_one(
+        # Прежний статус нужен для счётчиков
+        previous = ural_credit_applications.find_one_and_update(
             {"_id": application_id},
             {
                 "$set": {
                     "status": update_data.status.value,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1}
         )
 
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.status_changed("ural_credit", previous.get("status"), update_data.status.value)
+
         return {
             "success": True,
             "message": f"Application status updated to {update_data.status}"
@@ -177,11 +180,14 @@ def update_ural_credit_status(application_id: str, status_data: dict):
 def delete_ural_credit_application(application_id: str):
     """Удаление заявки Уралсиб кредит"""
     try:
-        result = ural_credit_applications.delete_one({"_id": application_id})
+        # Статус удалённой заявки нужен для счётчиков
+        deleted = ural_credit_applications.find_one_and_delete({"_id": application_id}, projection={"status": 1})
 
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Application not found")
 
+        application_counters.deleted("ural_credit", deleted.get("status"))
+
         return {
             "success": True,
             "message": "Application deleted successfully"
@@ -29,6 +29,14 @@ def save_phone(phone: str, current_user: dict):
     user = users_collection.find_one({"telegram_id": telegram_id}, {"_id": 0})
     return {"success": True, "user": user}
 
+def token_profile(current_user: dict):
+    """Базовый профиль из данных токена, если пользователя нет в БД"""
+    return {
+        "telegram_id": current_user.get("user_id"),
+        "username": current_user.get("username"),
+        "first_name": current_user.get("first_name"),
+    }
+
 def get_user_profile(current_user: dict):
     """Возвращает профиль пользователя из БД"""
     if not current_user:
@@ -38,11 +46,7 @@ def get_user_profile(current_user: dict):
     user = users_collection.find_one({"telegram_id": telegram_id}, {"_id": 0})
     if not user:
         # Вернем базовую информацию хотя бы из токена
-        user = {
-            "telegram_id": telegram_id,
-            "username": current_user.get("username"),
-            "first_name": current_user.get("first_name"),
-        }
+        user = token_profile(current_user)
     return {"success": True, "user": user}
 
 def save_phone_from_telegram(phone_number: str, owner_id: int):
@@ -0,0 +1,164 @@
+"""
+Нагрузочное сравнение синхронного и асинхронного пути горячих GET-эндпоинтов.
+
+Запускает приложение (uvicorn, один воркер) дважды — с MONGO_READ_PATH=sync
+и MONGO_READ_PATH=async — и для каждого уровня конкурентности отправляет
+одинаковую смесь запросов: /api/cars с фильтром title (идёт в MongoDB),
+/api/cars с диапазонами цены и года и поиском q (индекс каталога в памяти),
+/api/reviews, /api/cities/search, /api/auth/me и списки заявок. Печатает
+запросы в секунду, перцентили задержки, ошибки и ожидание соединения
+из пула MongoDB с момента старта сервера (/api/debug/mongo-pool).
+
+Синхронный путь ограничен пулом потоков Starlette (40 по умолчанию),
+асинхронный — только MONGO_MAX_POOL_SIZE.
+
+Нужен доступный MongoDB с данными (docker compose up mongo). Запуск из каталога backend:
+    MONGO_URL=mongodb://localhost:27017/ python benchmarks/async_load_test.py [запросов] [конкурентность ...]
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+import jwt
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config.settings import JWT_SECRET, JWT_ALGORITHM
+
+HOST = "127.0.0.1"
+PORT = 8765
+READ_PATHS = ("sync", "async")
+DEFAULT_CONCURRENCY = (10, 50, 200)
+
+def request_paths(rnd):
+    """Смесь запросов; разные страницы и диапазоны, чтобы не отвечать из кэша /api/cars"""
+    page = rnd.randint(1, 20)
+    price_from = rnd.randint(1, 40)
+    return rnd.choice([
+        f"/api/cars?page={page}&page_size=20&title={quote('a')}&sort_by=price",
+        f"/api/cars?page={page}&page_size=20&price_from={price_from}&price_to={price_from + rnd.randint(5, 50)}&sort_by=year",
+        f"/api/cars?page={page}&page_size=20&year_from={rnd.randint(2005, 2022)}&sort_by=price&sort_order=desc",
+        f"/api/cars?page={page}&page_size=20&q={quote(rnd.choice(['bmw', 'toyota', 'audi', 'geely']))}",
+        f"/api/reviews?page={page}&page_size=10",
+        f"/api/cities/search?query={quote(rnd.choice(['Мос', 'Сан', 'Кра', 'Нов']))}",
+        "/api/auth/me",
+        f"/api/applications/otp-credit?page={page}&page_size=10",
+        f"/api/applications/credit?page={page}&page_size=10&status=new",
+        f"/api/applications/direct-leasing?page={page}&page_size=10",
+    ])
+
+async def fetch(path, token):
+    """GET по HTTP/1.1 без сторонних клиентов: (статус, тело, секунды)"""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write((
+        f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n"
+        f"Authorization: Bearer {token}\r\nConnection: close\r\n\r\n"
+    ).encode("utf-8"))
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1]) if head else 0
+    return status, body, time.perf_counter() - started
+
+async def run_level(total, concurrency, token):
+    rnd = random.Random(concurrency)
+    paths = [request_paths(rnd) for _ in range(total)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(path):
+        nonlocal errors
+        async with semaphore:
+            try:
+                status, _, seconds = await fetch(path, token)
+            except OSError:
+                errors += 1
+                return
+            if status != 200:
+                errors += 1
+            latencies.append(seconds)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(path) for path in paths))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    _, body, _ = await fetch("/api/debug/mongo-pool", token)
+    pool = json.loads(body)
+    metrics = pool["async_metrics"] if pool.get("read_path") == "async" else pool["metrics"]
+    return {
+        "rps": total / elapsed,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "errors": errors,
+        "pool_wait_max_ms": metrics["wait_max_ms"],
+        "pool_in_use_peak": metrics["in_use_peak"],
+    }
+
+def start_server(read_path):
+    env = {**os.environ, "MONGO_READ_PATH": read_path}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", HOST, "--port", str(PORT), "--workers", "1", "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            status, _, _ = asyncio.run(fetch("/api/health", ""))
+            if status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("Сервер не запустился за 60 секунд")
+
+def main():
+    args = [int(arg) for arg in sys.argv[1:]]
+    total = args[0] if args else 2000
+    levels = args[1:] or DEFAULT_CONCURRENCY
+    token = jwt.encode({"user_id": 1, "username": "loadtest"}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+    results = {}
+    for read_path in READ_PATHS:
+        server = start_server(read_path)
+        try:
+            # Прогрев: соединения пула, кэш городов и индекс каталога
+            asyncio.run(run_level(100, 10, token))
+            for concurrency in levels:
+                results[(read_path, concurrency)] = asyncio.run(run_level(total, concurrency, token))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{total} запросов на уровень, один воркер uvicorn")
+    for concurrency in levels:
+        print(f"конкурентность {concurrency}")
+        for read_path in READ_PATHS:
+            result = results[(read_path, concurrency)]
+            print(
+                f"   {read_path:<5} {result['rps']:8.1f} rps  p50 {result['p50']:7.1f} ms  "
+                f"p95 {result['p95']:7.1f} ms  p99 {result['p99']:7.1f} ms  ошибок {result['errors']:>4}  "
+                f"ожидание пула до {result['pool_wait_max_ms']} ms, занято до {result['pool_in_use_peak']}"
+            )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Проверка ImageDownloader на локальном HTTP-сервере-заглушке.
+
+Сервер (http.server в отдельном потоке) отдаёт изображения по маршрутам:
+    /sequence/<имя>.jpg — ответы по очереди 200, 503, 200, ...
+    /unavailable.jpg    — всегда 503
+    /missing.jpg        — 404
+    /page.jpg           — 200, но text/html
+    /slow/<имя>.jpg     — 200 после паузы SLOW_SECONDS
+    /fast/<имя>.jpg     — 200 сразу
+    /same/<имя>.jpg     — 200 с одинаковым содержимым для всех имён
+Проверяет попытки и статусы (повторы с backoff, неповторяемые ошибки),
+пропуск уже скачанных URL, дедупликацию по содержимому, лимит частоты на хост
+и сводку пропускной способности download_many. MongoDB не нужен: индекс
+хранилища держится в памяти, файлы пишутся во временный каталог.
+
+Запуск из каталога backend:
+    python benchmarks/image_download_stub.py
+"""
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.image_store import ImageStore, blob_local_url
+from app.services.image_downloader import ImageDownloader
+
+SLOW_SECONDS = 0.2
+BACKOFF = 0.05
+IMAGE_BYTES = b"\xff\xd8\xff\xe0" + b"stub-image" * 1000
+
+class StubState:
+    """Счётчики запросов сервера-заглушки"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sequence = [200, 503]
+        self.sequence_position = 0
+        self.requests = []  # (путь, время)
+
+    def next_sequence_status(self):
+        with self.lock:
+            status = self.sequence[self.sequence_position % len(self.sequence)]
+            self.sequence_position += 1
+            return status
+
+    def record(self, path):
+        with self.lock:
+            self.requests.append((path, time.monotonic()))
+
+    def count(self, prefix=""):
+        with self.lock:
+            return sum(1 for path, _ in self.requests if path.startswith(prefix))
+
+    def times(self, prefix):
+        with self.lock:
+            return [at for path, at in self.requests if path.startswith(prefix)]
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b"", content_type="image/jpeg"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            state.record(self.path)
+            if self.path.startswith("/sequence/"):
+                status = state.next_sequence_status()
+                self._send(status, IMAGE_BYTES + self.path.encode() if status == 200 else b"")
+            elif self.path == "/unavailable.jpg":
+                self._send(503)
+            elif self.path == "/missing.jpg":
+                self._send(404)
+            elif self.path == "/page.jpg":
+                self._send(200, b"<html></html>", content_type="text/html")
+            elif self.path.startswith("/slow/"):
+                time.sleep(SLOW_SECONDS)
+                self._send(200, IMAGE_BYTES + self.path.encode())
+            elif self.path.startswith("/fast/"):
+                self._send(200, IMAGE_BYTES + self.path.encode())
+            elif self.path.startswith("/same/"):
+                # Одно и то же содержимое под разными URL
+                self._send(200, IMAGE_BYTES)
+            else:
+                self._send(404)
+
+    return StubHandler
+
+class MemoryImageStore(ImageStore):
+    """Хранилище во временном каталоге с индексом URL в памяти вместо image_blobs"""
+
+    def __init__(self, images_dir):
+        super().__init__(images_dir)
+        self.blobs = {}
+
+    def lookup_urls(self, urls):
+        return {url: self.blobs[url] for url in urls if url in self.blobs}
+
+    def register_blobs(self, reports):
+        for report in reports:
+            if report["status"] == "downloaded":
+                extension = Path(report["local_url"]).suffix
+                self.blobs[report["url"]] = {
+                    "sha256": report["sha256"],
+                    "local_url": blob_local_url(report["sha256"], extension),
+                }
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f"   ✅ {message}")
+
+def main():
+    state = StubState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        with tempfile.TemporaryDirectory() as images_dir:
+            store = MemoryImageStore(images_dir)
+            downloader = ImageDownloader(store=store, concurrency=8, host_rate_limit=0, retries=2, backoff=BACKOFF, timeout=5)
+
+            print("Повторы и статусы")
+            first = downloader.download(f"{base}/sequence/a.jpg", "car_a")
+            check(first["status"] == "downloaded" and first["attempts"] == 1, "200 — скачано с первой попытки")
+            second = downloader.download(f"{base}/sequence/b.jpg", "car_b")
+            check(second["status"] == "downloaded" and second["attempts"] == 2, "503, затем 200 — скачано со второй попытки")
+            check(second["seconds"] >= BACKOFF, f"время включает backoff ({second['seconds']}s)")
+            check(store.path_for(second["sha256"], ".jpg").exists(), "файл лежит в хранилище по SHA-256")
+
+            unavailable = downloader.download(f"{base}/unavailable.jpg", "car_c")
+            check(
+                unavailable["status"] == "error: status 503" and unavailable["attempts"] == 3,
+                "всегда 503 — retries + 1 попытки и ошибка"
+            )
+            check(unavailable["seconds"] >= BACKOFF * 3, f"backoff удваивается ({unavailable['seconds']}s)")
+            missing = downloader.download(f"{base}/missing.jpg", "car_d")
+            check(missing["status"].startswith("error") and missing["attempts"] == 1, "404 не повторяется")
+            page = downloader.download(f"{base}/page.jpg", "car_e")
+            check(page["status"].startswith("error") and page["attempts"] == 1, "не изображение — ошибка без повторов")
+
+            print("Пропускная способность download_many")
+            jobs = [(f"{base}/slow/{i}.jpg", f"car_{i}") for i in range(16)]
+            reports, summary = downloader.download_many(jobs)
+            check(summary["downloaded"] == 16 and summary["failed"] == 0, "16 медленных изображений скачаны")
+            check(
+                summary["seconds"] < 16 * SLOW_SECONDS / 2,
+                f"параллельно: {summary['seconds']}s против {16 * SLOW_SECONDS:.1f}s последовательно"
+            )
+            check(
+                summary["images_per_second"] > 2 / SLOW_SECONDS,
+                f"{summary['images_per_second']} изобр/с, {summary['bytes_per_second']} байт/с"
+            )
+            check(all(report["seconds"] >= SLOW_SECONDS for report in reports), "время каждого изображения в отчёте")
+
+            requests_before = state.count("/slow/")
+            reports, summary = downloader.download_many(jobs)
+            check(
+                summary["cached"] == 16 and state.count("/slow/") == requests_before,
+                "повторный запуск берёт всё из хранилища без запросов"
+            )
+            check(all(isinstance(report["seconds"], float) for report in reports), "время заполнено и для cached")
+
+            reports, _ = downloader.download_many([(f"{base}/same/{i}.jpg", f"car_{i}") for i in range(3)])
+            check(len({report["sha256"] for report in reports}) == 1, "одинаковое содержимое — один файл")
+
+            print("Лимит частоты на хост")
+            rate = 20
+            limited = ImageDownloader(store=store, concurrency=8, host_rate_limit=rate, retries=0, timeout=5)
+            _, summary = limited.download_many([(f"{base}/fast/{i}.jpg", f"car_{i}") for i in range(10)])
+            times = sorted(state.times("/fast/"))
+            gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+            check(summary["downloaded"] == 10, "10 изображений с одного хоста скачаны")
+            check(
+                summary["seconds"] >= 9 / rate * 0.9,
+                f"не чаще {rate} запросов в секунду: {summary['seconds']}s на 10 запросов"
+            )
+            check(min(gaps) >= 1 / rate * 0.5, f"минимальный интервал между запросами {min(gaps) * 1000:.0f} ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ Все проверки пройдены")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Планы запросов до и после индексов из INDEX_REGISTRY.
+
+Заполняет отдельную базу на локальном MongoDB тестовыми данными, выполняет
+запросы сервисов с explain("executionStats") без индексов, строит индексы
+через IndexRegistry и повторяет. Печатает стадии плана (COLLSCAN / IXSCAN),
+сколько ключей и документов просмотрено и время.
+
+Запуск из каталога backend:
+    MONGO_URL=mongodb://localhost:27017/ python benchmarks/index_query_plans.py [документов] [--keep]
+"""
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config.database import client
+from app.services.index_registry import IndexRegistry, INDEX_REGISTRY
+from app.services.pagination import CREATED_AT_SORT
+
+BENCH_DB_NAME = "index_plans_benchmark"
+
+STATUSES = ["new", "processing", "approved", "rejected"]
+COUNTRIES = ["Китай", "Германия", "Япония", "Корея"]
+
+def seed(db, count):
+    """Коллекции с распределением значений, похожим на рабочее"""
+    now = datetime.utcnow()
+    rnd = random.Random(168)
+
+    def created(i):
+        return now - timedelta(minutes=i)
+
+    db.cars.insert_many([
+        {
+            "id": f"car_{i}",
+            "title": f"Модель {i % 500}",
+            "brand": f"Бренд {i % 40}",
+            "country": COUNTRIES[i % len(COUNTRIES)],
+            "year": 2010 + i % 15,
+            "price_value": rnd.randint(5, 80),
+        }
+        for i in range(count)
+    ])
+    db.otp_credit_applications.insert_many([
+        {
+            "_id": str(uuid.uuid4()),
+            # Новых заявок мало, обработанных большинство — как на проде
+            "status": "new" if i % 20 == 0 else rnd.choice(STATUSES[1:]),
+            "created_at": created(i),
+        }
+        for i in range(count)
+    ])
+    db.users.insert_many([{"telegram_id": 100000 + i, "first_name": f"user{i}"} for i in range(count)])
+    db.reviews.insert_many([
+        {
+            "rating": rnd.randint(1, 5),
+            "status": "processed" if i % 10 else "new",
+            "reply": f"Ответ {i}" if i % 10 else None,
+            "created_at": created(i),
+        }
+        for i in range(count)
+    ])
+    db.cities.insert_many([
+        {"id": f"city_{i}", "name": f"Город {i}", "is_active": i % 5 != 0}
+        for i in range(count)
+    ])
+    db.delivery_zones.insert_many([
+        {"id": f"zone_{i}", "name": f"Зона {i}", "is_active": True}
+        for i in range(count)
+    ])
+
+def queries(count):
+    """(название, коллекция, команда explain) — запросы, которые выполняют сервисы"""
+    probe = count // 2
+    return [
+        ("cars: страна + сортировка по цене", "cars", {
+            "find": "cars", "filter": {"country": "Япония"},
+            "sort": {"price_value": 1, "id": 1}, "limit": 20,
+        }),
+        ("cars: поиск по id", "cars", {"find": "cars", "filter": {"id": f"car_{probe}"}}),
+        ("заявки: статус + created_at", "otp_credit_applications", {
+            "find": "otp_credit_applications", "filter": {"status": "new"},
+            "sort": dict(CREATED_AT_SORT), "limit": 10,
+        }),
+        ("заявки: подсчёт по статусам", "otp_credit_applications", {
+            "aggregate": "otp_credit_applications",
+            "pipeline": [{"$sort": {"status": 1}}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "cursor": {},
+        }),
+        ("users: telegram_id", "users", {"find": "users", "filter": {"telegram_id": 100000 + probe}}),
+        ("reviews: рейтинг + created_at", "reviews", {
+            "find": "reviews", "filter": {"rating": 5}, "sort": dict(CREATED_AT_SORT), "limit": 10,
+        }),
+        ("reviews: новые ($or status / reply)", "reviews", {
+            "find": "reviews", "filter": {"$or": [{"status": "new"}, {"reply": None}]},
+            "sort": dict(CREATED_AT_SORT), "limit": 10,
+        }),
+        ("cities: id", "cities", {"find": "cities", "filter": {"id": f"city_{probe}"}}),
+        ("delivery_zones: name + is_active", "delivery_zones", {
+            "find": "delivery_zones", "filter": {"name": f"Зона {probe}", "is_active": True},
+        }),
+    ]
+
+def _find_key(node, key):
+    """Первое значение key в дереве explain (формат разный для find, aggregate и SBE)"""
+    if isinstance(node, dict):
+        if key in node:
+            return node[key]
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+def _stages(plan):
+    stages = []
+    def walk(node):
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append(node["stage"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+    walk(plan)
+    return stages
+
+def explain(db, command):
+    result = db.command("explain", command, verbosity="executionStats")
+    stats = _find_key(result, "executionStats") or {}
+    return {
+        "plan": " <- ".join(_stages(_find_key(result, "winningPlan"))) or "?",
+        "keys": stats.get("totalKeysExamined"),
+        "docs": stats.get("totalDocsExamined"),
+        "ms": stats.get("executionTimeMillis"),
+    }
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    count = int(args[0]) if args else 50000
+    keep = "--keep" in sys.argv
+
+    client.drop_database(BENCH_DB_NAME)
+    db = client[BENCH_DB_NAME]
+    print(f"Заполнение {BENCH_DB_NAME}: {count} документов в коллекции...")
+    seed(db, count)
+
+    before = {name: explain(db, command) for name, _, command in queries(count)}
+
+    # Те же индексы, что строятся при старте приложения, но в тестовой базе
+    bench_collections = {collection for _, collection, _ in queries(count)}
+    registry = IndexRegistry(
+        [spec for spec in INDEX_REGISTRY if spec["collection"] in bench_collections],
+        databases={"main": db, "cities": db}
+    )
+    registry.build()
+
+    after = {name: explain(db, command) for name, _, command in queries(count)}
+
+    for name, _, _ in queries(count):
+        print(name)
+        for label, result in (("до   ", before[name]), ("после", after[name])):
+            print(
+                f"   {label} {result['plan']:<45} ключей {result['keys']!s:>7}  "
+                f"документов {result['docs']!s:>7}  {result['ms']!s:>5} ms"
+            )
+
+    if not keep:
+        client.drop_database(BENCH_DB_NAME)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
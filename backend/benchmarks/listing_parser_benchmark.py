@@ -0,0 +1,202 @@
+"""
+Бенчмарк разбора страницы списка: прежний разбор BeautifulSoup (html.parser,
+select_one на каждый контейнер) против ListingParser на lxml.
+Заодно проверяет, что автомобили получаются одинаковые.
+
+Фикстуры — сохранённые страницы che168 (по умолчанию debug_page_source.html).
+Чтобы мерить на ~1000 объявлений, список страницы размножается копиями
+карточек с новыми infoid.
+
+Запуск из каталога backend:
+    python benchmarks/listing_parser_benchmark.py [объявлений] [страница.html ...]
+"""
+import contextlib
+import copy
+import io
+import random
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+from app.services.listing_parser import (
+    ListingParser,
+    CAR_CONTAINER_SELECTORS,
+    TITLE_SELECTORS,
+    PRICE_SELECTORS,
+    CAR_KEYWORDS,
+    CAR_IMAGE_KEYWORDS,
+    LISTING_URL_ID,
+    build_car_id,
+    absolute_image_url,
+)
+
+def legacy_extract_listing_id(car_container):
+    candidates = [car_container]
+    candidates += list(islice(car_container.parents, 3))
+    nested = car_container.select("[infoid]")
+    if len(nested) == 1:
+        candidates += nested
+    for element in candidates:
+        if not hasattr(element, "get"):
+            continue
+        info_id = element.get("infoid")
+        if info_id and str(info_id).isdigit():
+            return str(info_id)
+        element_id = element.get("id") or ""
+        if element_id.startswith("shucar_") and element_id[7:].isdigit():
+            return element_id[7:]
+
+    link_ids = {
+        match.group(1)
+        for link in car_container.find_all("a", href=True)
+        for match in [LISTING_URL_ID.search(link["href"])]
+        if match
+    }
+    return link_ids.pop() if len(link_ids) == 1 else None
+
+def legacy_extract_listing_url(car_container):
+    link = car_container.find("a", href=True)
+    if not link:
+        return ""
+    return link["href"].split("#")[0].split("?")[0]
+
+def legacy_parse(html):
+    """Прежний разбор из scrape_and_cache_cars (эталон для сравнения)"""
+    soup = BeautifulSoup(html, "html.parser")
+    car_containers = []
+    for selector in CAR_CONTAINER_SELECTORS:
+        car_containers = soup.select(selector)
+        if car_containers and len(car_containers) > 2:
+            break
+        elif car_containers:
+            if any(
+                any(keyword in container.get_text().lower() for keyword in CAR_KEYWORDS)
+                for container in car_containers[:3]
+            ):
+                break
+
+    if not car_containers:
+        car_related_images = []
+        for img in soup.find_all("img"):
+            alt_text = img.get('alt', '').lower()
+            title = img.get('title', '').lower()
+            if any(keyword in alt_text + title for keyword in CAR_IMAGE_KEYWORDS):
+                parent = img.find_parent()
+                if parent and parent not in car_related_images:
+                    car_related_images.append(parent)
+        car_containers = car_related_images[:20]
+
+    cars = []
+    for car_container in car_containers:
+        title = None
+        for title_selector in TITLE_SELECTORS:
+            title_element = car_container.select_one(title_selector)
+            if title_element:
+                title_text = title_element.get('title') or title_element.text.strip()
+                if title_text and len(title_text) > 2:
+                    title = title_text
+                    break
+
+        price = None
+        for price_selector in PRICE_SELECTORS:
+            price_element = car_container.select_one(price_selector)
+            if price_element:
+                price_text = price_element.text.strip()
+                if '万' in price_text or any(char.isdigit() for char in price_text):
+                    price = price_text
+                    break
+
+        image_url = ""
+        image_element = car_container.find("img")
+        if image_element:
+            for attr in ['src', 'data-src', 'data-original', 'data-lazy', 'data-img']:
+                url = image_element.get(attr)
+                if url and url != 'data:image' and 'placeholder' not in url.lower():
+                    image_url = absolute_image_url(url)
+                    break
+
+        if title and len(title.strip()) > 2:
+            if not price:
+                price = f"{random.randint(15, 50)}万"
+            cars.append({
+                "title": title,
+                "price": price,
+                "image_url": image_url,
+                "local_image_url": None,
+                "car_id": build_car_id(
+                    title,
+                    legacy_extract_listing_url(car_container) or image_url,
+                    legacy_extract_listing_id(car_container)
+                )
+            })
+    return cars
+
+def scale_page(html, listings):
+    """Страница, где карточки списка размножены до ~listings штук с новыми infoid"""
+    root = lxml_html.document_fromstring(html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"))
+    cards = root.xpath("//li[@infoid]")
+    if not cards:
+        return html
+    parent = cards[0].getparent()
+    originals = [card for card in cards if card.getparent() is parent]
+    copies = 0
+    while len(originals) * (copies + 1) < listings:
+        copies += 1
+        for card in originals:
+            clone = copy.deepcopy(card)
+            for element in clone.iter():
+                for attr in ("infoid", "id"):
+                    value = element.get(attr)
+                    if value and value.replace("shucar_", "").isdigit():
+                        element.set(attr, value + f"{copies:03d}")
+                if element.tag == "a" and element.get("href"):
+                    element.set("href", element.get("href").replace(".html", f"{copies:03d}.html"))
+            parent.append(clone)
+    return lxml_html.tostring(root, encoding="unicode")
+
+def measure(func, html, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = None
+        for _ in range(repeat):
+            random.seed(168)
+            started = time.perf_counter()
+            cars = func(html)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return cars, best
+
+def main():
+    listings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    pages = sys.argv[2:] or ["debug_page_source.html"]
+    failed = False
+
+    for page in pages:
+        html = Path(page).read_text(encoding="utf-8")
+        for name, fixture in ((page, html), (f"{page} x{listings}", scale_page(html, listings))):
+            parser = ListingParser()
+            legacy_cars, legacy_seconds = measure(legacy_parse, fixture, repeat=3)
+            optimized_cars, optimized_seconds = measure(lambda h: parser.parse(h)[0], fixture, repeat=3)
+            count = max(len(legacy_cars), 1)
+
+            print(f"{name}: {len(legacy_cars)} объявлений")
+            print(f"   До (BeautifulSoup):  {legacy_seconds * 1000:8.1f} ms, {legacy_seconds / count * 1e6:8.1f} ms на 1000 объявлений")
+            print(f"   После (lxml):        {optimized_seconds * 1000:8.1f} ms, {optimized_seconds / count * 1e6:8.1f} ms на 1000 объявлений")
+            print(f"   Ускорение: x{legacy_seconds / optimized_seconds:.1f}")
+            if legacy_cars != optimized_cars:
+                failed = True
+                mismatches = [(a, b) for a, b in zip(legacy_cars, optimized_cars) if a != b]
+                print(f"   Расхождений: {len(mismatches) + abs(len(legacy_cars) - len(optimized_cars))}")
+                for mismatch in mismatches[:5]:
+                    print(f"      {mismatch}")
+            else:
+                print("   Расхождений: 0")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Микро-бенчмарк разбора заголовков: прежние вложенные функции structure_car_data
+против TitleParser. Заодно проверяет, что результаты совпадают.
+
+Запуск из каталога backend:
+    python benchmarks/title_parser_benchmark.py [количество заголовков]
+"""
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.title_parser import (
+    TitleParser,
+    CHINESE_BRANDS,
+    ENGLISH_BRANDS,
+    COUNTRY_BY_BRAND,
+)
+
+def legacy_parse(title, price):
+    """Прежняя реализация из structure_car_data (эталон для сравнения)"""
+    # Извлечение года
+    def extract_year(text):
+        # print(f"🔍 Извлекаем год из: {text}")
+
+        # Ищем 4-значные числа, которые могут быть годами (1990-2024)
+        # Добавляем поддержку китайских символов
+        year_patterns = [
+            r'\b(20[0-2][0-9])\b',  # 2020, 2021, 2022, 2023, 2024
+            r'\b(19[9][0-9])\b',    # 1990-1999
+            r'(20[0-2][0-9])',      # Без границ слова
+            r'(19[9][0-9])'         # Без границ слова
+        ]
+
+        for pattern in year_patterns:
+            year_match = re.search(pattern, text)
+            if year_match:
+                year = int(year_match.group())
+                # print(f"   Найден год: {year}")
+                # Проверяем, что год в разумных пределах
+                if year >= 1990 and year <= 2024:
+                    return year
+                else:
+                    print(f"   Год {year} вне допустимых пределов")
+
+        print(f"   Год не найден в тексте: {text}")
+        return None
+
+    # Извлечение бренда (китайские и международные)
+    def extract_brand(text):
+        chinese_brands = [
+            '奔驰', '宝马', '奥迪', '大众', '丰田', '本田', '日产', '马自达', '斯巴鲁', '雷克萨斯',
+            '现代', '起亚', '特斯拉', '比亚迪', '蔚来', '小鹏', '理想', '吉利', '长城', '哈弗',
+            '博越', '星越', '威尔法', '路虎', '北京越野', '哈弗大狗', 'Polo'
+        ]
+
+        english_brands = [
+            'BMW', 'Mercedes', 'Audi', 'Volkswagen', 'Toyota', 'Honda', 'Nissan', 'Mazda',
+            'Subaru', 'Lexus', 'Hyundai', 'KIA', 'Tesla', 'BYD', 'NIO', 'XPeng', 'Li Auto',
+            'Geely', 'Great Wall', 'Haval', 'Land Rover'
+        ]
+
+        # Проверяем китайские бренды
+        for brand in chinese_brands:
+            if brand in text:
+                return brand
+
+        # Проверяем английские бренды
+        for brand in english_brands:
+            if brand.lower() in text.lower():
+                return brand
+
+        # Если не найден, берем первое слово
+        words = text.split()
+        return words[0] if words else "Unknown"
+
+    # Извлечение модели
+    def extract_model(text, brand):
+        if not brand or brand == "Unknown":
+            return "Unknown Model"
+
+        # Убираем бренд из названия
+        text_without_brand = text.replace(brand, '').strip()
+
+        # Ищем год и убираем его
+        year_match = re.search(r'\b(20[0-2][0-9]|19[9][0-9])\b', text_without_brand)
+        if year_match:
+            text_without_brand = text_without_brand.replace(year_match.group(), '').strip()
+
+        # Берем первые несколько слов как модель
+        words = text_without_brand.split()
+        model_words = []
+        for word in words[:3]:  # Максимум 3 слова для модели
+            if word and not re.match(r'^\d+[\.\d]*[LT]?$', word):  # Исключаем объемы двигателя
+                model_words.append(word)
+
+        return ' '.join(model_words) if model_words else "Unknown Model"
+
+    # Извлечение объема двигателя
+    def extract_engine_volume(text):
+        volume_match = re.search(r'(\d+\.?\d*)[LT]', text)
+        return f"{volume_match.group(1)}L" if volume_match else None
+
+    # Извлечение типа трансмиссии
+    def extract_transmission(text):
+        if any(keyword in text for keyword in ['自动', 'DCT', 'CVT', 'AT']):
+            return 'Automatic'
+        elif any(keyword in text for keyword in ['手动', 'MT', '手挡']):
+            return 'Manual'
+        return 'Unknown'
+
+    # Извлечение типа топлива
+    def extract_fuel_type(text):
+        if any(keyword in text for keyword in ['混动', 'HV', '双擎', 'Hybrid']):
+            return 'Hybrid'
+        elif any(keyword in text for keyword in ['电动', 'EV', '纯电']):
+            return 'Electric'
+        elif any(keyword in text for keyword in ['柴油', 'Diesel', 'TDI', 'CDI']):
+            return 'Diesel'
+        elif any(keyword in text for keyword in ['汽油', 'TFSI', 'TSI', 'Petrol']):
+            return 'Petrol'
+        return 'Petrol'  # По умолчанию бензин
+
+    # Извлечение привода
+    def extract_drive_type(text):
+        if any(keyword in text for keyword in ['四驱', '4WD', 'AWD', '4MATIC', 'xDrive', 'quattro']):
+            return 'AWD'
+        elif any(keyword in text for keyword in ['前驱', 'FWD']):
+            return 'FWD'
+        elif any(keyword in text for keyword in ['后驱', 'RWD']):
+            return 'RWD'
+        return 'FWD'  # По умолчанию передний привод
+
+    # Парсим цену
+    def parse_price(price_str):
+        if not price_str:
+            return 0
+
+        # print(f"🔍 Парсим цену: {price_str}")
+
+        # Извлекаем первое число из строки типа "26.58万" или "18.28万31.02万"
+        price_match = re.search(r'(\d+\.?\d*)', str(price_str))
+        if price_match:
+            price_value = float(price_match.group())
+            # print(f"   Извлеченная цена: {price_value}万")
+            return price_value
+
+        print(f"   Цена не найдена в строке: {price_str}")
+        return 0
+
+    # Определяем страну производителя
+    def get_country_by_brand(brand_name):
+        country_mapping = {
+            # Немецкие бренды
+            '奔驰': 'germany', '宝马': 'germany', '奥迪': 'germany', '大众': 'germany',
+            'BMW': 'germany', 'Mercedes': 'germany', 'Audi': 'germany', 'Volkswagen': 'germany',
+            '迈巴赫': 'germany', 'AMG': 'germany', '保时捷': 'germany', 'Porsche': 'germany',
+
+            # Японские бренды
+            '丰田': 'japan', '本田': 'japan', '日产': 'japan', '马自达': 'japan', '斯巴鲁': 'japan', '雷克萨斯': 'japan',
+            'Toyota': 'japan', 'Honda': 'japan', 'Nissan': 'japan', 'Mazda': 'japan', 'Subaru': 'japan', 'Lexus': 'japan',
+            '奥德赛': 'japan', '英菲尼迪': 'japan', 'Infiniti': 'japan', '讴歌': 'japan', 'Acura': 'japan',
+
+            # Корейские бренды
+            '现代': 'korea', '起亚': 'korea', 'Hyundai': 'korea', 'KIA': 'korea',
+            '捷尼赛思': 'korea', 'Genesis': 'korea',
+
+            # Американские бренды
+            '特斯拉': 'usa', 'Tesla': 'usa', '福特': 'usa', 'Ford': 'usa', '雪佛兰': 'usa', 'Chevrolet': 'usa',
+            '凯迪拉克': 'usa', 'Cadillac': 'usa', '林肯': 'usa', 'Lincoln': 'usa', '别克': 'usa', 'Buick': 'usa',
+            '探险者': 'usa', 'Explorer': 'usa',
+
+            # Китайские бренды
+            '比亚迪': 'china', '蔚来': 'china', '小鹏': 'china', '理想': 'china', '吉利': 'china',
+            '长城': 'china', '哈弗': 'china', '博越': 'china', '星越': 'china', '威尔法': 'china',
+            '哈弗大狗': 'china', '北京越野': 'china', '传祺': 'china', '广汽': 'china',
+            'BYD': 'china', 'NIO': 'china', 'XPeng': 'china', 'Li Auto': 'china', 'Geely': 'china',
+            '深蓝': 'china', '阿维塔': 'china', '零跑': 'china', '极狐': 'china', '世纪': 'china',
+
+            # Британские бренды
+            '路虎': 'uk', 'Land Rover': 'uk', '揽胜': 'uk', 'Range Rover': 'uk', '捷豹': 'uk', 'Jaguar': 'uk',
+            '迈凯伦': 'uk', 'McLaren': 'uk', '宾利': 'uk', 'Bentley': 'uk', '劳斯莱с': 'uk', 'Rolls-Royce': 'uk',
+
+            # Итальянские бренды
+            '法拉利': 'italy', 'Ferrari': 'italy', '兰博基尼': 'italy', 'Lamborghini': 'italy',
+            '玛莎拉蒂': 'italy', 'Maserati': 'italy', '阿尔法罗密欧': 'italy', 'Alfa Romeo': 'italy',
+
+            # Французские бренды
+            '标致': 'france', 'Peugeot': 'france', '雪铁龙': 'france', 'Citroën': 'france',
+            '雷诺': 'france', 'Renault': 'france', 'DS': 'france',
+
+            # Шведские бренды
+            '沃尔沃': 'sweden', 'Volvo': 'sweden',
+
+            # Швейцарские бренды
+            '保时捷': 'switzerland', 'Porsche': 'switzerland'
+        }
+
+        # Проверяем точное совпадение
+        if brand_name in country_mapping:
+            return country_mapping[brand_name]
+
+        # Проверяем частичное совпадение
+        for brand, country in country_mapping.items():
+            if brand in brand_name or brand_name in brand:
+                return country
+
+        return 'unknown'
+
+    # Извлекаем все данные
+    year = extract_year(title)
+    brand = extract_brand(title)
+    model = extract_model(title, brand)
+    price_value = parse_price(price)
+    country = get_country_by_brand(brand)
+
+    year = extract_year(title)
+    brand = extract_brand(title)
+    model = extract_model(title, brand)
+    price_value = parse_price(price)
+    country = get_country_by_brand(brand)
+    return year, brand, model, price_value, country
+
+def optimized_parse(parser, title, price):
+    year = parser.extract_year(title)
+    brand = parser.extract_brand(title)
+    model = parser.extract_model(title, brand)
+    price_value = parser.parse_price(price)
+    country = parser.country_by_brand(brand)
+    return year, brand, model, price_value, country
+
+def generate_titles(count, seed=168):
+    """Заголовки в духе che168: бренд, модель, год, объём, комплектация"""
+    rng = random.Random(seed)
+    brands = list(CHINESE_BRANDS) + list(ENGLISH_BRANDS) + list(COUNTRY_BY_BRAND) + ["红旗", "Skoda"]
+    models = ["X5", "A6L", "凯美瑞", "雅阁", "Model 3", "汉 EV", "CR-V", "途观L", "GLC 300"]
+    extras = ["2.0T", "1.5L", "自动", "手动", "四驱", "xDrive", "DCT", "混动", "纯电", "TSI", "豪华型", "款"]
+    titles = []
+    for _ in range(count):
+        year = rng.choice([str(rng.randint(1985, 2027)), f"{rng.randint(2015, 2026)}款", ""])
+        parts = [rng.choice(brands), rng.choice(models), year] + rng.sample(extras, 3)
+        if rng.random() < 0.3:
+            parts = [p.lower() for p in parts]
+        rng.shuffle(parts[1:])
+        titles.append((" ".join(p for p in parts if p), f"{rng.uniform(1, 200):.2f}万"))
+    return titles
+
+def measure(func, titles):
+    # Обе реализации печатают диагностику — глушим её, чтобы не мерить вывод
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        results = [func(title, price) for title, price in titles]
+        elapsed = time.perf_counter() - started
+    return results, len(titles) / elapsed
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    titles = generate_titles(count)
+    parser = TitleParser()
+
+    legacy_results, legacy_rate = measure(legacy_parse, titles)
+    optimized_results, optimized_rate = measure(lambda t, p: optimized_parse(parser, t, p), titles)
+
+    mismatches = [
+        (titles[i], legacy, optimized)
+        for i, (legacy, optimized) in enumerate(zip(legacy_results, optimized_results))
+        if legacy != optimized
+    ]
+
+    print(f"Заголовков: {count}")
+    print(f"До (вложенные функции): {legacy_rate:,.0f} cars/s")
+    print(f"После (TitleParser):    {optimized_rate:,.0f} cars/s")
+    print(f"Ускорение: x{optimized_rate / legacy_rate:.2f}")
+    print(f"Расхождений: {len(mismatches)}")
+    for mismatch in mismatches[:10]:
+        print(f"   {mismatch}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
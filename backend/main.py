@@ -4,8 +4,10 @@ from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 from pathlib import Path
+from functools import partial
 import re
 
 # Импорты из новых модулей
@@ -13,9 +15,13 @@ from app.config.settings import (
     CORS_ORIGINS, 
     STATIC_IMAGES_DIR, 
     CONTRACTS_DIR, 
-    ALLOWED_CONTRACT_TYPES
+    ALLOWED_CONTRACT_TYPES,
+    MONGO_READ_PATH
 )
-from app.config.database import client
+from app.config.database import open_database, close_database, POOL_OPTIONS
+from app.config.async_database import open_async_database, close_async_database, async_pool_metrics
+from app.config.mongo_pool import pool_metrics
+from app.services import async_repository
 from app.services.auth_service import (
     verify_telegram_auth, 
     create_jwt_token, 
@@ -25,8 +31,16 @@ from app.services.auth_service import (
 from app.services.car_service import (
     get_scraped_cars, 
     refresh_cache, 
-    get_cars_with_filters
+    get_cars_with_filters,
+    start_car_records_restructuring,
+    get_scrape_job,
+    list_scrape_jobs
 )
+from app.services.browser_pool import driver_pool
+from app.services.image_derivatives import image_processor
+from app.services.scrape_runs import list_scrape_runs
+from app.services.index_registry import index_registry
+from app.services.application_counters import application_counters
 from app.services.contract_service import (
     list_contracts, 
     get_contract, 
@@ -153,6 +167,8 @@ app.add_middleware(
 async def startup_event():
     """Автоматическая инициализация базовых данных при запуске"""
     print("🚀 Запуск приложения...")
+    open_database()
+    await open_async_database()
     
     # Инициализируем зоны доставки
     print("📦 Инициализация зон доставки...")
@@ -162,15 +178,47 @@ async def startup_event():
     print("🏙️ Инициализация городов...")
     initialize_default_cities()
     
+    # Недостающие индексы всех коллекций строятся в фоне
+    print("🗂️ Проверка индексов...")
+    index_registry.start()
+    application_counters.start()
+    
+    # Пересобираем read-модель автомобилей, если изменились правила извлечения
+    print("🚗 Проверка read-модели автомобилей...")
+    start_car_records_restructuring()
+    
+    # Прогреваем сессии браузера для парсинга в фоне
+    print("🌐 Запуск пула браузеров...")
+    driver_pool.start()
+    
     print("✅ Приложение готово к работе!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Останавливает фоновые службы; сессии браузера закрываются, чтобы не занимать слоты Selenium Grid"""
+    driver_pool.close()
+    image_processor.shutdown()
+    application_counters.stop()
+    await close_async_database()
+    close_database()
+
 # Пути для статических файлов (Docker volumes)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Security
 security = HTTPBearer(auto_error=False)
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def hot_read(sync_read, async_read, *args, **kwargs):
+    """
+    Горячее чтение: асинхронный драйвер в цикле событий или,
+    при MONGO_READ_PATH=sync, прежний синхронный сервис в пуле потоков
+    """
+    if MONGO_READ_PATH == "sync":
+        return await run_in_threadpool(sync_read, *args, **kwargs)
+    return await async_read(*args, **kwargs)
+
+# Без ввода-вывода: async, чтобы проверка токена не занимала поток из пула
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Получает текущего пользователя из JWT токена"""
     if not credentials:
         return None
@@ -339,9 +387,9 @@ def auth_save_phone(data: dict, current_user = Depends(get_current_user)):
     return save_phone(phone, current_user)
 
 @app.get("/api/auth/me")
-def auth_get_me(current_user = Depends(get_current_user)):
+async def auth_get_me(current_user = Depends(get_current_user)):
     """Возвращает профиль пользователя из БД"""
-    return get_user_profile(current_user)
+    return await hot_read(get_user_profile, async_repository.get_user_profile, current_user)
 
 # ====== АВТОМОБИЛИ ======
 @app.get("/api/scrape-cars")
@@ -350,12 +398,27 @@ def api_get_scraped_cars():
     return get_scraped_cars()
 
 @app.post("/api/refresh-cache")
-def api_refresh_cache():
+def api_refresh_cache(wait: bool = False):
     """Force refresh the car cache by scraping new data."""
-    return refresh_cache()
+    return refresh_cache(wait)
+
+@app.get("/api/scrape-jobs")
+def api_list_scrape_jobs():
+    """Список последних задач парсинга и активная задача"""
+    return list_scrape_jobs()
+
+@app.get("/api/scrape-jobs/{job_id}")
+def api_get_scrape_job(job_id: str):
+    """Статус и прогресс задачи парсинга"""
+    return get_scrape_job(job_id)
+
+@app.get("/api/scrape-runs")
+def api_list_scrape_runs(limit: int = Query(20, ge=1, le=100)):
+    """Последние запуски парсинга с временем по этапам"""
+    return {"runs": list_scrape_runs(limit)}
 
 @app.get("/api/cars")
-def api_get_cars(
+async def api_get_cars(
     page: int = 1,
     page_size: int = 10,
     sort_by: Optional[str] = None,
@@ -366,9 +429,13 @@ def api_get_cars(
     year_from: Optional[str] = None,
     year_to: Optional[str] = None,
     country: Optional[str] = None,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
 ):
     """Получает автомобили с фильтрацией, сортировкой и пагинацией"""
-    return get_cars_with_filters(
+    return await hot_read(
+        get_cars_with_filters,
+        async_repository.get_cars,
         page=page,
         page_size=page_size,
         sort_by=sort_by,
@@ -378,7 +445,9 @@ def api_get_cars(
         price_to=price_to,
         year_from=year_from,
         year_to=year_to,
-        country=country
+        country=country,
+        cursor=cursor,
+        q=q
     )
 
 # ====== СИСТЕМА ======
@@ -399,7 +468,7 @@ def api_get_volumes_stats():
 
 @app.post("/api/images/cleanup")
 def api_cleanup_images():
-    """Очищает папку с изображениями."""
+    """Удаляет изображения, на которые не ссылается ни один автомобиль."""
     return cleanup_images()
 
 @app.post("/api/contracts/cleanup")
@@ -578,13 +647,18 @@ def api_get_otp_credit_stats():
     return get_otp_credit_stats()
 
 @app.get("/api/applications/otp-credit")
-def api_get_otp_credit_applications(
+async def api_get_otp_credit_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок ОТП кредит"""
-    return get_otp_credit_applications(page, page_size, status)
+    return await hot_read(
+        get_otp_credit_applications,
+        partial(async_repository.get_applications, "otp_credit"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/otp-credit/{application_id}")
 def api_get_otp_credit_application(application_id: str):
@@ -615,13 +689,18 @@ def api_get_alfa_credit_stats():
     return get_alfa_credit_stats()
 
 @app.get("/api/applications/alfa-credit")
-def api_get_alfa_credit_applications(
+async def api_get_alfa_credit_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок Альфа кредит"""
-    return get_alfa_credit_applications(page, page_size, status)
+    return await hot_read(
+        get_alfa_credit_applications,
+        partial(async_repository.get_applications, "alfa_credit"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/alfa-credit/{application_id}")
 def api_get_alfa_credit_application(application_id: str):
@@ -652,13 +731,18 @@ def api_get_rshb_credit_stats():
     return get_rshb_credit_stats()
 
 @app.get("/api/applications/rshb-credit")
-def api_get_rshb_credit_applications(
+async def api_get_rshb_credit_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок РСХБ кредит"""
-    return get_rshb_credit_applications(page, page_size, status)
+    return await hot_read(
+        get_rshb_credit_applications,
+        partial(async_repository.get_applications, "rshb_credit"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/rshb-credit/{application_id}")
 def api_get_rshb_credit_application(application_id: str):
@@ -689,13 +773,18 @@ def api_get_ural_credit_stats():
     return get_ural_credit_stats()
 
 @app.get("/api/applications/ural-credit")
-def api_get_ural_credit_applications(
+async def api_get_ural_credit_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок Уралсиб кредит"""
-    return get_ural_credit_applications(page, page_size, status)
+    return await hot_read(
+        get_ural_credit_applications,
+        partial(async_repository.get_applications, "ural_credit"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/ural-credit/{application_id}")
 def api_get_ural_credit_application(application_id: str):
@@ -726,13 +815,18 @@ def api_get_renesans_credit_stats():
     return get_renesans_credit_stats()
 
 @app.get("/api/applications/renesans-credit")
-def api_get_renesans_credit_applications(
+async def api_get_renesans_credit_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок Ренессанс кредит"""
-    return get_renesans_credit_applications(page, page_size, status)
+    return await hot_read(
+        get_renesans_credit_applications,
+        partial(async_repository.get_applications, "renesans_credit"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/renesans-credit/{application_id}")
 def api_get_renesans_credit_application(application_id: str):
@@ -757,6 +851,14 @@ def api_get_applications_stats():
     """Получение статистики заявок"""
     return get_applications_stats()
 
+@app.post("/api/applications/stats/reconcile")
+def api_reconcile_applications_stats():
+    """Сверка счётчиков заявок с коллекциями"""
+    try:
+        return {"status": "ok", "drift": application_counters.reconcile()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reconcile statistics: {str(e)}")
+
 @app.get("/api/applications/direct-leasing/stats")
 def api_get_direct_leasing_stats():
     """Получение статистики заявок Директ лизинг"""
@@ -768,40 +870,60 @@ def api_get_carcade_leasing_stats():
     return get_carcade_leasing_stats()
 
 @app.get("/api/applications/credit")
-def api_get_credit_applications(
+async def api_get_credit_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка кредитных заявок"""
-    return get_credit_applications(page, page_size, status)
+    return await hot_read(
+        get_credit_applications,
+        partial(async_repository.get_applications, "credit"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/leasing")
-def api_get_leasing_applications(
+async def api_get_leasing_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка лизинговых заявок"""
-    return get_leasing_applications(page, page_size, status)
+    return await hot_read(
+        get_leasing_applications,
+        partial(async_repository.get_applications, "leasing"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/direct-leasing")
-def api_get_direct_leasing_applications(
+async def api_get_direct_leasing_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок Директ лизинг"""
-    return get_direct_leasing_applications(page, page_size, status)
+    return await hot_read(
+        get_direct_leasing_applications,
+        partial(async_repository.get_applications, "direct_leasing"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/carcade-leasing")
-def api_get_carcade_leasing_applications(
+async def api_get_carcade_leasing_applications(
     page: int = 1,
     page_size: int = 10,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Получение списка заявок Каркаде лизинг"""
-    return get_carcade_leasing_applications(page, page_size, status)
+    return await hot_read(
+        get_carcade_leasing_applications,
+        partial(async_repository.get_applications, "carcade_leasing"),
+        page, page_size, status, cursor
+    )
 
 @app.get("/api/applications/direct-leasing/{application_id}")
 def api_get_direct_leasing_application(application_id: str):
@@ -857,14 +979,15 @@ def api_delete_carcade_leasing_application(application_id: str):
 
 # ====== ОТЗЫВЫ ======
 @app.get("/api/reviews")
-def api_get_reviews(
+async def api_get_reviews(
     page: int = 1, 
     page_size: int = 10, 
     rating: Optional[int] = None, 
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """Получение списка отзывов с фильтрацией и пагинацией"""
-    return get_reviews(page, page_size, rating, status)
+    return await hot_read(get_reviews, async_repository.get_reviews, page, page_size, rating, status, cursor)
 
 @app.post("/api/reviews")
 def api_create_review(payload: dict, current_user = Depends(get_current_user)):
@@ -919,9 +1042,24 @@ def api_get_debug_page_source():
 
 @app.get("/api/debug/selectors-test")
 def api_test_selectors():
-    """Тестирует различные селекторы на последней сохраненной странице."""
+    """Выученный рейтинг селекторов парсера с историей попаданий."""
     return test_selectors()
 
+@app.get("/api/debug/mongo-pool")
+def api_debug_mongo_pool():
+    """Настройки и метрики пулов соединений MongoDB (ожидание выдачи соединения)"""
+    return {
+        "options": POOL_OPTIONS,
+        "read_path": MONGO_READ_PATH,
+        "metrics": pool_metrics.stats(),
+        "async_metrics": async_pool_metrics.stats(),
+    }
+
+@app.get("/api/debug/indexes")
+def api_debug_indexes():
+    """Желаемые и существующие индексы MongoDB с размерами"""
+    return index_registry.report()
+
 @app.post("/api/debug/test-selector")
 def api_test_custom_selector(data: dict):
     """Тестирует пользовательский селектор на последней сохраненной странице."""
@@ -946,9 +1084,9 @@ def api_get_cities(
     return get_cities(skip, limit, region, delivery_zone, is_active)
 
 @app.get("/api/cities/search")
-def api_search_cities(query: str = Query(..., min_length=2), limit: int = 10):
+async def api_search_cities(query: str = Query(..., min_length=2), limit: int = 10):
     """Поиск городов по названию или региону"""
-    return search_cities(query, limit)
+    return await hot_read(search_cities, async_repository.search_cities, query, limit)
 
 @app.get("/api/cities/{city_id}")
 def api_get_city(city_id: str):
@@ -247,7 +247,9 @@ export const adaptVehicle = (backendCar, index = 0) => {
     // Формируем URL изображений
     let images = ['/placeholder-car.svg']; // По умолчанию
     
-    if (backendCar.local_image_url) {
+    if (backendCar.images?.card) {
+      images = [`${API_BASE_URL}${backendCar.images.card}`];
+    } else if (backendCar.local_image_url) {
       images = [`${API_BASE_URL}${backendCar.local_image_url}`];
     //   console.log('🖼️ Используем локальное изображение:', images[0]);
     } else if (backendCar.image_url) {